@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+#
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause OR GPL-3.0-only
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING,
+# BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+# OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+# Microbenchmark of the in-flight request bookkeeping of PolicyCommunicator:
+# the MD5 request id over the sorted JSON of every request, as the original
+# request() computed it, against the current key on the payload serialized
+# for sending, on a GET and on Tier0 like PATCH bodies.
+#
+# Needs Ansible installed. Run from the root of the repository:
+#     python benchmarks/policy_request_key.py [sizes ...]
+
+import hashlib
+import json
+import os
+import sys
+import timeit
+
+import ansible.module_utils
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ansible.module_utils.__path__.append(os.path.join(ROOT, 'module_utils'))
+
+from ansible.module_utils.policy_communicator import PolicyCommunicator
+
+DEFAULT_SIZES = [0, 10, 100, 1000]
+ITERATIONS = 200
+URL = 'https://nsx.example.com/policy/api/v1/infra/tier-0s/t0'
+
+
+def make_tier0_body(size):
+    # size static routes and BGP neighbors, like a large Tier0 PATCH
+    if not size:
+        return None
+    return {
+        'resource_type': 'Tier0',
+        'id': 't0',
+        'display_name': 't0',
+        'ha_mode': 'ACTIVE_STANDBY',
+        'tags': [{'scope': 'env', 'tag': 'prod'}],
+        'static_routes': [{
+            'id': 'route-%d' % i,
+            'network': '10.%d.%d.0/24' % (i // 256, i % 256),
+            'next_hops': [{'ip_address': '192.168.0.1', 'admin_distance': 1}],
+        } for i in range(size)],
+        'bgp_neighbors': [{
+            'id': 'neighbor-%d' % i,
+            'neighbor_address': '172.16.%d.%d' % (i // 256, i % 256),
+            'remote_as_num': '65001',
+            'source_addresses': ['172.16.0.1'],
+        } for i in range(size)],
+    }
+
+
+def old_bookkeeping(url, data, method, active_requests):
+    # What the original request did: the MD5 id of every request, GET
+    # included, then the payload to send.
+    request = dict(data=data, request_url=url, request_method=method)
+    request_id = hashlib.md5(json.dumps(request, sort_keys=True).
+                             encode('utf-8')).hexdigest()
+    if data is not None:
+        data = json.dumps(data)
+    active_requests.add(request_id)
+    active_requests.remove(request_id)
+
+
+def new_bookkeeping(communicator, url, data, method):
+    if data is not None:
+        data = json.dumps(data)
+    request_key = communicator._get_request_key(url, data, method)
+    in_flight, _ = communicator.register_request(request_key)
+    communicator.unregister_request(request_key, in_flight)
+
+
+def main():
+    communicator = PolicyCommunicator.get_instance(
+        'admin', 'nsx.example.com', 'benchmark')
+    for size in [int(size) for size in sys.argv[1:]] or DEFAULT_SIZES:
+        data = make_tier0_body(size)
+        method = 'GET' if data is None else 'PATCH'
+        active_requests = set()
+        old_time = min(timeit.repeat(
+            lambda: old_bookkeeping(URL, data, method, active_requests),
+            number=ITERATIONS, repeat=5)) / ITERATIONS
+        new_time = min(timeit.repeat(
+            lambda: new_bookkeeping(communicator, URL, data, method),
+            number=ITERATIONS, repeat=5)) / ITERATIONS
+        body_size = len(json.dumps(data)) if data is not None else 0
+        print('%-5s %9d bytes  md5 id %9.1f us  key %9.1f us  speedup %5.1fx'
+              % (method, body_size, old_time * 1e6, new_time * 1e6,
+                 old_time / new_time))
+
+
+if __name__ == '__main__':
+    main()
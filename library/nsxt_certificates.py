@@ -106,9 +106,10 @@ EXAMPLES = '''
 
 RETURN = '''# '''
 
-import json, time
+import json
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.vmware_nsxt import vmware_argument_spec, request, get_certificate_string, get_private_key_string
+from ansible.module_utils.common_utils import wait_for_write_confirmation
 from ansible.module_utils._text import to_native
 
 def update_params_with_pem_encoding(certificate_params):
@@ -197,7 +198,9 @@ def main():
     except Exception as err:
       module.fail_json(msg="Failed to add certificate.\n Error: [%s].\n Request_body[%s]." % (to_native(err), request_data))
 
-    time.sleep(5)
+    for certificate in resp.get('results') or []:
+      wait_for_write_confirmation(manager_url, '/trust-management/certificates/%s' % certificate['id'],
+                                  mgr_username, mgr_password, validate_certs)
     module.exit_json(changed=True, result=resp, message="certificate created. Response: [%s]" % str(resp))
 
   elif state == 'absent': 
@@ -211,7 +214,8 @@ def main():
     except Exception as err:
       module.fail_json(msg="Failed to delete certificate with display name \'%s\'. Error[%s]." % (display_name, to_native(err)))
 
-    time.sleep(5)
+    wait_for_write_confirmation(manager_url, '/trust-management/certificates/%s' % certificate_id,
+                                mgr_username, mgr_password, validate_certs, deleted=True)
     module.exit_json(changed=True, object_name=certificate_id, message="Certificate with certificate id: %s deleted." % certificate_id)
 
 
@@ -88,6 +88,7 @@ RETURN = '''# '''
 import json, time
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.vmware_nsxt import vmware_argument_spec, request
+from ansible.module_utils.nsx_search import find_by_display_name
 from ansible.module_utils._text import to_native
 import ssl
 import socket
@@ -102,14 +103,6 @@ def get_compute_collection_templates_params(args=None):
             args.pop(key, None)
     return args
 
-def get_compute_collection_templates(module, manager_url, mgr_username, mgr_password, validate_certs):
-    try:
-      (rc, resp) = request(manager_url+ '/fabric/compute-collection-fabric-templates', headers=dict(Accept='application/json'),
-                      url_username=mgr_username, url_password=mgr_password, validate_certs=validate_certs, ignore_errors=True)
-    except Exception as err:
-      module.fail_json(msg='Error accessing fabric compute collection fabric template. Error [%s]' % (to_native(err)))
-    return resp
-
 def get_id_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, endpoint, display_name, exit_if_not_found=True):
     try:
       (rc, resp) = request(manager_url+ endpoint, headers=dict(Accept='application/json'),
@@ -124,11 +117,11 @@ def get_id_from_display_name(module, manager_url, mgr_username, mgr_password, va
         module.fail_json(msg='No id exist with display name %s' % display_name)
 
 def get_compute_collection_templates_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, display_name):
-    compute_collection_templates = get_compute_collection_templates(module, manager_url, mgr_username, mgr_password, validate_certs)
-    for compute_collection_templates in compute_collection_templates['results']:
-        if compute_collection_templates.__contains__('display_name') and compute_collection_templates['display_name'] == display_name:
-            return compute_collection_templates
-    return None
+    try:
+      return find_by_display_name(manager_url, '/fabric/compute-collection-fabric-templates', mgr_username, mgr_password,
+                                  validate_certs, display_name)
+    except Exception as err:
+      module.fail_json(msg='Error accessing fabric compute collection fabric template. Error [%s]' % (to_native(err)))
 
 def wait_till_delete(id, module, manager_url, mgr_username, mgr_password, validate_certs):
     try:
@@ -25,6 +25,7 @@ short_description: 'Get compute collection fabric templates'
 description: 'Returns compute collection fabric templates'
 version_added: '2.7'
 author: 'Rahul Raghuvanshi'
+extends_documentation_fragment: vmware_nsxt.facts_filter
 options:
     hostname:
         description: 'Deployed NSX manager hostname.'
@@ -38,7 +39,6 @@ options:
         description: 'The password to authenticate with the NSX manager.'
         required: true
         type: str
-
 '''
 
 EXAMPLES = '''
@@ -48,6 +48,18 @@ EXAMPLES = '''
         username: "admin"
         password: "Admin!23Admin"
         validate_certs: False
+
+    - name: Get the fabric template of a compute collection
+      nsxt_compute_collection_fabric_templates_facts:
+        hostname: "10.192.167.137"
+        username: "admin"
+        password: "Admin!23Admin"
+        validate_certs: False
+        display_name: "cluster-1-fabric-template"
+        fields:
+          - id
+          - compute_collection_id
+          - auto_install_nsx
 '''
 
 RETURN = '''# '''
@@ -55,12 +67,14 @@ RETURN = '''# '''
 import json
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.vmware_nsxt import vmware_argument_spec, request
+from ansible.module_utils.facts_filter import get_filter_argument_spec, has_filters, get_filtered_results
 from ansible.module_utils.urls import open_url, fetch_url
 from ansible.module_utils._text import to_native
 from ansible.module_utils.six.moves.urllib.error import HTTPError
 
 def main():
   argument_spec = vmware_argument_spec()
+  argument_spec.update(get_filter_argument_spec())
 
   module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
 
@@ -71,6 +85,14 @@ def main():
 
   manager_url = 'https://{}/api/v1'.format(mgr_hostname)
 
+  if has_filters(module.params):
+    try:
+      filtered = get_filtered_results(manager_url, '/fabric/compute-collection-fabric-templates', mgr_username, mgr_password,
+                                      validate_certs, module.params)
+    except Exception as err:
+      module.fail_json(msg='Error accessing copmpute collection fabric templates. Error [%s]' % (to_native(err)))
+    module.exit_json(changed=False, **filtered)
+
   changed = False
   try:
     (rc, resp) = request(manager_url+ '/fabric/compute-collection-fabric-templates', headers=dict(Accept='application/json'),
@@ -115,6 +115,7 @@ RETURN = '''# '''
 import json, time
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.vmware_nsxt import vmware_argument_spec, request
+from ansible.module_utils.nsx_search import find_by_display_name
 from ansible.module_utils._text import to_native
 import ssl
 import socket
@@ -142,20 +143,12 @@ def get_id_from_display_name(module, manager_url, mgr_username, mgr_password, va
     if exit_if_not_found:
         module.fail_json(msg='No id exist with display name %s' % display_name)
 
-def get_compute_collection_transport_templates(module, manager_url, mgr_username, mgr_password, validate_certs):
+def get_compute_collection_transport_templates_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, display_name):
     try:
-      (rc, resp) = request(manager_url+ '/compute-collection-transport-node-templates', headers=dict(Accept='application/json'),
-                      url_username=mgr_username, url_password=mgr_password, validate_certs=validate_certs, ignore_errors=True)
+      return find_by_display_name(manager_url, '/compute-collection-transport-node-templates', mgr_username, mgr_password,
+                                  validate_certs, display_name)
     except Exception as err:
       module.fail_json(msg='Error accessing transport compute collection transport template. Error [%s]' % (to_native(err)))
-    return resp
-
-def get_compute_collection_transport_templates_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, display_name):
-    compute_collection_transport_templates = get_compute_collection_transport_templates(module, manager_url, mgr_username, mgr_password, validate_certs)
-    for compute_collection_transport_templates in compute_collection_transport_templates['results']:
-        if compute_collection_transport_templates.__contains__('display_name') and compute_collection_transport_templates['display_name'] == display_name:
-            return compute_collection_transport_templates
-    return None
 
 def wait_till_delete(id, module, manager_url, mgr_username, mgr_password, validate_certs):
     try:
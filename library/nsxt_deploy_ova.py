@@ -68,12 +68,12 @@ options:
         required: true
         type: 'str'
     vmname:
-        description: Name of VM
-        required: true
+        description: Name of VM. Required unless targets is set.
+        required: false
         type: 'str'
     hostname:
-        description: Name of host
-        required: true 
+        description: Name of host. Required unless targets is set.
+        required: false
         type: 'str'
     dns_server:
         description: DNS server address
@@ -92,8 +92,8 @@ options:
         required: true
         type: 'str'
     ip_address:
-        description: IP Address
-        required: true
+        description: IP Address. Required unless targets is set.
+        required: false
         type: 'str'
     netmask:
         description: Netmask
@@ -148,8 +148,44 @@ options:
         required: false
         type: 'str'
     role:
-        description: Roles
-        required: true
+        description: Roles. Required unless targets is set.
+        required: false
+        type: 'str'
+    targets:
+        description: Appliances to deploy in parallel, one ovftool process
+                     per appliance. Each entry sets vmname, hostname,
+                     ip_address and role, and can override datastore,
+                     cluster, portgroup, folder, deployment_size,
+                     admin_password, cli_password and extra_para. The other
+                     params are shared by all the appliances. A failed
+                     deployment does not stop the others.
+        required: false
+        type: list
+    max_parallel_deployments:
+        description: Max ovftool processes running at the same time when
+                     targets is set
+        default: 3
+        type: int
+    ova_cache_dir:
+        description: Directory of a local cache of extracted OVAs. A local
+                     OVA is extracted there once, keyed by its SHA-256, and
+                     deployed from the extracted OVF, which ovftool does not
+                     need to unpack again.
+        required: false
+        type: 'str'
+    progress_file:
+        description: File the deployment progress is appended to while
+                     ovftool runs, one JSON event per line with the vmname,
+                     phase, transfer percent and rate in bytes per second.
+                     The last event of a VM also has its result and the
+                     duration of each phase (open, upload, finalize,
+                     power_on).
+        required: false
+        type: 'str'
+    log_dir:
+        description: Directory where the output of the ovftool process of
+                     each target is written as it runs, to <vmname>.log
+        required: false
         type: 'str'
 requirements:
     - PyVmOmi - Python library for vCenter api.
@@ -181,30 +217,54 @@ EXAMPLES = '''
     vcenter_passwd: "Admin!23"
     deployment_size: "small"
     role: "nsx-manager nsx-controller"
+
+- name: Deploy an NSX Manager cluster
+  nsxt_deploy_ova:
+    ovftool_path: "{{ ovfToolPath }}"
+    datacenter: "private_dc"
+    datastore: "data store"
+    portgroup: "VM Network"
+    cluster: "nsxt_cluster"
+    dns_server: "10.161.244.213"
+    dns_domain: "eng.vmware.com"
+    ntp_server: "123.108.200.124"
+    gateway: "10.112.203.253"
+    netmask: "255.255.224.0"
+    admin_password: "Admin!23Admin"
+    cli_password: "Admin!23Admin"
+    path_to_ova: "http://build-squid.eng.vmware.com/build/mts/release/bora-8411846/publish/nsx-unified-appliance/exports/ovf"
+    ova_file: "nsx-unified-appliance-2.2.0.0.0.8411854.ovf"
+    vcenter: "10.161.244.213"
+    vcenter_user: "administrator@vsphere.local"
+    vcenter_passwd: "Admin!23"
+    deployment_size: "small"
+    log_dir: "/tmp/nsx-ova-logs"
+    targets:
+      - vmname: "nsxt-manager-1"
+        hostname: "nsxt-manager-1"
+        ip_address: "10.112.201.24"
+        role: "NSX Manager"
+      - vmname: "nsxt-manager-2"
+        hostname: "nsxt-manager-2"
+        ip_address: "10.112.201.25"
+        role: "NSX Manager"
+        datastore: "data store 2"
 '''
 
 RETURN = '''# '''
+import collections
+import os
 import requests
 import ssl
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
 
 from pyVim.connect import SmartConnect
 from pyVmomi import vim, vmodl
 
 
 def find_virtual_machine(content, searched_vm_name):
-    virtual_machines = get_all_objs(content, [vim.VirtualMachine])
-    for vm in virtual_machines:
-        if vm.name == searched_vm_name:
-            return vm
-    return None
-
-
-def get_all_objs(content, vimtype):
-    obj = {}
-    container = content.viewManager.CreateContainerView(content.rootFolder, vimtype, True)
-    for managed_object_ref in container.view:
-        obj.update({managed_object_ref: managed_object_ref.name})
-    return obj
+    return find_obj_by_name(content, [vim.VirtualMachine], searched_vm_name)
 
 
 def connect_to_api(vchost, vc_user, vc_pwd):
@@ -220,6 +280,214 @@ def connect_to_api(vchost, vc_user, vc_pwd):
     return service_instance.RetrieveContent()
 
 
+# Params an entry of targets can set for its own appliance
+TARGET_PARAMS = dict(
+    vmname=dict(required=True, type='str'),
+    hostname=dict(required=True, type='str'),
+    ip_address=dict(required=True, type='str'),
+    role=dict(required=True, type='str'),
+    datastore=dict(type='str'),
+    cluster=dict(type='str'),
+    portgroup=dict(type='str'),
+    folder=dict(type='str'),
+    deployment_size=dict(type='str'),
+    admin_password=dict(type='str', no_log=True),
+    cli_password=dict(type='str', no_log=True),
+    extra_para=dict(type='str')
+)
+
+# Lines of the ovftool output kept in the result of each target
+OUTPUT_TAIL_LINES = 20
+
+
+def get_ovf_command(params, source):
+    ovftool_exec = '{}/ovftool'.format(params['ovftool_path'])
+    ovf_command = [ovftool_exec]
+
+    ovf_base_options = ['--acceptAllEulas', '--skipManifestCheck', '--X:injectOvfEnv', '--powerOn', '--noSSLVerify',
+                        '--machineOutput',
+                        '--allowExtraConfig', '--diskMode={}'.format(params['disk_mode']),
+                        '--datastore={}'.format(params['datastore']),
+                        '--name={}'.format(params['vmname'])]
+    if params['portgroup_ext']:
+        ovf_base_options.extend(['--net:Network 0={}'.format(params['portgroup']),
+                                 '--net:Network 1={}'.format(params['portgroup_ext']),
+                                 '--net:Network 2={}'.format(params['portgroup_transport']),
+                                 '--net:Network 3={}'.format(params['portgroup']),
+                                 '--deploymentOption={}'.format(params['deployment_size'])])
+    else:
+        ovf_base_options.extend(['--network={}'.format(params['portgroup'])])
+    ovf_command.extend(ovf_base_options)
+
+    ovf_ext_prop = ['--prop:nsx_hostname={}'.format(params['hostname']),
+                   '--prop:nsx_dns1_0={}'.format(params['dns_server']),
+                   '--prop:nsx_domain_0={}'.format(params['dns_domain']),
+                   '--prop:nsx_ntp_0={}'.format(params['ntp_server']),
+                   '--prop:nsx_gateway_0={}'.format(params['gateway']),
+                   '--prop:nsx_ip_0={}'.format(params['ip_address']),
+                   '--prop:nsx_netmask_0={}'.format(params['netmask']),
+                   '--prop:nsx_passwd_0={}'.format(params['admin_password']),
+                   '--prop:nsx_cli_passwd_0={}'.format(params['cli_password']),
+                   '--prop:nsx_isSSHEnabled={}'.format(params['ssh_enabled']),
+                   '--prop:nsx_allowSSHRootLogin={}'.format(params['allow_ssh_root_login']),
+                   '--prop:nsx_role={}'.format(params['role'])]
+    ovf_command.extend(ovf_ext_prop)
+
+    if params['extra_para']:
+        ovf_command.extend(['--prop:extraPara={}'.format(params['extra_para'])])
+
+    ovf_command.append(source)
+
+    vi_string = 'vi://{}:{}@{}/'.format(params['vcenter_user'],
+                                                   params['vcenter_passwd'], params['vcenter'])
+    if params.__contains__('folder') and params['folder']:
+        vi_string = vi_string + params['folder']
+
+    vi_string = vi_string + '/{}/host/{}/'.format(params['datacenter'], params['cluster'])
+
+    ovf_command.append(vi_string)
+    return ovf_command
+
+
+def get_target_params(params, target):
+    target_params = dict(params)
+    target_params.update((key, value) for key, value in target.items() if value is not None)
+    return target_params
+
+
+def run_ovftool(ovf_command, progress, log_path=None):
+    '''
+    Runs ovftool and reads its output while it runs, feeding each line to
+    progress and writing it to log_path if set. Returns (return code, last
+    lines of the output).
+    '''
+    output_tail = collections.deque(maxlen=OUTPUT_TAIL_LINES)
+    log_file = open(log_path, 'w') if log_path else None
+    try:
+        # Universal newlines, so the progress updates ovftool ends with a
+        # carriage return are read as lines too
+        process = subprocess.Popen(ovf_command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                   universal_newlines=True)
+        for line in process.stdout:
+            is_progress = progress.feed(line)
+            line = line.rstrip()
+            if not line:
+                continue
+            if not is_progress:
+                output_tail.append(line)
+            if log_file:
+                log_file.write(line + '\n')
+                log_file.flush()
+        process.stdout.close()
+        return process.wait(), list(output_tail)
+    finally:
+        if log_file:
+            log_file.close()
+
+
+def get_ovf_source(module):
+    '''
+    Returns (path of the OVA or OVF ovftool deploys from, size of the files
+    it uploads, None if unknown). A local file is
+    checked before connecting to vCenter: it must exist and declare the
+    deployment sizes to deploy. With ova_cache_dir, a local OVA is replaced
+    by its extracted OVF.
+    '''
+    source = '{}/{}'.format(module.params['path_to_ova'], module.params['ova_file'])
+    if is_remote_source(source):
+        return source, None
+    if not os.path.isfile(source):
+        module.fail_json(msg='OVA file {} not found'.format(source))
+    try:
+        if (module.params['ova_cache_dir'] and source.lower().endswith('.ova') and
+                not module.check_mode):
+            source = extract_ova(source, module.params['ova_cache_dir'])
+        ovf_descriptor = read_ovf_descriptor(source)
+        deployment_options = get_deployment_options(ovf_descriptor)
+        total_bytes = get_referenced_size(ovf_descriptor)
+    except Exception as err:
+        module.fail_json(msg='Failed to read the OVF descriptor of {}: {}'.format(source, err))
+
+    # The deployment size is only passed to ovftool with the external and
+    # transport port groups
+    if deployment_options and module.params['portgroup_ext']:
+        targets = module.params['targets'] or [{}]
+        deployment_sizes = set(get_target_params(module.params, target)['deployment_size']
+                               for target in targets)
+        invalid_sizes = sorted(deployment_sizes - set(deployment_options))
+        if invalid_sizes:
+            module.fail_json(msg='Deployment size {} not in the deployment options of {}: {}'.format(
+                             ', '.join(invalid_sizes), source, ', '.join(deployment_options)))
+    return source, total_bytes
+
+
+def deploy_target(target_params, source, total_bytes, log_dir):
+    ovf_command = get_ovf_command(target_params, source)
+    log_path = None
+    if log_dir:
+        try:
+            os.makedirs(log_dir)
+        except OSError:
+            # Created meanwhile by the deployment of another target
+            if not os.path.isdir(log_dir):
+                raise
+        log_path = os.path.join(log_dir, '{}.log'.format(target_params['vmname']))
+    progress = DeployProgress(target_params['vmname'], target_params['progress_file'], total_bytes)
+    try:
+        rc, output = run_ovftool(ovf_command, progress, log_path)
+    except Exception as err:
+        rc, output = None, [str(err)]
+    result = dict(vmname=target_params['vmname'], changed=rc == 0, failed=rc != 0,
+                  rc=rc, output=output, telemetry=progress.finish(rc))
+    if log_path:
+        result['log_file'] = log_path
+    return result
+
+
+def deploy_targets(module, content, source, total_bytes):
+    '''
+    Deploys the appliances of the targets param concurrently, at most
+    max_parallel_deployments at a time. All the deployments run to their
+    end, then the module fails if any of them failed.
+    '''
+    targets_params = [get_target_params(module.params, target)
+                      for target in module.params['targets']]
+    vm_names = [target_params['vmname'] for target_params in targets_params]
+    duplicate_vm_names = set(vm_name for vm_name in vm_names if vm_names.count(vm_name) > 1)
+    if duplicate_vm_names:
+        module.fail_json(msg='VM names must be unique across targets: {}'.format(
+                         ', '.join(sorted(duplicate_vm_names))))
+
+    existing_vm_names = get_obj_names(content, [vim.VirtualMachine])
+    results = [dict(vmname=target_params['vmname'], changed=False, failed=False,
+                    msg='A VM with the name {} was already present'.format(target_params['vmname']))
+               for target_params in targets_params
+               if target_params['vmname'] in existing_vm_names]
+    targets_params = [target_params for target_params in targets_params
+                      if target_params['vmname'] not in existing_vm_names]
+
+    if module.check_mode:
+        results.extend(dict(vmname=target_params['vmname'], changed=True,
+                            debug_out=get_ovf_command(target_params, source))
+                       for target_params in targets_params)
+        module.exit_json(changed=bool(targets_params), results=results)
+
+    log_dir = module.params['log_dir']
+    if targets_params:
+        with ThreadPoolExecutor(max_workers=min(len(targets_params),
+                                                module.params['max_parallel_deployments'])) as executor:
+            results.extend(executor.map(lambda target_params: deploy_target(target_params, source,
+                                                                            total_bytes, log_dir),
+                                        targets_params))
+
+    changed = any(result['changed'] for result in results)
+    failed_vm_names = [result['vmname'] for result in results if result['failed']]
+    if failed_vm_names:
+        module.fail_json(msg='Failed to deploy OVA for VMs: {}'.format(', '.join(failed_vm_names)),
+                         changed=changed, results=results)
+    module.exit_json(changed=changed, results=results)
+
+
 def main():
     module = AnsibleModule(
         argument_spec=dict(
@@ -231,13 +499,13 @@ def main():
             portgroup_ext=dict(type='str'),
             portgroup_transport=dict(type='str'),
             cluster=dict(required=True, type='str'),
-            vmname=dict(required=True, type='str'),
-            hostname=dict(required=True, type='str'),
+            vmname=dict(type='str'),
+            hostname=dict(type='str'),
             dns_server=dict(required=True, type='str'),
             ntp_server=dict(required=True, type='str'),
             dns_domain=dict(required=True, type='str'),
             gateway=dict(required=True, type='str'),
-            ip_address=dict(required=True, type='str'),
+            ip_address=dict(type='str'),
             netmask=dict(required=True, type='str'),
             admin_password=dict(required=True, type='str', no_log=True),
             cli_password=dict(required=True, type='str', no_log=True),
@@ -251,11 +519,25 @@ def main():
             vcenter_user=dict(required=True, type='str'),
             vcenter_passwd=dict(required=True, type='str', no_log=True),
             extra_para=dict(type='str'),
-            role=dict(required=True, type='str')
+            role=dict(type='str'),
+            targets=dict(type='list', elements='dict', options=TARGET_PARAMS),
+            max_parallel_deployments=dict(default=3, type='int'),
+            ova_cache_dir=dict(type='str'),
+            progress_file=dict(type='str'),
+            log_dir=dict(type='str')
         ),
         supports_check_mode=True,
-        required_together=[['portgroup_ext', 'portgroup_transport']]
+        required_together=[['portgroup_ext', 'portgroup_transport']],
+        required_one_of=[['vmname', 'targets']],
+        mutually_exclusive=[['vmname', 'targets']]
     )
+    if not module.params['targets']:
+        missing_params = [param for param in ('hostname', 'ip_address', 'role')
+                          if not module.params[param]]
+        if missing_params:
+            module.fail_json(msg='missing required arguments: {}'.format(', '.join(missing_params)))
+
+    source, total_bytes = get_ovf_source(module)
 
     try:
         content = connect_to_api(module.params['vcenter'], module.params['vcenter_user'],
@@ -265,68 +547,35 @@ def main():
     except requests.exceptions.ConnectionError:
         module.fail_json(msg='exception while connecting to vCenter, check hostname, FQDN or IP')
 
+    if module.params['targets']:
+        deploy_targets(module, content, source, total_bytes)
+
     nsx_manager_vm = find_virtual_machine(content, module.params['vmname'])
 
     if nsx_manager_vm:
         module.exit_json(changed=False, msg='A VM with the name {} was already present'.format(module.params['vmname']))
 
-    ovftool_exec = '{}/ovftool'.format(module.params['ovftool_path'])
-    ovf_command = [ovftool_exec]
-
-    ovf_base_options = ['--acceptAllEulas', '--skipManifestCheck', '--X:injectOvfEnv', '--powerOn', '--noSSLVerify',
-                        '--allowExtraConfig', '--diskMode={}'.format(module.params['disk_mode']),
-                        '--datastore={}'.format(module.params['datastore']),
-                        '--name={}'.format(module.params['vmname'])]
-    if module.params['portgroup_ext']:
-        ovf_base_options.extend(['--net:Network 0={}'.format(module.params['portgroup']),
-                                 '--net:Network 1={}'.format(module.params['portgroup_ext']),
-                                 '--net:Network 2={}'.format(module.params['portgroup_transport']),
-                                 '--net:Network 3={}'.format(module.params['portgroup']),
-                                 '--deploymentOption={}'.format(module.params['deployment_size'])])
-    else:
-        ovf_base_options.extend(['--network={}'.format(module.params['portgroup'])])
-    ovf_command.extend(ovf_base_options)
-
-    ovf_ext_prop = ['--prop:nsx_hostname={}'.format(module.params['hostname']),
-                   '--prop:nsx_dns1_0={}'.format(module.params['dns_server']),
-                   '--prop:nsx_domain_0={}'.format(module.params['dns_domain']),
-                   '--prop:nsx_ntp_0={}'.format(module.params['ntp_server']),
-                   '--prop:nsx_gateway_0={}'.format(module.params['gateway']),
-                   '--prop:nsx_ip_0={}'.format(module.params['ip_address']),
-                   '--prop:nsx_netmask_0={}'.format(module.params['netmask']),
-                   '--prop:nsx_passwd_0={}'.format(module.params['admin_password']),
-                   '--prop:nsx_cli_passwd_0={}'.format(module.params['cli_password']),
-                   '--prop:nsx_isSSHEnabled={}'.format(module.params['ssh_enabled']),
-                   '--prop:nsx_allowSSHRootLogin={}'.format(module.params['allow_ssh_root_login']),
-                   '--prop:nsx_role={}'.format(module.params['role'])]
-    ovf_command.extend(ovf_ext_prop)
-
-    if module.params['extra_para']:
-        ovf_command.extend(['--prop:extraPara={}'.format(module.params['extra_para'])])
-
-    ova_file = '{}/{}'.format(module.params['path_to_ova'], module.params['ova_file'])
-    ovf_command.append(ova_file)
-
-    vi_string = 'vi://{}:{}@{}/'.format(module.params['vcenter_user'],
-                                                   module.params['vcenter_passwd'], module.params['vcenter'])
-    if module.params.__contains__('folder') and module.params['folder']:
-        vi_string = vi_string + module.params['folder']
-
-    vi_string = vi_string + '/{}/host/{}/'.format(module.params['datacenter'], module.params['cluster'])
-
-    ovf_command.append(vi_string)
+    ovf_command = get_ovf_command(module.params, source)
 
     if module.check_mode:
         module.exit_json(changed=True, debug_out=ovf_command)
 
-    ova_tool_result = module.run_command(ovf_command)
+    result = deploy_target(module.params, source, total_bytes, module.params['log_dir'])
+    telemetry = result['telemetry']
+    ova_tool_result = (result['rc'], '\n'.join(result['output']), '')
 
     if ova_tool_result[0] != 0:
-        module.fail_json(msg='Failed to deploy OVA, error message from ovftool is: {}, the comand was {}'.format(ova_tool_result[1], ovf_command))
+        module.fail_json(msg='Failed to deploy OVA, error message from ovftool is: {}, the comand was {}'.format(
+                         '; '.join(telemetry['errors']) or ova_tool_result[1], ovf_command),
+                         telemetry=telemetry)
 
-    module.exit_json(changed=True, ova_tool_result=ova_tool_result)
+    module.exit_json(changed=True, ova_tool_result=ova_tool_result, telemetry=telemetry)
 
 from ansible.module_utils.basic import *
+from ansible.module_utils.vcenter_utils import get_obj_names, find_obj_by_name
+from ansible.module_utils.ova_cache import is_remote_source, extract_ova, read_ovf_descriptor, \
+    get_deployment_options, get_referenced_size
+from ansible.module_utils.ovftool_progress import DeployProgress
 
 if __name__ == '__main__':
     main()
@@ -93,6 +93,8 @@ RETURN = '''# '''
 import json
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.vmware_nsxt import vmware_argument_spec, request
+from ansible.module_utils.nsx_search import find_by_display_name
+from ansible.module_utils.diff_utils import is_update_required
 from ansible.module_utils._text import to_native
 
 
@@ -105,14 +107,6 @@ def get_edge_cluster_params(args=None):
             args.pop(key, None)
     return args
 
-def get_edge_clusters(module, manager_url, mgr_username, mgr_password, validate_certs):
-    try:
-      (rc, resp) = request(manager_url+ '/edge-clusters', headers=dict(Accept='application/json'),
-                      url_username=mgr_username, url_password=mgr_password, validate_certs=validate_certs, ignore_errors=True)
-    except Exception as err:
-      module.fail_json(msg='Error accessing edge clusters. Error [%s]' % (to_native(err)))
-    return resp
-
 def get_id_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, endpoint, display_name):
     try:
       (rc, resp) = request(manager_url+ endpoint, headers=dict(Accept='application/json'),
@@ -126,11 +120,12 @@ def get_id_from_display_name(module, manager_url, mgr_username, mgr_password, va
     module.fail_json(msg='No id exist with display name %s' % display_name)
 
 def get_edge_clusters_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, display_name):
-    edge_clusters = get_edge_clusters(module, manager_url, mgr_username, mgr_password, validate_certs)
-    for edge_cluster in edge_clusters['results']:
-        if edge_cluster.__contains__('display_name') and edge_cluster['display_name'] == display_name:
-            return edge_cluster
-    return None
+    try:
+      return find_by_display_name(manager_url, '/edge-clusters', mgr_username, mgr_password,
+                                  validate_certs, display_name,
+                                  resource_types=['EdgeCluster'])
+    except Exception as err:
+      module.fail_json(msg='Error accessing edge clusters. Error [%s]' % (to_native(err)))
 
 # def ordered(obj):
 #     if isinstance(obj, dict):
@@ -144,10 +139,9 @@ def check_for_update(module, manager_url, mgr_username, mgr_password, validate_c
     existing_edge_cluster = get_edge_clusters_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, edge_cluster_with_id['display_name'])
     if existing_edge_cluster is None:
         return False
-    if existing_edge_cluster.__contains__('members') and edge_cluster_with_id.__contains__('members') and \
-        existing_edge_cluster['members'] != edge_cluster_with_id['members']:
-        return True
-    return False
+    return is_update_required(existing_edge_cluster, edge_cluster_with_id,
+                              list_keys={'members': 'transport_node_id',
+                                         'cluster_profile_bindings': 'profile_id'})
 
 def update_params_with_id (module, manager_url, mgr_username, mgr_password, validate_certs, edge_cluster_params):
     if edge_cluster_params.__contains__('members'):
@@ -29,6 +29,7 @@ description: Returns information about the configured edge clusters, which enabl
 
 version_added: "2.7"
 author: Rahul Raghuvanshi
+extends_documentation_fragment: vmware_nsxt.facts_filter
 options:
     hostname:
         description: Deployed NSX manager hostname.
@@ -51,6 +52,17 @@ EXAMPLES = '''
     username: "admin"
     password: "Admin!23Admin"
     validate_certs: False
+
+- name: Get the members of an edge cluster
+  nsxt_edge_clusters_facts:
+    hostname: "10.192.167.137"
+    username: "admin"
+    password: "Admin!23Admin"
+    validate_certs: False
+    display_name: "edge-cluster-1"
+    fields:
+      - id
+      - members
 '''
 
 RETURN = '''# '''
@@ -58,10 +70,12 @@ RETURN = '''# '''
 import json
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.vmware_nsxt import vmware_argument_spec, request
+from ansible.module_utils.facts_filter import get_filter_argument_spec, has_filters, get_filtered_results
 from ansible.module_utils._text import to_native
 
 def main():
   argument_spec = vmware_argument_spec()
+  argument_spec.update(get_filter_argument_spec())
   module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
 
   mgr_hostname = module.params['hostname']
@@ -70,6 +84,15 @@ def main():
   validate_certs = module.params['validate_certs']
   manager_url = 'https://{}/api/v1'.format(mgr_hostname)
 
+  if has_filters(module.params):
+    try:
+      filtered = get_filtered_results(manager_url, '/edge-clusters', mgr_username, mgr_password,
+                                      validate_certs, module.params,
+                                      search_resource_types=['EdgeCluster'])
+    except Exception as err:
+      module.fail_json(msg='Error accessing list of edge cluster. Error [%s]' % (to_native(err)))
+    module.exit_json(changed=False, **filtered)
+
   changed = False
   try:
     (rc, resp) = request(manager_url+ '/edge-clusters', headers=dict(Accept='application/json'),
@@ -122,10 +122,9 @@ RETURN = '''# '''
 import json, time
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.vmware_nsxt import vmware_argument_spec, request
+from ansible.module_utils.nsx_search import find_by_display_name
+from ansible.module_utils.cert_thumbprint import get_cert_thumbprint
 from ansible.module_utils._text import to_native
-import ssl
-import socket
-import hashlib
 
 def get_fabric_compute_manager_params(args=None):
     args_to_remove = ['state', 'username', 'password', 'port', 'hostname', 'validate_certs']
@@ -137,41 +136,18 @@ def get_fabric_compute_manager_params(args=None):
     return args
 
 def get_thumb(module):
-    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    sock.settimeout(10)
-    wrappedSocket = ssl.wrap_socket(sock)
     try:
-      wrappedSocket.connect((module.params['server'], 443))
-    except:
+      return get_cert_thumbprint(module.params['server'])
+    except Exception:
       module.fail_json(msg='Connection error while fatching thumbprint for server [%s].' % module.params['server'])
-    else:
-      der_cert_bin = wrappedSocket.getpeercert(True)
-      pem_cert = ssl.DER_cert_to_PEM_cert(wrappedSocket.getpeercert(True))
-      print(pem_cert)
-
-      #Thumbprint
-      thumb_sha256 = hashlib.sha256(der_cert_bin).hexdigest()
-      wrappedSocket.close()
-      # The API call expects the Thumbprint in Uppercase. While the API call is fixed,
-      # below is a quick fix
-      thumbprint = ""
-      thumbprint = ':'.join(a+b for a,b in zip(thumb_sha256[::2], thumb_sha256[1::2]))
-      return thumbprint.upper()
 
-def get_fabric_compute_managers(module, manager_url, mgr_username, mgr_password, validate_certs):
+def get_compute_manager_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, display_name):
     try:
-      (rc, resp) = request(manager_url+ '/fabric/compute-managers', headers=dict(Accept='application/json'),
-                      url_username=mgr_username, url_password=mgr_password, validate_certs=validate_certs, ignore_errors=True)
+      return find_by_display_name(manager_url, '/fabric/compute-managers', mgr_username, mgr_password,
+                                  validate_certs, display_name,
+                                  resource_types=['ComputeManager'])
     except Exception as err:
       module.fail_json(msg='Error accessing fabric compute manager. Error [%s]' % (to_native(err)))
-    return resp
-
-def get_compute_manager_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, display_name):
-    compute_managers = get_fabric_compute_managers(module, manager_url, mgr_username, mgr_password, validate_certs)
-    for compute_manager in compute_managers['results']:
-        if compute_manager.__contains__('display_name') and compute_manager['display_name'] == display_name:
-            return compute_manager
-    return None
 
 def wait_till_create(id, module, manager_url, mgr_username, mgr_password, validate_certs):
     try:
@@ -241,7 +217,7 @@ def main():
   validate_certs = module.params['validate_certs']
   display_name = module.params['display_name']
   manager_url = 'https://{}/api/v1'.format(mgr_hostname)
-  if not fabric_compute_manager_params['credential'].__contains__('thumbprint'):
+  if not fabric_compute_manager_params['credential'].get('thumbprint'):
       fabric_compute_manager_params['credential']['thumbprint'] = get_thumb(module)
 
   compute_manager_dict = get_compute_manager_from_display_name (module, manager_url, mgr_username, mgr_password, validate_certs, display_name)
@@ -348,6 +348,7 @@ RETURN = '''# '''
 import json, time
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.vmware_nsxt import vmware_argument_spec, request
+from ansible.module_utils.nsx_search import find_by_display_name
 from ansible.module_utils._text import to_native
 
 def get_fabric_params(args=None):
@@ -359,20 +360,13 @@ def get_fabric_params(args=None):
             args.pop(key, None)
     return args
 
-def get_fabric_nodes(module, manager_url, mgr_username, mgr_password, validate_certs):
+def get_fabric_node_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, display_name):
     try:
-      (rc, resp) = request(manager_url+ '/fabric/nodes', headers=dict(Accept='application/json'),
-                      url_username=mgr_username, url_password=mgr_password, validate_certs=validate_certs, ignore_errors=True)
+      return find_by_display_name(manager_url, '/fabric/nodes', mgr_username, mgr_password,
+                                  validate_certs, display_name,
+                                  resource_types=['HostNode', 'EdgeNode'])
     except Exception as err:
       module.fail_json(msg='Error accessing fabric node. Error [%s]' % (to_native(err)))
-    return resp
-
-def get_fabric_node_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, display_name):
-    fabric_nodes = get_fabric_nodes(module, manager_url, mgr_username, mgr_password, validate_certs)
-    for fabric_node in fabric_nodes['results']:
-        if fabric_node.__contains__('display_name') and fabric_node['display_name'] == display_name:
-            return fabric_node
-    return None
 
 def get_id_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, endpoint, display_name, exit_if_not_found=True):
     try:
@@ -27,6 +27,7 @@ description: Returns information about all fabric nodes (hosts and edges).
              API to list all fabric nodes.
 version_added: "2.7"
 author: Rahul Raghuvanshi
+extends_documentation_fragment: vmware_nsxt.facts_filter
 options:
     hostname:
         description: Deployed NSX manager hostname.
@@ -40,7 +41,6 @@ options:
         description: The password to authenticate with the NSX manager.
         required: true
         type: str
-
 '''
 
 EXAMPLES = '''
@@ -50,6 +50,19 @@ EXAMPLES = '''
       username: "admin"
       password: "Admin!23Admin"
       validate_certs: False
+
+- name: List the IP addresses of the host nodes
+  nsxt_fabric_nodes_facts:
+      hostname: "10.192.167.137"
+      username: "admin"
+      password: "Admin!23Admin"
+      validate_certs: False
+      resource_type: "HostNode"
+      fields:
+        - id
+        - display_name
+        - ip_addresses
+        - os_type
 '''
 
 RETURN = '''# '''
@@ -57,10 +70,12 @@ RETURN = '''# '''
 import json
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.vmware_nsxt import vmware_argument_spec, request
+from ansible.module_utils.facts_filter import get_filter_argument_spec, has_filters, get_filtered_results
 from ansible.module_utils._text import to_native
 
 def main():
   argument_spec = vmware_argument_spec()
+  argument_spec.update(get_filter_argument_spec())
 
   module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
 
@@ -71,6 +86,14 @@ def main():
 
   manager_url = 'https://{}/api/v1'.format(mgr_hostname)
 
+  if has_filters(module.params):
+    try:
+      filtered = get_filtered_results(manager_url, '/fabric/nodes', mgr_username, mgr_password,
+                                      validate_certs, module.params)
+    except Exception as err:
+      module.fail_json(msg='Error accessing fabric node. Error [%s]' % (to_native(err)))
+    module.exit_json(changed=False, **filtered)
+
   changed = False
   try:
     (rc, resp) = request(manager_url+ '/fabric/nodes', headers=dict(Accept='application/json'),
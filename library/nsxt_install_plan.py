@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+#
+# Copyright 2020 VMware, Inc.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING,
+# BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: nsxt_install_plan
+short_description: 'Dry run of the whole NSX install'
+description: "Reads the current state of the NSX Manager once and compares it
+              with the variables file used by the install playbooks. Returns
+              the action (create, update, delete or no-op) every playbook
+              would take on each object. Nothing is changed on the manager."
+version_added: '2.7'
+author: 'madhukark'
+options:
+    hostname:
+        description: 'Deployed NSX manager hostname.'
+        required: true
+        type: str
+    username:
+        description: 'The username to authenticate with the NSX manager.'
+        required: true
+        type: str
+    password:
+        description: 'The password to authenticate with the NSX manager.'
+        required: true
+        type: str
+    vars_file:
+        description: 'Path of the variables file generated by nsx-install.py'
+        required: true
+        type: str
+    plan_file:
+        description: 'If set, the plan is also written to this file as JSON'
+        required: false
+        type: str
+'''
+
+EXAMPLES = '''
+- name: Compute the install plan
+  nsxt_install_plan:
+      hostname: "10.192.167.137"
+      username: "admin"
+      password: "Admin!23Admin"
+      validate_certs: False
+      vars_file: "nsx_pacific_vars.yml"
+      plan_file: "nsx-install-plan.json"
+'''
+
+RETURN = '''# '''
+
+import json
+import socket
+import yaml
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.vmware_nsxt import vmware_argument_spec
+from ansible.module_utils.nsxt_install_plan import (fetch_install_state, compute_install_plan,
+                                                     summarize_install_plan)
+from ansible.module_utils.six.moves.urllib.error import URLError
+from ansible.module_utils._text import to_native
+
+
+def main():
+    argument_spec = vmware_argument_spec()
+    argument_spec.update(vars_file=dict(type='str', required=True),
+                         plan_file=dict(type='str', required=False))
+
+    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
+    mgr_hostname = module.params['hostname']
+    mgr_username = module.params['username']
+    mgr_password = module.params['password']
+    validate_certs = module.params['validate_certs']
+    plan_file = module.params['plan_file']
+
+    manager_url = 'https://{}/api/v1'.format(mgr_hostname)
+    policy_url = 'https://{}/policy/api/v1'.format(mgr_hostname)
+
+    try:
+        with open(module.params['vars_file']) as vars_file:
+            nsx_vars = yaml.safe_load(vars_file)
+    except Exception as err:
+        module.fail_json(msg='Error reading variables file %s. Error [%s]'
+                             % (module.params['vars_file'], to_native(err)))
+
+    message = 'Install plan computed against NSX Manager %s.' % mgr_hostname
+    try:
+        install_state = fetch_install_state(manager_url, policy_url, mgr_username,
+                                            mgr_password, validate_certs,
+                                            nsx_vars=nsx_vars)
+    except (URLError, socket.error) as err:
+        # The first node is not deployed yet. Everything will be created.
+        install_state = {}
+        message = ('NSX Manager %s is not reachable [%s]. All objects will be'
+                   ' created.' % (mgr_hostname, to_native(err)))
+    except Exception as err:
+        module.fail_json(msg='Error retrieving the current state of NSX Manager.'
+                             ' Error [%s]' % to_native(err))
+
+    plan = compute_install_plan(nsx_vars, install_state)
+    summary = summarize_install_plan(plan)
+
+    if plan_file:
+        try:
+            with open(plan_file, 'w') as f:
+                json.dump(dict(message=message, summary=summary, plan=plan), f, indent=2)
+        except Exception as err:
+            module.fail_json(msg='Error writing plan file %s. Error [%s]'
+                                 % (plan_file, to_native(err)))
+
+    module.exit_json(changed=False, message=message, summary=summary, plan=plan)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+#
+# Copyright 2020 VMware, Inc.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING,
+# BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: nsxt_inventory_drift
+short_description: 'Reports the changes of the NSX Manager inventory since the last run'
+description: "Compares the inventory of the NSX Manager with the snapshot
+              saved by the previous run, then saves the current inventory
+              as the new snapshot. Only the objects modified since the most
+              recent object of the snapshot are read: each collection is
+              read sorted by _last_modified_time, most recent first, and the
+              reading stops at the first object the snapshot already has.
+              Deleted objects are looked for, by id only, when the size of a
+              collection does not add up. The collections without
+              modification time, or not sortable by it, are read fully.
+              Without a snapshot, the whole inventory is read and saved as
+              the baseline."
+version_added: '2.7'
+author: 'madhukark'
+options:
+    hostname:
+        description: 'Deployed NSX manager hostname.'
+        required: true
+        type: str
+    username:
+        description: 'The username to authenticate with the NSX manager.'
+        required: true
+        type: str
+    password:
+        description: 'The password to authenticate with the NSX manager.'
+        required: true
+        type: str
+    snapshot_file:
+        description: 'Snapshot of the previous run, written by this module or
+                      nsxt_inventory_snapshot. It is replaced by the current
+                      inventory, except in check mode.'
+        required: true
+        type: str
+    changes_file:
+        description: 'If set, the changes are also written to this file as
+                      JSON, except in check mode'
+        required: false
+        type: str
+    max_concurrent_requests:
+        description: 'Maximum number of collections read at the same time'
+        required: false
+        default: 8
+        type: int
+'''
+
+EXAMPLES = '''
+- name: Report the changes since the last drift check
+  nsxt_inventory_drift:
+      hostname: "10.192.167.137"
+      username: "admin"
+      password: "Admin!23Admin"
+      validate_certs: False
+      snapshot_file: "nsx-inventory.json.gz"
+      changes_file: "nsx-inventory-changes.json"
+'''
+
+RETURN = '''# '''
+
+import json
+import os
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.vmware_nsxt import vmware_argument_spec
+from ansible.module_utils.inventory_fetch import fetch_inventory, fetch_inventory_changes
+from ansible.module_utils.inventory_snapshot import (build_snapshot, read_snapshot, write_snapshot,
+                                                     diff_snapshots, summarize_snapshot)
+from ansible.module_utils._text import to_native
+
+
+def fail_on_fetch_errors(module, errors):
+    if errors:
+        # The snapshot is kept, the next run compares with it again
+        module.fail_json(msg='Error reading the inventory of NSX Manager. Errors: %s'
+                             % ', '.join('%s [%s]' % (name, error)
+                                         for name, error in sorted(errors.items())))
+
+
+def save_snapshot(module, snapshot_file, snapshot):
+    try:
+        write_snapshot(snapshot_file, snapshot)
+    except Exception as err:
+        module.fail_json(msg='Error writing snapshot file %s. Error [%s]'
+                             % (snapshot_file, to_native(err)))
+
+
+def main():
+    argument_spec = vmware_argument_spec()
+    argument_spec.update(snapshot_file=dict(type='str', required=True),
+                         changes_file=dict(type='str', required=False),
+                         max_concurrent_requests=dict(type='int', required=False, default=8))
+
+    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
+    mgr_hostname = module.params['hostname']
+    mgr_username = module.params['username']
+    mgr_password = module.params['password']
+    validate_certs = module.params['validate_certs']
+    snapshot_file = module.params['snapshot_file']
+    changes_file = module.params['changes_file']
+    max_concurrent_requests = module.params['max_concurrent_requests']
+    if max_concurrent_requests < 1:
+        module.fail_json(msg='max_concurrent_requests must be at least 1')
+
+    manager_url = 'https://{}/api/v1'.format(mgr_hostname)
+    policy_url = 'https://{}/policy/api/v1'.format(mgr_hostname)
+
+    if not os.path.exists(snapshot_file):
+        results, errors = fetch_inventory(manager_url, policy_url, mgr_username, mgr_password,
+                                          validate_certs, max_concurrent_requests)
+        fail_on_fetch_errors(module, errors)
+        snapshot = build_snapshot(mgr_hostname, results)
+        if not module.check_mode:
+            save_snapshot(module, snapshot_file, snapshot)
+        module.exit_json(changed=False, baseline=True, drifted=False, changes={},
+                         summary=summarize_snapshot(snapshot), created=snapshot['created'])
+
+    try:
+        previous_snapshot = read_snapshot(snapshot_file)
+    except Exception as err:
+        module.fail_json(msg='Error reading snapshot file %s. Error [%s]'
+                             % (snapshot_file, to_native(err)))
+    if previous_snapshot['manager'] != mgr_hostname:
+        module.fail_json(msg='Snapshot file %s was taken from NSX Manager %s, not %s'
+                             % (snapshot_file, previous_snapshot['manager'], mgr_hostname))
+
+    results, incremental, errors = fetch_inventory_changes(
+        manager_url, policy_url, mgr_username, mgr_password, validate_certs,
+        max_concurrent_requests, previous_snapshot)
+    fail_on_fetch_errors(module, errors)
+    snapshot = build_snapshot(mgr_hostname, results)
+    changes, summary = diff_snapshots(previous_snapshot, snapshot)
+    # In check mode, the drift is reported again by the next run
+    if not module.check_mode:
+        save_snapshot(module, snapshot_file, snapshot)
+
+    drift = dict(since=previous_snapshot['created'], created=snapshot['created'],
+                 drifted=bool(changes), changes=changes, summary=summary,
+                 incremental=incremental)
+    if changes_file and not module.check_mode:
+        try:
+            with open(changes_file, 'w') as f:
+                json.dump(drift, f, indent=2)
+        except Exception as err:
+            module.fail_json(msg='Error writing changes file %s. Error [%s]'
+                                 % (changes_file, to_native(err)))
+
+    module.exit_json(changed=False, baseline=False, **drift)
+
+
+if __name__ == '__main__':
+    main()
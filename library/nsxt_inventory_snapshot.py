@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+#
+# Copyright 2020 VMware, Inc.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING,
+# BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: nsxt_inventory_snapshot
+short_description: 'Saves the inventory of the NSX Manager to a snapshot file'
+description: "Reads the compute managers, fabric nodes, transport nodes and
+              their states, transport zones, edge clusters, transport node
+              profiles and collections, and the policy IP pools, Tier-0 and
+              Tier-1 gateways and segments. The collections are read
+              concurrently, each one page by page. They are saved in one
+              gzip compressed, versioned snapshot file that later jobs can
+              load instead of calling the manager again."
+version_added: '2.7'
+author: 'madhukark'
+options:
+    hostname:
+        description: 'Deployed NSX manager hostname.'
+        required: true
+        type: str
+    username:
+        description: 'The username to authenticate with the NSX manager.'
+        required: true
+        type: str
+    password:
+        description: 'The password to authenticate with the NSX manager.'
+        required: true
+        type: str
+    snapshot_file:
+        description: 'Path the snapshot is written to. It is not written in
+                      check mode.'
+        required: true
+        type: str
+    max_concurrent_requests:
+        description: 'Maximum number of collections read at the same time'
+        required: false
+        default: 8
+        type: int
+'''
+
+EXAMPLES = '''
+- name: Save the inventory of NSX Manager
+  nsxt_inventory_snapshot:
+      hostname: "10.192.167.137"
+      username: "admin"
+      password: "Admin!23Admin"
+      validate_certs: False
+      snapshot_file: "nsx-inventory.json.gz"
+'''
+
+RETURN = '''# '''
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.vmware_nsxt import vmware_argument_spec
+from ansible.module_utils.inventory_fetch import fetch_inventory
+from ansible.module_utils.inventory_snapshot import build_snapshot, write_snapshot, summarize_snapshot
+from ansible.module_utils._text import to_native
+
+
+def main():
+    argument_spec = vmware_argument_spec()
+    argument_spec.update(snapshot_file=dict(type='str', required=True),
+                         max_concurrent_requests=dict(type='int', required=False, default=8))
+
+    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
+    mgr_hostname = module.params['hostname']
+    mgr_username = module.params['username']
+    mgr_password = module.params['password']
+    validate_certs = module.params['validate_certs']
+    snapshot_file = module.params['snapshot_file']
+    if module.params['max_concurrent_requests'] < 1:
+        module.fail_json(msg='max_concurrent_requests must be at least 1')
+
+    manager_url = 'https://{}/api/v1'.format(mgr_hostname)
+    policy_url = 'https://{}/policy/api/v1'.format(mgr_hostname)
+
+    results, errors = fetch_inventory(manager_url, policy_url, mgr_username, mgr_password,
+                                      validate_certs, module.params['max_concurrent_requests'])
+    if errors:
+        # A partial snapshot would show the missing collections as emptied
+        module.fail_json(msg='Error reading the inventory of NSX Manager. Errors: %s'
+                             % ', '.join('%s [%s]' % (name, error)
+                                         for name, error in sorted(errors.items())))
+
+    snapshot = build_snapshot(mgr_hostname, results)
+    if not module.check_mode:
+        try:
+            write_snapshot(snapshot_file, snapshot)
+        except Exception as err:
+            module.fail_json(msg='Error writing snapshot file %s. Error [%s]'
+                                 % (snapshot_file, to_native(err)))
+
+    module.exit_json(changed=False, snapshot_file=snapshot_file,
+                     version=snapshot['version'], created=snapshot['created'],
+                     summary=summarize_snapshot(snapshot))
+
+
+if __name__ == '__main__':
+    main()
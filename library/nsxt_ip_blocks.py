@@ -74,6 +74,7 @@ RETURN = '''# '''
 import json, time
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.vmware_nsxt import vmware_argument_spec, request
+from ansible.module_utils.nsx_search import find_by_display_name
 from ansible.module_utils._text import to_native
 
 def get_ip_block_params(args=None):
@@ -85,20 +86,13 @@ def get_ip_block_params(args=None):
             args.pop(key, None)
     return args
 
-def get_ip_blocks(module, manager_url, mgr_username, mgr_password, validate_certs):
+def get_ip_block_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, display_name):
     try:
-      (rc, resp) = request(manager_url+ '/pools/ip-blocks', headers=dict(Accept='application/json'),
-                      url_username=mgr_username, url_password=mgr_password, validate_certs=validate_certs, ignore_errors=True)
+      return find_by_display_name(manager_url, '/pools/ip-blocks', mgr_username, mgr_password,
+                                  validate_certs, display_name,
+                                  resource_types=['IpBlock'])
     except Exception as err:
       module.fail_json(msg='Error accessing ip blocks. Error [%s]' % (to_native(err)))
-    return resp
-
-def get_ip_block_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, display_name):
-    ip_blocks = get_ip_blocks(module, manager_url, mgr_username, mgr_password, validate_certs)
-    for ip_block in ip_blocks['results']:
-        if ip_block.__contains__('display_name') and ip_block['display_name'] == display_name:
-            return ip_block
-    return None
 
 def check_for_update(module, manager_url, mgr_username, mgr_password, validate_certs, ip_block_params):
     existing_ip_block = get_ip_block_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, ip_block_params['display_name'])
@@ -10,14 +10,6 @@
 # WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
 # EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
-import json
-from ansible.module_utils.basic import AnsibleModule
-from ansible.module_utils.vmware_nsxt import vmware_argument_spec, request
-from ansible.module_utils.urls import open_url, fetch_url
-from ansible.module_utils._text import to_native
-from ansible.module_utils.six.moves.urllib.error import HTTPError
-
-
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
@@ -35,6 +27,7 @@ description: Returns information about configured IP address blocks. Information
 
 version_added: "2.7"
 author: Rahul Raghuvanshi
+extends_documentation_fragment: vmware_nsxt.facts_filter
 options:
     hostname:
         description: Deployed NSX manager hostname.
@@ -48,7 +41,6 @@ options:
         description: The password to authenticate with the NSX manager.
         required: true
         type: str
-
 '''
 
 EXAMPLES = '''
@@ -58,12 +50,32 @@ EXAMPLES = '''
     username: "admin"
     password: "Admin!23Admin"
     validate_certs: False
+
+- name: Get the CIDR of an IP block
+  nsxt_ip_blocks_facts:
+    hostname: "10.192.167.137"
+    username: "admin"
+    password: "Admin!23Admin"
+    validate_certs: False
+    display_name: "ip-block-1"
+    fields:
+      - id
+      - cidr
 '''
 
 RETURN = '''# '''
 
+import json
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.vmware_nsxt import vmware_argument_spec, request
+from ansible.module_utils.facts_filter import get_filter_argument_spec, has_filters, get_filtered_results
+from ansible.module_utils.urls import open_url, fetch_url
+from ansible.module_utils._text import to_native
+from ansible.module_utils.six.moves.urllib.error import HTTPError
+
 def main():
   argument_spec = vmware_argument_spec()
+  argument_spec.update(get_filter_argument_spec())
   #raise ValueError(argument_spec)
   module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
 
@@ -74,6 +86,14 @@ def main():
   #raise ValueError(argument_spec)
   manager_url = 'https://{}/api/v1'.format(mgr_hostname)
 
+  if has_filters(module.params):
+    try:
+      filtered = get_filtered_results(manager_url, '/pools/ip-blocks', mgr_username, mgr_password,
+                                      validate_certs, module.params)
+    except Exception as err:
+      module.fail_json(msg='Error accessing list of ip blocks. Error [%s]' % (to_native(err)))
+    module.exit_json(changed=False, **filtered)
+
   changed = False
   try:
     (rc, resp) = request(manager_url+ '/pools/ip-blocks', headers=dict(Accept='application/json'),
@@ -83,9 +83,12 @@ EXAMPLES = '''
 RETURN = '''# '''
 
 
-import json, time
+import json
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.vmware_nsxt import vmware_argument_spec, request
+from ansible.module_utils.nsx_search import find_by_display_name
+from ansible.module_utils.common_utils import wait_for_write_confirmation
+from ansible.module_utils.diff_utils import is_update_required
 from ansible.module_utils._text import to_native
 
 def get_ip_pool_params(args=None):
@@ -97,20 +100,13 @@ def get_ip_pool_params(args=None):
             args.pop(key, None)
     return args
 
-def get_ip_pools(module, manager_url, mgr_username, mgr_password, validate_certs):
+def get_ip_pool_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, display_name):
     try:
-      (rc, resp) = request(manager_url+ '/pools/ip-pools', headers=dict(Accept='application/json'),
-                      url_username=mgr_username, url_password=mgr_password, validate_certs=validate_certs, ignore_errors=True)
+      return find_by_display_name(manager_url, '/pools/ip-pools', mgr_username, mgr_password,
+                                  validate_certs, display_name,
+                                  resource_types=['IpPool'])
     except Exception as err:
       module.fail_json(msg='Error accessing ip pools. Error [%s]' % (to_native(err)))
-    return resp
-
-def get_ip_pool_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, display_name):
-    ip_pools = get_ip_pools(module, manager_url, mgr_username, mgr_password, validate_certs)
-    for ip_pool in ip_pools['results']:
-        if ip_pool.__contains__('display_name') and ip_pool['display_name'] == display_name:
-            return ip_pool
-    return None
 
 # def ordered(obj):
 #     if isinstance(obj, dict):
@@ -124,9 +120,8 @@ def check_for_update(module, manager_url, mgr_username, mgr_password, validate_c
     existing_ip_pool = get_ip_pool_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, ip_pool_params['display_name'])
     if existing_ip_pool is None:
         return False
-    if  existing_ip_pool.__contains__('subnets') and ip_pool_params.__contains__('subnets') and existing_ip_pool['subnets'] != ip_pool_params['subnets']:
-        return True
-    return False
+    return is_update_required(existing_ip_pool, ip_pool_params,
+                              list_keys={'subnets': 'cidr'})
 
 def main():
   argument_spec = vmware_argument_spec()
@@ -169,7 +164,8 @@ def main():
       except Exception as err:
           module.fail_json(msg="Failed to add ip pool. Request body [%s]. Error[%s]." % (request_data, to_native(err)))
 
-      time.sleep(5)
+      wait_for_write_confirmation(manager_url, '/pools/ip-pools/%s' % resp["id"], mgr_username, mgr_password,
+                                  validate_certs, revision=resp.get("_revision"))
       module.exit_json(changed=True, id=resp["id"], body= str(resp), message="IP pool with display name %s created." % module.params['display_name'])
     else:
       if module.check_mode:
@@ -182,7 +178,8 @@ def main():
                                 url_username=mgr_username, url_password=mgr_password, validate_certs=validate_certs, ignore_errors=True)
       except Exception as err:
           module.fail_json(msg="Failed to update ip pool with id %s. Request body [%s]. Error[%s]." % (id, request_data, to_native(err)))
-      time.sleep(5)
+      wait_for_write_confirmation(manager_url, '/pools/ip-pools/%s' % id, mgr_username, mgr_password,
+                                  validate_certs, revision=resp.get("_revision"))
       module.exit_json(changed=True, id=resp["id"], body= str(resp), message="ip pool with pool id %s updated." % id)
 
   elif state == 'absent':
@@ -198,7 +195,8 @@ def main():
     except Exception as err:
         module.fail_json(msg="Failed to delete ip pool with id %s. Error[%s]." % (id, to_native(err)))
 
-    time.sleep(5)
+    wait_for_write_confirmation(manager_url, '/pools/ip-pools/%s' % id, mgr_username, mgr_password,
+                                validate_certs, deleted=True)
     module.exit_json(changed=True, object_name=id, message="ip pool with pool id %s deleted." % id)
 
 
@@ -29,6 +29,7 @@ description: Returns information about the configured IP address pools. Informat
 
 version_added: "2.7"
 author: Rahul Raghuvanshi
+extends_documentation_fragment: vmware_nsxt.facts_filter
 options:
     hostname:
         description: Deployed NSX manager hostname.
@@ -42,7 +43,6 @@ options:
         description: The password to authenticate with the NSX manager.
         required: true
         type: str
-
 '''
 
 EXAMPLES = '''
@@ -52,6 +52,19 @@ EXAMPLES = '''
     username: "admin"
     password: "Admin!23Admin"
     validate_certs: False
+
+- name: List the subnets of the IP pools tagged for production
+  nsxt_ip_pools_facts:
+    hostname: "10.192.167.137"
+    username: "admin"
+    password: "Admin!23Admin"
+    validate_certs: False
+    tag_scope: "env"
+    tag_value: "prod"
+    fields:
+      - id
+      - display_name
+      - subnets
 '''
 
 RETURN = '''# '''
@@ -59,12 +72,14 @@ RETURN = '''# '''
 import json
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.vmware_nsxt import vmware_argument_spec, request
+from ansible.module_utils.facts_filter import get_filter_argument_spec, has_filters, get_filtered_results
 from ansible.module_utils.urls import open_url, fetch_url
 from ansible.module_utils._text import to_native
 from ansible.module_utils.six.moves.urllib.error import HTTPError
 
 def main():
   argument_spec = vmware_argument_spec()
+  argument_spec.update(get_filter_argument_spec())
 
   module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
 
@@ -75,6 +90,15 @@ def main():
 
   manager_url = 'https://{}/api/v1'.format(mgr_hostname)
 
+  if has_filters(module.params):
+    try:
+      filtered = get_filtered_results(manager_url, '/pools/ip-pools', mgr_username, mgr_password,
+                                      validate_certs, module.params,
+                                      search_resource_types=['IpPool'])
+    except Exception as err:
+      module.fail_json(msg='Error accessing list of ip pools. Error [%s]' % (to_native(err)))
+    module.exit_json(changed=False, **filtered)
+
   changed = False
   try:
     (rc, resp) = request(manager_url+ '/pools/ip-pools', headers=dict(Accept='application/json'),
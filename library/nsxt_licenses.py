@@ -70,9 +70,10 @@ EXAMPLES = '''
 
 RETURN = '''# '''
 
-import json, time
+import json
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.vmware_nsxt import vmware_argument_spec, request
+from ansible.module_utils.common_utils import wait_for_write_confirmation
 from ansible.module_utils._text import to_native
 
 def get_license_params(args=None):
@@ -124,7 +125,8 @@ def main():
     except Exception as err:
         module.fail_json(msg="Failed to add license. Request body [%s]. Error[%s]." % (request_data, to_native(err)))
 
-    time.sleep(5)
+    wait_for_write_confirmation(manager_url, '/licenses/%s' % module.params['license_key'],
+                                mgr_username, mgr_password, validate_certs)
     module.exit_json(changed=True, result=resp, message="license with license key %s created." % module.params['license_key'])
 
   elif state == 'absent':
@@ -138,7 +140,8 @@ def main():
     except Exception as err:
       module.fail_json(msg="Failed to delete license with id %s. Error[%s]." % (id, to_native(err)))
 
-    time.sleep(5)
+    wait_for_write_confirmation(manager_url, '/licenses/%s' % id, mgr_username, mgr_password,
+                                validate_certs, deleted=True)
     module.exit_json(changed=True, object_name=id, message="license with license key %s deleted." % id)
 
 
@@ -0,0 +1,362 @@
+#!/usr/bin/env python
+#
+# Copyright 2020 VMware, Inc.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING,
+# BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: nsxt_logical_ports_bulk
+short_description: 'Creates, updates or deletes many logical or segment ports'
+description: "Applies a list of port specs in one task. The existing ports
+              are retrieved once and each spec is compared with them, so only
+              the ports to be created, updated or deleted are submitted.
+              With the manager API, the logical ports are submitted
+              concurrently. With the policy API, the segment ports are
+              submitted in batches with the hierarchical API, one PATCH of
+              /infra per batch. A failed port does not stop the others; the
+              module fails at the end if any port failed."
+version_added: '2.7'
+author: 'madhukark'
+options:
+    hostname:
+        description: 'Deployed NSX manager hostname.'
+        required: true
+        type: str
+    username:
+        description: 'The username to authenticate with the NSX manager.'
+        required: true
+        type: str
+    password:
+        description: 'The password to authenticate with the NSX manager.'
+        required: true
+        type: str
+    api:
+        description: "API the ports are managed with. 'manager' for logical
+                      ports, 'policy' for the ports of segments under
+                      /infra/segments."
+        required: false
+        default: 'manager'
+        choices: ['manager', 'policy']
+        type: str
+    ports:
+        description: "List of port specs, matched with the existing ports by
+                      display_name. With the manager API, a spec takes the
+                      params of nsxt_logical_ports: logical_switch_name,
+                      admin_state, attachment, switching_profiles,
+                      address_bindings and so on. With the policy API, a spec
+                      takes segment_id, id (display_name if not set),
+                      admin_state, attachment, address_bindings, description
+                      and tags."
+        required: true
+        type: list
+    max_concurrent_requests:
+        description: 'Max logical port requests sent at the same time'
+        required: false
+        default: 8
+        type: int
+    batch_size:
+        description: 'Max segment ports per hierarchical API request'
+        required: false
+        default: 500
+        type: int
+    state:
+        choices:
+        - present
+        - absent
+        description: "State can be either 'present' or 'absent'.
+                     'present' is used to create or update the ports.
+                     'absent' is used to delete the ports."
+        required: true
+'''
+
+EXAMPLES = '''
+- name: Create logical ports for the VMs
+  nsxt_logical_ports_bulk:
+      hostname: "10.192.167.137"
+      username: "admin"
+      password: "Admin!23Admin"
+      validate_certs: False
+      ports:
+        - display_name: "vm-1-port"
+          logical_switch_name: "LS1"
+          admin_state: "UP"
+          attachment:
+            attachment_type: "VIF"
+            id: "vif-1"
+        - display_name: "vm-2-port"
+          logical_switch_name: "LS1"
+          admin_state: "UP"
+          attachment:
+            attachment_type: "VIF"
+            id: "vif-2"
+      state: "present"
+
+- name: Create segment ports for the VMs
+  nsxt_logical_ports_bulk:
+      hostname: "10.192.167.137"
+      username: "admin"
+      password: "Admin!23Admin"
+      validate_certs: False
+      api: "policy"
+      ports:
+        - display_name: "vm-1-port"
+          segment_id: "web-segment"
+          attachment:
+            id: "vif-1"
+      state: "present"
+'''
+
+RETURN = '''# '''
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.vmware_nsxt import vmware_argument_spec, request
+from ansible.module_utils.common_utils import ReferenceResolver, get_paginated_results
+from ansible.module_utils.diff_utils import is_update_required
+from ansible.module_utils._text import to_native
+
+LOGICAL_PORT_IGNORE_PATHS = ('attachment.context.transport_node_name',)
+LOGICAL_PORT_LIST_KEYS = {'switching_profile_ids': 'key'}
+
+
+def get_port_result(display_name, action, port_id=None, error=None):
+    result = dict(display_name=display_name, action=action, id=port_id,
+                  changed=action in ('created', 'updated', 'deleted'), failed=error is not None)
+    if error is not None:
+        result['msg'] = error
+    return result
+
+
+def update_logical_ports_with_ids(module, manager_url, mgr_username, mgr_password,
+                                  validate_certs, ports):
+    '''
+    Replaces the names referenced by the logical port specs with their ids.
+    Each referenced collection is retrieved once for all the ports.
+    '''
+    resolver = ReferenceResolver(module, manager_url, mgr_username, mgr_password, validate_certs)
+    for port in ports:
+        resolver.add('/logical-switches', port.pop('logical_switch_name', None),
+                     port, 'logical_switch_id')
+        switching_profile_ids = []
+        for switching_profile in port.pop('switching_profiles', None) or []:
+            profile_obj = dict(key=switching_profile['type'])
+            resolver.add('/host-switch-profiles', switching_profile['name'], profile_obj, 'value')
+            switching_profile_ids.append(profile_obj)
+        port['switching_profile_ids'] = switching_profile_ids
+        context = (port.get('attachment') or {}).get('context') or {}
+        if 'transport_node_name' in context:
+            resolver.add('/transport-nodes', context['transport_node_name'],
+                         context, 'transport_node_uuid')
+    resolver.resolve()
+    return ports
+
+
+def get_port_action(state, port, existing_port, **diff_options):
+    if state == 'absent':
+        return 'deleted' if existing_port else 'absent'
+    if existing_port is None:
+        return 'created'
+    if is_update_required(existing_port, port, **diff_options):
+        return 'updated'
+    return 'unchanged'
+
+
+def apply_logical_port(manager_url, mgr_username, mgr_password, validate_certs,
+                       headers, action, port, existing_port):
+    display_name = port['display_name']
+    port_id = existing_port and existing_port['id']
+    try:
+        if action == 'deleted':
+            request(manager_url + '/logical-ports/%s' % port_id, method='DELETE',
+                    url_username=mgr_username, url_password=mgr_password,
+                    validate_certs=validate_certs)
+        elif action == 'created':
+            (rc, resp) = request(manager_url + '/logical-ports', data=json.dumps(port),
+                                 headers=headers, method='POST', url_username=mgr_username,
+                                 url_password=mgr_password, validate_certs=validate_certs)
+            port_id = resp['id']
+        elif action == 'updated':
+            body = dict(port, _revision=existing_port['_revision'])
+            request(manager_url + '/logical-ports/%s' % port_id, data=json.dumps(body),
+                    headers=headers, method='PUT', url_username=mgr_username,
+                    url_password=mgr_password, validate_certs=validate_certs)
+    except Exception as err:
+        return get_port_result(display_name, 'failed', port_id, to_native(err))
+    return get_port_result(display_name, action, port_id)
+
+
+def apply_logical_ports(module, manager_url, mgr_username, mgr_password, validate_certs,
+                        headers, ports):
+    '''
+    Compares the logical port specs with one snapshot of the logical ports,
+    then submits the creates, updates or deletes concurrently.
+    '''
+    state = module.params['state']
+    try:
+        existing_ports = get_paginated_results(manager_url, '/logical-ports', mgr_username,
+                                               mgr_password, validate_certs)
+    except Exception as err:
+        module.fail_json(msg='Error accessing logical ports. Error [%s]' % to_native(err))
+    existing_ports = dict((existing_port['display_name'], existing_port)
+                          for existing_port in existing_ports
+                          if 'display_name' in existing_port)
+    if state == 'present':
+        ports = update_logical_ports_with_ids(module, manager_url, mgr_username, mgr_password,
+                                              validate_certs, ports)
+
+    results = []
+    changes = []
+    for port in ports:
+        existing_port = existing_ports.get(port['display_name'])
+        action = get_port_action(state, port, existing_port,
+                                 ignore_paths=LOGICAL_PORT_IGNORE_PATHS,
+                                 list_keys=LOGICAL_PORT_LIST_KEYS)
+        if action in ('absent', 'unchanged') or module.check_mode:
+            results.append(get_port_result(port['display_name'], action,
+                                           existing_port and existing_port['id']))
+        else:
+            changes.append((action, port, existing_port))
+    if changes:
+        with ThreadPoolExecutor(max_workers=min(len(changes),
+                                                module.params['max_concurrent_requests'])) as executor:
+            results.extend(executor.map(
+                lambda change: apply_logical_port(manager_url, mgr_username, mgr_password,
+                                                  validate_certs, headers, *change),
+                changes))
+    return results
+
+
+def get_segment_port_body(port):
+    body = dict((key, value) for key, value in port.items()
+                if key not in ('segment_id', 'id'))
+    body['id'] = port.get('id') or port['display_name']
+    body['resource_type'] = 'SegmentPort'
+    return body
+
+
+def apply_segment_ports(module, policy_url, mgr_username, mgr_password, validate_certs,
+                        headers, ports):
+    '''
+    Compares the segment port specs with one snapshot of the ports of each
+    segment, then submits the changes in batches through the hierarchical
+    API.
+    '''
+    state = module.params['state']
+    missing_segment = [port['display_name'] for port in ports if not port.get('segment_id')]
+    if missing_segment:
+        module.fail_json(msg='segment_id is required for the ports: %s' % ', '.join(missing_segment))
+
+    existing_ports = {}
+    for segment_id in sorted(set(port['segment_id'] for port in ports)):
+        try:
+            segment_ports = get_paginated_results(policy_url, '/infra/segments/%s/ports' % segment_id,
+                                                  mgr_username, mgr_password, validate_certs)
+        except Exception as err:
+            module.fail_json(msg='Error accessing the ports of segment %s. Error [%s]'
+                                 % (segment_id, to_native(err)))
+        for segment_port in segment_ports:
+            existing_ports[(segment_id, segment_port['id'])] = segment_port
+
+    results = []
+    changes = []
+    for port in ports:
+        body = get_segment_port_body(port)
+        existing_port = existing_ports.get((port['segment_id'], body['id']))
+        action = get_port_action(state, body, existing_port)
+        if action in ('absent', 'unchanged'):
+            results.append(get_port_result(port['display_name'], action,
+                                           existing_port and body['id']))
+            continue
+        changes.append((port['segment_id'], body, get_port_result(port['display_name'],
+                                                                 action, body['id'])))
+
+    batch_size = module.params['batch_size']
+    for start in range(0, len(changes), batch_size):
+        batch = changes[start:start + batch_size]
+        if not module.check_mode:
+            segments = {}
+            for segment_id, body, _ in batch:
+                segments.setdefault(segment_id, []).append(dict(
+                    resource_type='ChildSegmentPort', SegmentPort=body,
+                    marked_for_delete=state == 'absent'))
+            infra = dict(resource_type='Infra', children=[
+                dict(resource_type='ChildSegment',
+                     Segment=dict(resource_type='Segment', id=segment_id, children=children))
+                for segment_id, children in sorted(segments.items())])
+            try:
+                request(policy_url + '/infra', data=json.dumps(infra), headers=headers,
+                        method='PATCH', url_username=mgr_username, url_password=mgr_password,
+                        validate_certs=validate_certs)
+            except Exception as err:
+                # The hierarchical API applies a request entirely or not at
+                # all, so the whole batch failed
+                for _, _, result in batch:
+                    result.update(action='failed', failed=True, changed=False,
+                                  msg=to_native(err))
+        results.extend(result for _, _, result in batch)
+    return results
+
+
+def main():
+    argument_spec = vmware_argument_spec()
+    argument_spec.update(api=dict(type='str', required=False, default='manager',
+                                  choices=['manager', 'policy']),
+                         ports=dict(type='list', required=True),
+                         max_concurrent_requests=dict(type='int', required=False, default=8),
+                         batch_size=dict(type='int', required=False, default=500),
+                         state=dict(required=True, choices=['present', 'absent']))
+
+    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
+    mgr_hostname = module.params['hostname']
+    mgr_username = module.params['username']
+    mgr_password = module.params['password']
+    validate_certs = module.params['validate_certs']
+    ports = [dict(port) for port in module.params['ports']]
+    if not ports:
+        module.exit_json(changed=False, results=[])
+    missing_name = [index for index, port in enumerate(ports) if not port.get('display_name')]
+    if missing_name:
+        module.fail_json(msg='display_name is required for the ports at index: %s'
+                             % ', '.join(str(index) for index in missing_name))
+
+    headers = dict(Accept="application/json")
+    headers['Content-Type'] = 'application/json'
+
+    if module.params['api'] == 'policy':
+        policy_url = 'https://{}/policy/api/v1'.format(mgr_hostname)
+        results = apply_segment_ports(module, policy_url, mgr_username, mgr_password,
+                                      validate_certs, headers, ports)
+    else:
+        manager_url = 'https://{}/api/v1'.format(mgr_hostname)
+        results = apply_logical_ports(module, manager_url, mgr_username, mgr_password,
+                                      validate_certs, headers, ports)
+
+    changed = any(result['changed'] for result in results)
+    summary = {}
+    for result in results:
+        summary[result['action']] = summary.get(result['action'], 0) + 1
+    failed = [result['display_name'] for result in results if result['failed']]
+    if failed:
+        module.fail_json(msg='Failed to apply the ports: %s' % ', '.join(failed),
+                         changed=changed, summary=summary, results=results)
+    module.exit_json(changed=changed, summary=summary, results=results)
+
+
+if __name__ == '__main__':
+    main()
@@ -348,8 +348,14 @@ RETURN = '''# '''
 import json, time
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.vmware_nsxt import vmware_argument_spec, request
+from ansible.module_utils.nsx_search import find_by_display_name
 from ansible.module_utils._text import to_native
 
+LOGICAL_ROUTER_PORT_TYPES = ['LogicalRouterDownLinkPort', 'LogicalRouterUpLinkPort',
+                             'LogicalRouterLinkPortOnTIER0', 'LogicalRouterLinkPortOnTIER1',
+                             'LogicalRouterCentralizedServicePort', 'LogicalRouterLoopbackPort',
+                             'LogicalRouterIPTunnelPort']
+
 def get_logical_router_port_params(args=None):
     args_to_remove = ['state', 'username', 'password', 'port', 'hostname', 'validate_certs']
     for key in args_to_remove:
@@ -359,20 +365,13 @@ def get_logical_router_port_params(args=None):
             args.pop(key, None)
     return args
 
-def get_logical_router_ports(module, manager_url, mgr_username, mgr_password, validate_certs):
+def get_lr_port_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, display_name):
     try:
-      (rc, resp) = request(manager_url+ '/logical-router-ports', headers=dict(Accept='application/json'),
-                      url_username=mgr_username, url_password=mgr_password, validate_certs=validate_certs, ignore_errors=True)
+      return find_by_display_name(manager_url, '/logical-router-ports', mgr_username, mgr_password,
+                                  validate_certs, display_name,
+                                  resource_types=LOGICAL_ROUTER_PORT_TYPES)
     except Exception as err:
       module.fail_json(msg='Error accessing logical router ports. Error [%s]' % (to_native(err)))
-    return resp
-
-def get_lr_port_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, display_name):
-    logical_router_ports = get_logical_router_ports(module, manager_url, mgr_username, mgr_password, validate_certs)
-    for logical_router_port in logical_router_ports['results']:
-        if logical_router_port.__contains__('display_name') and logical_router_port['display_name'] == display_name:
-            return logical_router_port
-    return None
 
 def get_id_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, endpoint, display_name, exit_if_not_found=True):
     try:
@@ -33,6 +33,7 @@ description: Returns information about all logical router ports. Information inc
 
 version_added: "2.7"
 author: Rahul Raghuvanshi
+extends_documentation_fragment: vmware_nsxt.facts_filter
 options:
     hostname:
         description: Deployed NSX manager hostname.
@@ -46,7 +47,6 @@ options:
         description: The password to authenticate with the NSX manager.
         required: true
         type: str
-
 '''
 
 EXAMPLES = '''
@@ -56,6 +56,18 @@ EXAMPLES = '''
       username: "admin"
       password: "Admin!23Admin"
       validate_certs: False
+
+- name: List the uplink ports of the logical routers
+  nsxt_logical_router_ports_facts:
+      hostname: "10.192.167.137"
+      username: "admin"
+      password: "Admin!23Admin"
+      validate_certs: False
+      resource_type: "LogicalRouterUpLinkPort"
+      fields:
+        - id
+        - logical_router_id
+        - subnets
 '''
 
 RETURN = '''# '''
@@ -63,10 +75,12 @@ RETURN = '''# '''
 import json
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.vmware_nsxt import vmware_argument_spec, request
+from ansible.module_utils.facts_filter import get_filter_argument_spec, has_filters, get_filtered_results
 from ansible.module_utils._text import to_native
 
 def main():
   argument_spec = vmware_argument_spec()
+  argument_spec.update(get_filter_argument_spec())
 
   module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
 
@@ -77,6 +91,21 @@ def main():
 
   manager_url = 'https://{}/api/v1'.format(mgr_hostname)
 
+  if has_filters(module.params):
+    try:
+      filtered = get_filtered_results(manager_url, '/logical-router-ports', mgr_username, mgr_password,
+                                      validate_certs, module.params,
+                                      search_resource_types=['LogicalRouterDownLinkPort',
+                                                             'LogicalRouterUpLinkPort',
+                                                             'LogicalRouterLinkPortOnTIER0',
+                                                             'LogicalRouterLinkPortOnTIER1',
+                                                             'LogicalRouterCentralizedServicePort',
+                                                             'LogicalRouterLoopbackPort',
+                                                             'LogicalRouterIPTunnelPort'])
+    except Exception as err:
+      module.fail_json(msg='Error accessing list of logical ports. Error [%s]' % (to_native(err)))
+    module.exit_json(changed=False, **filtered)
+
   changed = False
   try:
     (rc, resp) = request(manager_url+ '/logical-router-ports', headers=dict(Accept='application/json'),
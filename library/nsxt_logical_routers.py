@@ -192,6 +192,7 @@ RETURN = '''# '''
 import json, time
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.vmware_nsxt import vmware_argument_spec, request
+from ansible.module_utils.nsx_search import find_by_display_name
 from ansible.module_utils._text import to_native
 
 def get_logical_router_params(args=None):
@@ -203,20 +204,13 @@ def get_logical_router_params(args=None):
             args.pop(key, None)
     return args
 
-def get_logical_routers(module, manager_url, mgr_username, mgr_password, validate_certs):
+def get_lr_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, display_name):
     try:
-      (rc, resp) = request(manager_url+ '/logical-routers', headers=dict(Accept='application/json'),
-                      url_username=mgr_username, url_password=mgr_password, validate_certs=validate_certs, ignore_errors=True)
+      return find_by_display_name(manager_url, '/logical-routers', mgr_username, mgr_password,
+                                  validate_certs, display_name,
+                                  resource_types=['LogicalRouter'])
     except Exception as err:
       module.fail_json(msg='Error accessing logical routers. Error [%s]' % (to_native(err)))
-    return resp
-
-def get_lr_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, display_name):
-    logical_routers = get_logical_routers(module, manager_url, mgr_username, mgr_password, validate_certs)
-    for logical_router in logical_routers['results']:
-        if logical_router.__contains__('display_name') and logical_router['display_name'] == display_name:
-            return logical_router
-    return None
 
 def get_id_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, endpoint, display_name):
     try:
@@ -166,9 +166,12 @@ EXAMPLES = '''
 
 RETURN = '''# '''
 
-import json, time
+import json
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.vmware_nsxt import vmware_argument_spec, request
+from ansible.module_utils.nsx_search import find_by_display_name
+from ansible.module_utils.diff_utils import is_update_required
+from ansible.module_utils.common_utils import ReferenceResolver, wait_for_write_confirmation
 from ansible.module_utils._text import to_native
 
 def get_logical_switch_params(args=None):
@@ -180,77 +183,40 @@ def get_logical_switch_params(args=None):
             args.pop(key, None)
     return args
 
-def get_logical_switches(module, manager_url, mgr_username, mgr_password, validate_certs):
-    try:
-      (rc, resp) = request(manager_url+ '/logical-switches', headers=dict(Accept='application/json'),
-                      url_username=mgr_username, url_password=mgr_password, validate_certs=validate_certs, ignore_errors=True)
-    except Exception as err:
-      module.fail_json(msg='Error accessing logical switches. Error [%s]' % (to_native(err)))
-    return resp
-
 def get_lswitch_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, display_name):
-    logical_switchs = get_logical_switches(module, manager_url, mgr_username, mgr_password, validate_certs)
-    for logical_switch in logical_switchs['results']:
-        if logical_switch.__contains__('display_name') and logical_switch['display_name'] == display_name:
-            return logical_switch
-    return None
-
-def get_id_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, endpoint, display_name):
     try:
-      (rc, resp) = request(manager_url+ endpoint, headers=dict(Accept='application/json'),
-                      url_username=mgr_username, url_password=mgr_password, validate_certs=validate_certs, ignore_errors=True)
+      return find_by_display_name(manager_url, '/logical-switches', mgr_username, mgr_password,
+                                  validate_certs, display_name,
+                                  resource_types=['LogicalSwitch'])
     except Exception as err:
-      module.fail_json(msg='Error accessing id for display name %s. Error [%s]' % (display_name, to_native(err)))
-
-    for result in resp['results']:
-        if result.__contains__('display_name') and result['display_name'] == display_name:
-            return result['id']
-    module.fail_json(msg='No id existe with display name %s' % display_name)
+      module.fail_json(msg='Error accessing logical switches. Error [%s]' % (to_native(err)))
 
 def update_params_with_id (module, manager_url, mgr_username, mgr_password, validate_certs, logical_switch_params ):
+    resolver = ReferenceResolver(module, manager_url, mgr_username, mgr_password, validate_certs)
     if 'ip_pool_name' in logical_switch_params:
-        logical_switch_params['ip_pool_id'] = get_id_from_display_name (module, manager_url,
-                                                                mgr_username, mgr_password, validate_certs,
-                                                                "/pools/ip-pools", logical_switch_params.pop('ip_pool_name', None))
-    logical_switch_params['transport_zone_id'] = get_id_from_display_name (module, manager_url,
-                                                                mgr_username, mgr_password, validate_certs,
-                                                                "/transport-zones", logical_switch_params.pop('transport_zone_name', None))
+        resolver.add("/pools/ip-pools", logical_switch_params.pop('ip_pool_name', None),
+                     logical_switch_params, 'ip_pool_id')
+    resolver.add("/transport-zones", logical_switch_params.pop('transport_zone_name', None),
+                 logical_switch_params, 'transport_zone_id')
 
     switch_profiles = logical_switch_params.pop('switching_profiles', None)
 
     switch_profile_ids = []
     for switch_profile in switch_profiles or []:
         profile_obj = {}
-        profile_obj['value'] = get_id_from_display_name (module, manager_url, mgr_username, mgr_password, validate_certs,
-                                                "/host-switch-profiles", switch_profile['name'])
+        resolver.add("/host-switch-profiles", switch_profile['name'], profile_obj, 'value')
         profile_obj['key'] = switch_profile['type']
         switch_profile_ids.append(profile_obj)
     logical_switch_params['switching_profile_ids'] = switch_profile_ids
+    resolver.resolve()
     return logical_switch_params
 
 def check_for_update(module, manager_url, mgr_username, mgr_password, validate_certs, logical_switch_with_ids):
     existing_logical_switch = get_lswitch_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, logical_switch_with_ids['display_name'])
     if existing_logical_switch is None:
         return False
-    if existing_logical_switch.__contains__('vlan') and logical_switch_with_ids.__contains__('vlan') and \
-        existing_logical_switch['vlan'] != logical_switch_with_ids['vlan']:
-        return True
-
-    if logical_switch_with_ids.__contains__('vlan_trunk_spec') and existing_logical_switch.__contains__('vlan_trunk_spec') and \
-        existing_logical_switch['vlan_trunk_spec']['vlan_ranges'] != logical_switch_with_ids['vlan_trunk_spec']['vlan_ranges']:
-        return True
-    if existing_logical_switch.__contains__('switching_profile_ids') and logical_switch_with_ids.__contains__('switching_profile_ids') and \
-        existing_logical_switch['switching_profile_ids'] != logical_switch_with_ids['switching_profile_ids']:
-        return True
-    if existing_logical_switch['admin_state'] != logical_switch_with_ids['admin_state']:
-        return True
-    if existing_logical_switch.__contains__('replication_mode') and logical_switch_with_ids.__contains__('replication_mode') and \
-        existing_logical_switch['replication_mode'] != logical_switch_with_ids['replication_mode']:
-        return True
-    if existing_logical_switch.__contains__('hybrid') and logical_switch_with_ids.__contains__('hybrid') and \
-        existing_logical_switch['hybrid'] != logical_switch_with_ids['hybrid']:
-        return True
-    return False
+    return is_update_required(existing_logical_switch, logical_switch_with_ids,
+                              list_keys={'switching_profile_ids': 'key'})
 
 def main():
   argument_spec = vmware_argument_spec()
@@ -310,7 +276,8 @@ def main():
       except Exception as err:
           module.fail_json(msg="Failed to add logical switch. Request body [%s]. Error[%s]." % (request_data, to_native(err)))
 
-      time.sleep(5)
+      wait_for_write_confirmation(manager_url, '/logical-switches/%s' % resp["id"], mgr_username, mgr_password,
+                                  validate_certs, revision=resp.get("_revision"))
       module.exit_json(changed=True, id=resp["id"], body= str(resp), message="Logical switch with display name %s created." % module.params['display_name'])
     else:
       if module.check_mode:
@@ -325,7 +292,8 @@ def main():
       except Exception as err:
           module.fail_json(msg="Failed to update logical switch with id %s. Request body [%s]. Error[%s]." % (id, request_data, to_native(err)))
 
-      time.sleep(5)
+      wait_for_write_confirmation(manager_url, '/logical-switches/%s' % id, mgr_username, mgr_password,
+                                  validate_certs, revision=resp.get("_revision"))
       module.exit_json(changed=True, id=resp["id"], body= str(resp), message="logical switch with lswitch id %s updated." % id)
 
   elif state == 'absent':
@@ -341,7 +309,8 @@ def main():
     except Exception as err:
         module.fail_json(msg="Failed to delete logical switch with id %s. Error[%s]." % (id, to_native(err)))
 
-    time.sleep(5)
+    wait_for_write_confirmation(manager_url, '/logical-switches/%s' % id, mgr_username, mgr_password,
+                                validate_certs, deleted=True)
     module.exit_json(changed=True, object_name=id, message="Logical switch with zone id %s deleted." % id)
 
 
@@ -28,6 +28,7 @@ description: Returns information about all configured logical switch ports. Logi
 
 version_added: "2.7"
 author: Rahul Raghuvanshi
+extends_documentation_fragment: vmware_nsxt.facts_filter
 options:
     hostname:
         description: Deployed NSX manager hostname.
@@ -41,7 +42,6 @@ options:
         description: The password to authenticate with the NSX manager.
         required: true
         type: str
-
 '''
 
 EXAMPLES = '''
@@ -51,6 +51,18 @@ EXAMPLES = '''
       username: "admin"
       password: "Admin!23Admin"
       validate_certs: False
+
+- name: Get the transport zone and VNI of a logical switch
+  nsxt_logical_switches_facts:
+      hostname: "10.192.167.137"
+      username: "admin"
+      password: "Admin!23Admin"
+      validate_certs: False
+      display_name: "web-ls"
+      fields:
+        - id
+        - transport_zone_id
+        - vni
 '''
 
 RETURN = '''# '''
@@ -58,10 +70,12 @@ RETURN = '''# '''
 import json
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.vmware_nsxt import vmware_argument_spec, request
+from ansible.module_utils.facts_filter import get_filter_argument_spec, has_filters, get_filtered_results
 from ansible.module_utils._text import to_native
 
 def main():
   argument_spec = vmware_argument_spec()
+  argument_spec.update(get_filter_argument_spec())
 
   module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
 
@@ -72,12 +86,21 @@ def main():
 
   manager_url = 'https://{}/api/v1'.format(mgr_hostname)
 
+  if has_filters(module.params):
+    try:
+      filtered = get_filtered_results(manager_url, '/logical-switches', mgr_username, mgr_password,
+                                      validate_certs, module.params,
+                                      search_resource_types=['LogicalSwitch'])
+    except Exception as err:
+      module.fail_json(msg='Error accessing list of logical switches. Error [%s]' % (to_native(err)))
+    module.exit_json(changed=False, **filtered)
+
   changed = False
   try:
-    (rc, resp) = request(manager_url+ '/logical-ports', headers=dict(Accept='application/json'),
+    (rc, resp) = request(manager_url+ '/logical-switches', headers=dict(Accept='application/json'),
                     url_username=mgr_username, url_password=mgr_password, validate_certs=validate_certs, ignore_errors=True)
   except Exception as err:
-    module.fail_json(msg='Error accessing list of logical ports. Error [%s]' % (to_native(err)))
+    module.fail_json(msg='Error accessing list of logical switches. Error [%s]' % (to_native(err)))
 
   module.exit_json(changed=changed, **resp)
 if __name__ == '__main__':
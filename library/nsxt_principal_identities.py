@@ -107,9 +107,10 @@ EXAMPLES = '''
 
 RETURN = '''# '''
 
-import json, time
+import json
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.vmware_nsxt import vmware_argument_spec, request
+from ansible.module_utils.common_utils import wait_for_write_confirmation
 from ansible.module_utils._text import to_native
 
 def get_principal_identity_params(args=None):
@@ -205,7 +206,9 @@ def main():
     except Exception as err:
         module.fail_json(msg="Failed to add principal identity. Error[%s]. Request body [%s]." % (request_data, to_native(err)))
 
-    time.sleep(5)
+    if resp and resp.get('id'):
+      wait_for_write_confirmation(manager_url, '/trust-management/principal-identities/%s' % resp['id'],
+                                  mgr_username, mgr_password, validate_certs)
     module.exit_json(changed=True, result=resp, message="Principal identity created.")
 
   elif state == 'absent':
@@ -219,7 +222,8 @@ def main():
     except Exception as err:
       module.fail_json(msg="Failed to delete principal identity with display name \'%s\'. Error[%s]." % (display_name, to_native(err)))
 
-    time.sleep(5)
+    wait_for_write_confirmation(manager_url, '/trust-management/principal-identities/%s' % principal_id,
+                                mgr_username, mgr_password, validate_certs, deleted=True)
     module.exit_json(changed=True, object_name=principal_id, message="Principal identity with display name \'%s\' and principal id \'%s\' deleted." %(display_name, principal_id))
 
 
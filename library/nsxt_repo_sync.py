@@ -54,7 +54,7 @@ EXAMPLES = '''
 
 RETURN = '''# '''
 
-import json, time
+import json
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.vmware_nsxt import vmware_argument_spec, request
 from ansible.module_utils._text import to_native
@@ -89,7 +89,6 @@ def main():
     module.fail_json(msg='Failed to synchronize repositories of NSX '
                           'managers. Error[%s].' % to_native(err))
 
-  time.sleep(5)
   module.exit_json(changed=True, result=resp, message='NSX Manager repositories'
                                                       ' synchronization started.')
 
@@ -106,6 +106,7 @@ RETURN = '''# '''
 import json, time
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.vmware_nsxt import vmware_argument_spec, request
+from ansible.module_utils.nsx_search import find_by_display_name
 from ansible.module_utils._text import to_native
 import ssl
 import socket
@@ -120,14 +121,6 @@ def get_transport_node_collections_params(args=None):
             args.pop(key, None)
     return args
 
-def get_transport_node_collections(module, manager_url, mgr_username, mgr_password, validate_certs):
-    try:
-      (rc, resp) = request(manager_url+ '/transport-node-collections', headers=dict(Accept='application/json'),
-                      url_username=mgr_username, url_password=mgr_password, validate_certs=validate_certs, ignore_errors=True)
-    except Exception as err:
-      module.fail_json(msg='Error accessing transport-node-collections. Error [%s]' % (to_native(err)))
-    return resp
-
 def get_id_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, endpoint, display_name, exit_if_not_found=True):
     try:
       (rc, resp) = request(manager_url+ endpoint, headers=dict(Accept='application/json'),
@@ -142,11 +135,12 @@ def get_id_from_display_name(module, manager_url, mgr_username, mgr_password, va
         module.fail_json(msg='No id exist with display name %s' % display_name)
 
 def get_transport_node_collection_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, display_name):
-    transport_node_collections = get_transport_node_collections(module, manager_url, mgr_username, mgr_password, validate_certs)
-    for transport_node_collection in transport_node_collections['results']:
-        if transport_node_collection.__contains__('display_name') and transport_node_collection['display_name'] == display_name:
-            return transport_node_collection
-    return None
+    try:
+      return find_by_display_name(manager_url, '/transport-node-collections', mgr_username, mgr_password,
+                                  validate_certs, display_name,
+                                  resource_types=['TransportNodeCollection'])
+    except Exception as err:
+      module.fail_json(msg='Error accessing transport-node-collections. Error [%s]' % (to_native(err)))
 
 def wait_till_delete(id, module, manager_url, mgr_username, mgr_password, validate_certs):
     try:
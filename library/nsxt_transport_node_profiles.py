@@ -112,9 +112,12 @@ EXAMPLES = '''
 
 RETURN = '''# '''
 
-import json, time
+import json
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.vmware_nsxt import vmware_argument_spec, request
+from ansible.module_utils.nsx_search import find_by_display_name
+from ansible.module_utils.diff_utils import is_update_required, HOST_SWITCH_SPEC_LIST_KEYS
+from ansible.module_utils.common_utils import ReferenceResolver, wait_for_write_confirmation
 from ansible.module_utils._text import to_native
 
 
@@ -131,14 +134,6 @@ def get_transport_node_profile_params(args=None):
             args.pop(key, None)
     return args
 
-def get_transport_node_profiles(module, manager_url, mgr_username, mgr_password, validate_certs):
-    try:
-      (rc, resp) = request(manager_url+ '/transport-node-profiles', headers=dict(Accept='application/json'),
-                      url_username=mgr_username, url_password=mgr_password, validate_certs=validate_certs, ignore_errors=True)
-    except Exception as err:
-      module.fail_json(msg='Error accessing transport node profiles. Error [%s]' % (to_native(err)))
-    return resp
-
 def get_id_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, endpoint, display_name, exit_if_not_found=True):
     try:
       (rc, resp) = request(manager_url+ endpoint, headers=dict(Accept='application/json'),
@@ -153,72 +148,48 @@ def get_id_from_display_name(module, manager_url, mgr_username, mgr_password, va
         module.fail_json(msg='No id exist with display name %s' % display_name)
 
 def get_tnp_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, display_name):
-    transport_node_profiles = get_transport_node_profiles(module, manager_url, mgr_username, mgr_password, validate_certs)
-    for transport_node_profile in transport_node_profiles['results']:
-        if transport_node_profile.__contains__('display_name') and transport_node_profile['display_name'] == display_name:
-            return transport_node_profile
-    return None
+    try:
+      return find_by_display_name(manager_url, '/transport-node-profiles', mgr_username, mgr_password,
+                                  validate_certs, display_name,
+                                  resource_types=['TransportNodeProfile'])
+    except Exception as err:
+      module.fail_json(msg='Error accessing transport node profiles. Error [%s]' % (to_native(err)))
 
 
 def update_params_with_id (module, manager_url, mgr_username, mgr_password, validate_certs, transport_node_profile_params ):
+    resolver = ReferenceResolver(module, manager_url, mgr_username, mgr_password, validate_certs)
     for host_switch in transport_node_profile_params['host_switch_spec']['host_switches']:
         host_switch_profiles = host_switch.pop('host_switch_profiles', None)
         host_switch_profile_ids = []
         for host_switch_profile in host_switch_profiles:
             profile_obj = {}
-            profile_obj['value'] = get_id_from_display_name (module, manager_url, mgr_username, mgr_password, validate_certs,
-                                                    "/host-switch-profiles?include_system_owned=true", host_switch_profile['name'])
+            resolver.add("/host-switch-profiles?include_system_owned=true", host_switch_profile['name'],
+                         profile_obj, 'value')
             profile_obj['key'] = host_switch_profile['type']
             host_switch_profile_ids.append(profile_obj)
         host_switch['host_switch_profile_ids'] = host_switch_profile_ids
-        ip_pool_id = None
         if host_switch.__contains__('ip_assignment_spec'):
             ip_pool_name = host_switch['ip_assignment_spec'].pop('ip_pool_name', None)
-            host_switch['ip_assignment_spec']['ip_pool_id'] = get_id_from_display_name (module, manager_url,
-                                                                                        mgr_username, mgr_password, validate_certs,
-                                                                                        "/pools/ip-pools", ip_pool_name)
+            resolver.add("/pools/ip-pools", ip_pool_name, host_switch['ip_assignment_spec'], 'ip_pool_id')
         if host_switch.__contains__('transport_zone_endpoints'):
             for transport_zone_endpoint in host_switch['transport_zone_endpoints']:
                 transport_zone_name = transport_zone_endpoint.pop('transport_zone_name', None)
-                transport_zone_endpoint['transport_zone_id'] = get_id_from_display_name (module, manager_url,
-                                                                                    mgr_username, mgr_password, validate_certs,
-                                                                                    "/transport-zones", transport_zone_name)
+                resolver.add("/transport-zones", transport_zone_name, transport_zone_endpoint, 'transport_zone_id')
     if transport_node_profile_params.__contains__('transport_zone_endpoints'):
         for transport_zone_endpoint in transport_node_profile_params['transport_zone_endpoints']:
             transport_zone_name = transport_zone_endpoint.pop('transport_zone_name', None)
-            transport_zone_endpoint['transport_zone_id'] = get_id_from_display_name (module, manager_url,
-                                                                                    mgr_username, mgr_password, validate_certs,
-                                                                                    "/transport-zones", transport_zone_name)
+            resolver.add("/transport-zones", transport_zone_name, transport_zone_endpoint, 'transport_zone_id')
+    resolver.resolve()
     transport_node_profile_params['display_name'] = transport_node_profile_params.pop('display_name', None)
     return transport_node_profile_params
 
 
-def id_exist_in_list_dict_obj(key, list_obj1, list_obj2):
-    all_id_presents = False
-    if len(list_obj1) != len(list_obj2):
-        return all_id_presents
-    for dict_obj1 in list_obj1:
-        if dict_obj1.__contains__(key):
-            for dict_obj2 in list_obj2:
-                if dict_obj2.__contains__(key) and dict_obj1[key] == dict_obj2[key]:
-                    all_id_presents = True
-                    continue
-            if not all_id_presents:
-                return False
-    return True
-
-
 def check_for_update(module, manager_url, mgr_username, mgr_password, validate_certs, transport_node_profile_with_ids):
     existing_transport_node_profile = get_tnp_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, transport_node_profile_with_ids['display_name'])
     if existing_transport_node_profile is None:
         return False
-    if existing_transport_node_profile.__contains__('transport_zone_endpoints') and transport_node_profile_with_ids.__contains__('transport_zone_endpoints'):
-        return not id_exist_in_list_dict_obj('transport_zone_id', existing_transport_node_profile['transport_zone_endpoints'], transport_node_profile_with_ids['transport_zone_endpoints'])
-    if existing_transport_node_profile.__contains__('host_switch_spec') and existing_transport_node_profile['host_switch_spec'].__contains__('host_switches') and \
-        transport_node_profile_with_ids.__contains__('host_switch_spec') and transport_node_profile_with_ids['host_switch_spec'].__contains__('host_switches') and \
-        existing_transport_node_profile['host_switch_spec']['host_switches'] != transport_node_profile_with_ids['host_switch_spec']['host_switches']:
-        return True
-    return False
+    return is_update_required(existing_transport_node_profile, transport_node_profile_with_ids,
+                              list_keys=HOST_SWITCH_SPEC_LIST_KEYS)
 
 
 def main():
@@ -270,7 +241,8 @@ def main():
       except Exception as err:
            module.fail_json(msg="Failed to add transport node profile. Request body [%s]. Error[%s]." % (request_data, to_native(err)))
 
-      time.sleep(5)
+      wait_for_write_confirmation(manager_url, '/transport-node-profiles/%s' % resp["id"], mgr_username, mgr_password,
+                                  validate_certs, revision=resp.get("_revision"))
       module.exit_json(changed=True, id=resp["id"], body= str(resp), message="transport node profile with display name %s created." % module.params['display_name'])
     else:
       if module.check_mode:
@@ -285,7 +257,8 @@ def main():
       except Exception as err:
           module.fail_json(msg="Failed to update transport node profile with id %s. Request body [%s]. Error[%s]." % (id, request_data, to_native(err)))
 
-      time.sleep(5)
+      wait_for_write_confirmation(manager_url, '/transport-node-profiles/%s' % id, mgr_username, mgr_password,
+                                  validate_certs, revision=resp.get("_revision"))
       module.exit_json(changed=True, id=resp["id"], body= str(resp), message="transport node profile with node id %s updated." % id)
 
   elif state == 'absent':
@@ -301,7 +274,8 @@ def main():
     except Exception as err:
         module.fail_json(msg="Failed to delete transport node profile with id %s. Error[%s]." % (id, to_native(err)))
 
-    time.sleep(5)
+    wait_for_write_confirmation(manager_url, '/transport-node-profiles/%s' % id, mgr_username, mgr_password,
+                                validate_certs, deleted=True)
     module.exit_json(changed=True, object_name=id, message="transport node profile with node id %s deleted." % id)
 
 
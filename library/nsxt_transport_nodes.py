@@ -487,11 +487,11 @@ RETURN = '''# '''
 import json, time
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.vmware_nsxt import vmware_argument_spec, request, get_vc_ip_from_display_name
+from ansible.module_utils.nsx_search import find_by_display_name
+from ansible.module_utils.diff_utils import is_update_required, HOST_SWITCH_SPEC_LIST_KEYS
 from ansible.module_utils.vcenter_utils import get_resource_id_from_name, get_data_network_id_from_name
+from ansible.module_utils.cert_thumbprint import get_cert_thumbprint
 from ansible.module_utils._text import to_native
-import socket
-import hashlib
-import ssl
 
 FAILED_STATES = ["failed"]
 IN_PROGRESS_STATES = ["pending", "in_progress"]
@@ -506,14 +506,6 @@ def get_transport_node_params(args=None):
             args.pop(key, None)
     return args
 
-def get_transport_nodes(module, manager_url, mgr_username, mgr_password, validate_certs):
-    try:
-      (rc, resp) = request(manager_url+ '/transport-nodes', headers=dict(Accept='application/json'),
-                      url_username=mgr_username, url_password=mgr_password, validate_certs=validate_certs, ignore_errors=True)
-    except Exception as err:
-      module.fail_json(msg='Error accessing transport nodes. Error [%s]' % (to_native(err)))
-    return resp
-
 def get_id_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, endpoint, display_name, exit_if_not_found=True):
     try:
       (rc, resp) = request(manager_url+ endpoint, headers=dict(Accept='application/json'),
@@ -528,11 +520,12 @@ def get_id_from_display_name(module, manager_url, mgr_username, mgr_password, va
         module.fail_json(msg='No id exist with display name %s' % display_name)
 
 def get_tn_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, display_name):
-    transport_nodes = get_transport_nodes(module, manager_url, mgr_username, mgr_password, validate_certs)
-    for transport_node in transport_nodes['results']:
-        if transport_node.__contains__('display_name') and transport_node['display_name'] == display_name:
-            return transport_node
-    return None
+    try:
+      return find_by_display_name(manager_url, '/transport-nodes', mgr_username, mgr_password,
+                                  validate_certs, display_name,
+                                  resource_types=['TransportNode'])
+    except Exception as err:
+      module.fail_json(msg='Error accessing transport nodes. Error [%s]' % (to_native(err)))
 
 def wait_till_create(node_id, module, manager_url, mgr_username, mgr_password, validate_certs):
     try:
@@ -603,46 +596,22 @@ def update_params_with_id (module, manager_url, mgr_username, mgr_password, vali
     transport_node_params['display_name'] = transport_node_params.pop('display_name', None)
     return transport_node_params
 
-def id_exist_in_list_dict_obj(key, list_obj1, list_obj2):
-    all_id_presents = False
-    if len(list_obj1) != len(list_obj2):
-        return all_id_presents
-    for dict_obj1 in list_obj1:
-        if dict_obj1.__contains__(key):
-            for dict_obj2 in list_obj2:
-                if dict_obj2.__contains__(key) and dict_obj1[key] == dict_obj2[key]:
-                    all_id_presents = True
-                    continue
-            if not all_id_presents:
-                return False
-    return True
-
 def check_for_update(module, manager_url, mgr_username, mgr_password, validate_certs, transport_node_with_ids):
     existing_transport_node = get_tn_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, transport_node_with_ids['display_name'])
     if existing_transport_node is None:
         return False
-    if existing_transport_node.__contains__('transport_zone_endpoints') and transport_node_with_ids.__contains__('transport_zone_endpoints'):
-        return not id_exist_in_list_dict_obj('transport_zone_id', existing_transport_node['transport_zone_endpoints'], transport_node_with_ids['transport_zone_endpoints'])
-    if existing_transport_node.__contains__('host_switch_spec') and existing_transport_node['host_switch_spec'].__contains__('host_switches') and \
-        transport_node_with_ids.__contains__('host_switch_spec') and transport_node_with_ids['host_switch_spec'].__contains__('host_switches') and \
-        existing_transport_node['host_switch_spec']['host_switches'] != transport_node_with_ids['host_switch_spec']['host_switches']:
-        return True
-    return False
+    # Credentials are write only and never returned by the manager
+    return is_update_required(existing_transport_node, transport_node_with_ids,
+                              ignore_paths=('node_deployment_info.host_credential',
+                                            'node_deployment_info.deployment_config.node_user_settings',
+                                            'node_deployment_info.deployment_config.vm_deployment_config.vc_name'),
+                              list_keys=HOST_SWITCH_SPEC_LIST_KEYS)
 
 def get_api_cert_thumbprint(ip_address, module):
-    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    sock.settimeout(1)
-    wrappedSocket = ssl.wrap_socket(sock)
     try:
-        wrappedSocket.connect((ip_address, 443))
+        return get_cert_thumbprint(ip_address)
     except Exception as err:
         module.fail_json(msg='Failed to get node ID from ESXi host with IP {}. Error: {}'.format(ip_address, err))
-    else:
-        der_cert_bin = wrappedSocket.getpeercert(True)
-        thumb_sha256 = hashlib.sha256(der_cert_bin).hexdigest()
-        return thumb_sha256
-    finally:
-        wrappedSocket.close()
 
 
 def inject_vcenter_info(module, manager_url, mgr_username, mgr_password, validate_certs, transport_node_params):
@@ -31,6 +31,7 @@ description: Returns information about all transport nodes along with underlying
 
 version_added: "2.7"
 author: Rahul Raghuvanshi
+extends_documentation_fragment: vmware_nsxt.facts_filter
 options:
     hostname:
         description: Deployed NSX manager hostname.
@@ -44,8 +45,6 @@ options:
         description: The password to authenticate with the NSX manager.
         required: true
         type: str
-
-
 '''
 
 EXAMPLES = '''
@@ -55,6 +54,18 @@ EXAMPLES = '''
       username: "admin"
       password: "Admin!23Admin"
       validate_certs: False
+
+- name: List the addresses of the transport nodes tagged for the edge cluster
+  nsxt_transport_nodes_facts:
+      hostname: "10.192.167.137"
+      username: "admin"
+      password: "Admin!23Admin"
+      validate_certs: False
+      tag_scope: "cluster"
+      tag_value: "edge-cluster-01"
+      fields:
+        - display_name
+        - node_deployment_info.ip_addresses
 '''
 
 RETURN = '''# '''
@@ -62,10 +73,12 @@ RETURN = '''# '''
 import json
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.vmware_nsxt import vmware_argument_spec, request
+from ansible.module_utils.facts_filter import get_filter_argument_spec, has_filters, get_filtered_results
 from ansible.module_utils._text import to_native
 
 def main():
   argument_spec = vmware_argument_spec()
+  argument_spec.update(get_filter_argument_spec())
 
   module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
 
@@ -76,6 +89,15 @@ def main():
 
   manager_url = 'https://{}/api/v1'.format(mgr_hostname)
 
+  if has_filters(module.params):
+    try:
+      filtered = get_filtered_results(manager_url, '/transport-nodes', mgr_username, mgr_password,
+                                      validate_certs, module.params,
+                                      search_resource_types=['TransportNode'])
+    except Exception as err:
+      module.fail_json(msg='Error accessing transport zone. Error [%s]' % (to_native(err)))
+    module.exit_json(changed=False, **filtered)
+
   changed = False
   try:
     (rc, resp) = request(manager_url+ '/transport-nodes', headers=dict(Accept='application/json'),
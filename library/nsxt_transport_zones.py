@@ -128,6 +128,8 @@ RETURN = '''# '''
 import json, time
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.vmware_nsxt import vmware_argument_spec, request
+from ansible.module_utils.nsx_search import find_by_display_name
+from ansible.module_utils.diff_utils import is_update_required
 from ansible.module_utils._text import to_native
 
 def get_transport_zone_params(args=None):
@@ -139,29 +141,19 @@ def get_transport_zone_params(args=None):
             args.pop(key, None)
     return args
 
-def get_transport_zones(module, manager_url, mgr_username, mgr_password, validate_certs):
+def get_tz_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, display_name):
     try:
-      (rc, resp) = request(manager_url+ '/transport-zones', headers=dict(Accept='application/json'),
-                      url_username=mgr_username, url_password=mgr_password, validate_certs=validate_certs, ignore_errors=True)
+      return find_by_display_name(manager_url, '/transport-zones', mgr_username, mgr_password,
+                                  validate_certs, display_name,
+                                  resource_types=['TransportZone'])
     except Exception as err:
       module.fail_json(msg='Error accessing transport zones. Error [%s]' % (to_native(err)))
-    return resp
-
-def get_tz_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, display_name):
-    transport_zones = get_transport_zones(module, manager_url, mgr_username, mgr_password, validate_certs)
-    for transport_zone in transport_zones['results']:
-        if transport_zone.__contains__('display_name') and transport_zone['display_name'] == display_name:
-            return transport_zone
-    return None
 
 def check_for_update(module, manager_url, mgr_username, mgr_password, validate_certs, transport_zone_params):
     existing_transport_zone = get_tz_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, transport_zone_params['display_name'])
     if existing_transport_zone is None:
         return False
-    if existing_transport_zone.__contains__('transport_type') and transport_zone_params.__contains__('transport_type') and \
-        existing_transport_zone['transport_type'] != transport_zone_params['transport_type']:
-        return True
-    return False
+    return is_update_required(existing_transport_zone, transport_zone_params)
 
 
 def main():
@@ -46,6 +46,7 @@ description: Returns information about configured transport zones. NSX requires
 
 version_added: "2.7"
 author: Rahul Raghuvanshi
+extends_documentation_fragment: vmware_nsxt.facts_filter
 options:
     hostname:
         description: Deployed NSX manager hostname.
@@ -59,8 +60,6 @@ options:
         description: The password to authenticate with the NSX manager.
         required: true
         type: str
-
-
 '''
 
 EXAMPLES = '''
@@ -70,6 +69,18 @@ EXAMPLES = '''
       username: "admin"
       password: "Admin!23Admin"
       validate_certs: False
+
+- name: Get the type and host switch of a transport zone
+  nsxt_transport_zones_facts:
+      hostname: "10.192.167.137"
+      username: "admin"
+      password: "Admin!23Admin"
+      validate_certs: False
+      display_name: "overlay-tz"
+      fields:
+        - id
+        - transport_type
+        - host_switch_name
 '''
 
 RETURN = '''# '''
@@ -77,10 +88,12 @@ RETURN = '''# '''
 import json
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.vmware_nsxt import vmware_argument_spec, request
+from ansible.module_utils.facts_filter import get_filter_argument_spec, has_filters, get_filtered_results
 from ansible.module_utils._text import to_native
 
 def main():
   argument_spec = vmware_argument_spec()
+  argument_spec.update(get_filter_argument_spec())
 
   module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
 
@@ -91,6 +104,15 @@ def main():
 
   manager_url = 'https://{}/api/v1'.format(mgr_hostname)
 
+  if has_filters(module.params):
+    try:
+      filtered = get_filtered_results(manager_url, '/transport-zones', mgr_username, mgr_password,
+                                      validate_certs, module.params,
+                                      search_resource_types=['TransportZone'])
+    except Exception as err:
+      module.fail_json(msg='Error accessing transport zone. Error [%s]' % (to_native(err)))
+    module.exit_json(changed=False, **filtered)
+
   changed = False
   try:
     (rc, resp) = request(manager_url+ '/transport-zones', headers=dict(Accept='application/json'),
@@ -0,0 +1,360 @@
+#!/usr/bin/env python
+#
+# Copyright 2020 VMware, Inc.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING,
+# BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: nsxt_upgrade_group_planner
+short_description: 'Plans the host upgrade groups'
+description: "Computes host upgrade unit groups that keep the upgrade window
+              short without taking down more hosts than allowed. The hosts of
+              a group are upgraded in parallel and the groups one after the
+              other. Slow hosts, as per the recorded upgrade times, are put
+              together. The groups and the host upgrade plan settings are
+              then applied on the manager. In check mode, only the plan and
+              its expected duration are returned."
+version_added: '2.7'
+author: 'madhukark'
+options:
+    hostname:
+        description: 'Deployed NSX manager hostname.'
+        required: true
+        type: str
+    username:
+        description: 'The username to authenticate with the NSX manager.'
+        required: true
+        type: str
+    password:
+        description: 'The password to authenticate with the NSX manager.'
+        required: true
+        type: str
+    max_hosts_down:
+        description: 'Max number of hosts upgraded at the same time'
+        required: true
+        type: int
+    max_hosts_down_per_cluster:
+        description: 'Max number of hosts of a cluster upgraded at the same
+                      time'
+        required: false
+        default: 1
+        type: int
+    clusters:
+        description: "List of clusters as dicts with the cluster 'name' and
+                      its 'hosts' names. If not set, the current upgrade unit
+                      groups are taken as the clusters, as the default groups
+                      of NSX are the compute clusters. Hosts not in any cluster,
+                      or only in the groups planned by an earlier run, are
+                      planned as clusters of their own."
+        required: false
+        type: list
+    host_upgrade_times:
+        description: 'Dict of host name to its recorded upgrade time in
+                      seconds'
+        required: false
+        type: dict
+    default_host_upgrade_time:
+        description: 'Upgrade time in seconds of the hosts without a recorded
+                      one'
+        required: false
+        default: 1800
+        type: int
+    group_name_prefix:
+        description: 'Prefix of the names of the upgrade unit groups created.
+                      Groups with this prefix left from a previous plan are
+                      deleted.'
+        required: false
+        default: 'planned-wave'
+        type: str
+    pause_after_each_group:
+        description: 'Flag to indicate whether to pause the upgrade after
+                      upgrade of each group is completed'
+        required: false
+        default: false
+        type: bool
+    pause_on_error:
+        description: 'Flag to indicate whether to pause the upgrade plan
+                      execution when an error occurs'
+        required: false
+        default: true
+        type: bool
+'''
+
+EXAMPLES = '''
+- name: Plans the host upgrade with at most 4 hosts down
+  nsxt_upgrade_group_planner:
+      hostname: "10.192.167.137"
+      username: "admin"
+      password: "Admin!23Admin"
+      validate_certs: False
+      max_hosts_down: 4
+      max_hosts_down_per_cluster: 1
+      clusters:
+        - name: "cluster-1"
+          hosts: ["esx-1", "esx-2", "esx-3"]
+        - name: "cluster-2"
+          hosts: ["esx-4", "esx-5"]
+      host_upgrade_times:
+        esx-1: 2400
+'''
+
+RETURN = '''# '''
+
+import json
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.vmware_nsxt import vmware_argument_spec, request
+from ansible.module_utils.common_utils import get_upgrade_orchestrator_node, get_paginated_results
+from ansible.module_utils.upgrade_planner import plan_upgrade_waves, simulate_upgrade_duration
+from ansible.module_utils._text import to_native
+
+UPGRADE_UNIT_GROUPS = '/upgrade/upgrade-unit-groups'
+
+
+def is_planned_group(group, group_name_prefix):
+    '''
+    Returns True if the upgrade unit group was created by this module
+    '''
+    return group['display_name'].startswith(group_name_prefix + '-')
+
+
+def get_host_clusters(module, upgrade_unit_ids, upgrade_unit_groups, clusters,
+                      group_name_prefix):
+    '''
+    Returns the dict of host name to cluster name of every host upgrade unit
+    '''
+    host_clusters = {}
+    if clusters:
+        unknown_hosts = []
+        for cluster in clusters:
+            for host in cluster.get('hosts') or []:
+                if host not in upgrade_unit_ids:
+                    unknown_hosts.append(host)
+                host_clusters[host] = cluster['name']
+        if unknown_hosts:
+            module.fail_json(msg='No upgrade unit found for hosts: %s' % ', '.join(unknown_hosts))
+    else:
+        # The hosts of the groups planned by an earlier run are not assigned
+        # to a cluster anymore, the groups mix the clusters.
+        for group in upgrade_unit_groups:
+            if is_planned_group(group, group_name_prefix):
+                continue
+            for upgrade_unit in group.get('upgrade_units') or []:
+                host_clusters[upgrade_unit['display_name']] = group['display_name']
+    for host in upgrade_unit_ids:
+        host_clusters.setdefault(host, host)
+    return host_clusters
+
+
+def is_group_up_to_date(existing_group, group):
+    '''
+    Returns True if the existing upgrade unit group already has the settings
+    and the upgrade units of group
+    '''
+    for key in ('type', 'parallel', 'enabled'):
+        if existing_group.get(key) != group[key]:
+            return False
+    existing_unit_ids = set(upgrade_unit['id'] for upgrade_unit
+                            in existing_group.get('upgrade_units') or [])
+    return existing_unit_ids == set(upgrade_unit['id'] for upgrade_unit
+                                    in group['upgrade_units'])
+
+
+def apply_upgrade_waves(module, manager_url, mgr_username, mgr_password, validate_certs,
+                        headers, waves, upgrade_unit_ids, upgrade_unit_groups,
+                        group_name_prefix):
+    '''
+    Creates or updates one upgrade unit group per wave, orders them as the
+    waves and deletes the planned groups not needed anymore. Returns True if
+    a group was created, updated, reordered or deleted.
+    '''
+    changed = False
+    existing_groups = dict((group['display_name'], group) for group in upgrade_unit_groups)
+    group_ids = []
+    for index, wave in enumerate(waves):
+        display_name = '%s-%d' % (group_name_prefix, index + 1)
+        group = dict(display_name=display_name, type='HOST', parallel=True, enabled=True,
+                     upgrade_units=[dict(id=upgrade_unit_ids[host]) for host in wave])
+        existing_group = existing_groups.get(display_name)
+        if existing_group and is_group_up_to_date(existing_group, group):
+            group_ids.append(existing_group['id'])
+            continue
+        try:
+            if existing_group:
+                group_id = existing_group['id']
+                group['_revision'] = existing_group['_revision']
+                request(manager_url + UPGRADE_UNIT_GROUPS + '/%s' % group_id,
+                        data=json.dumps(group), headers=headers, method='PUT',
+                        url_username=mgr_username, url_password=mgr_password,
+                        validate_certs=validate_certs)
+            else:
+                (rc, resp) = request(manager_url + UPGRADE_UNIT_GROUPS,
+                                     data=json.dumps(group), headers=headers, method='POST',
+                                     url_username=mgr_username, url_password=mgr_password,
+                                     validate_certs=validate_certs)
+                group_id = resp['id']
+        except Exception as err:
+            module.fail_json(msg='Failed to apply upgrade unit group %s. Error[%s].'
+                                 % (display_name, to_native(err)))
+        group_ids.append(group_id)
+        changed = True
+
+    # The groups are listed in their upgrade order. The planned ones have to
+    # come first, as the waves. The stale planned groups are deleted below.
+    current_order = [group['id'] for group in upgrade_unit_groups
+                     if group['id'] in group_ids or
+                     not is_planned_group(group, group_name_prefix)]
+    if current_order[:len(group_ids)] != group_ids:
+        # The first wave goes before all the other groups, the next ones
+        # after it
+        first_group_ids = [group_id for group_id in current_order
+                           if group_id not in group_ids]
+        for index, group_id in enumerate(group_ids):
+            if index > 0:
+                reorder = dict(id=group_ids[index - 1], is_before=False)
+            elif first_group_ids:
+                reorder = dict(id=first_group_ids[0], is_before=True)
+            else:
+                continue
+            try:
+                request(manager_url + UPGRADE_UNIT_GROUPS + '/%s?action=reorder' % group_id,
+                        data=json.dumps(reorder), headers=headers, method='POST',
+                        url_username=mgr_username, url_password=mgr_password,
+                        validate_certs=validate_certs)
+            except Exception as err:
+                module.fail_json(msg='Failed to order upgrade unit group %s. Error[%s].'
+                                     % (group_id, to_native(err)))
+        changed = True
+
+    for group in upgrade_unit_groups:
+        if is_planned_group(group, group_name_prefix) and group['id'] not in group_ids:
+            try:
+                request(manager_url + UPGRADE_UNIT_GROUPS + '/%s' % group['id'],
+                        data='', headers=headers, method='DELETE',
+                        url_username=mgr_username, url_password=mgr_password,
+                        validate_certs=validate_certs)
+            except Exception as err:
+                module.fail_json(msg='Failed to delete upgrade unit group %s. Error[%s].'
+                                     % (group['display_name'], to_native(err)))
+            changed = True
+    return changed
+
+
+def apply_plan_settings(module, manager_url, mgr_username, mgr_password, validate_certs,
+                        headers, plan_settings):
+    '''
+    Updates the host upgrade plan settings if they differ from plan_settings.
+    Returns True if they were updated.
+    '''
+    try:
+        (rc, resp) = request(manager_url + '/upgrade/plan/HOST/settings',
+                             headers=dict(Accept='application/json'),
+                             url_username=mgr_username, url_password=mgr_password,
+                             validate_certs=validate_certs)
+    except Exception as err:
+        module.fail_json(msg='Error accessing host upgrade plan settings. Error[%s].'
+                             % to_native(err))
+    if all(resp.get(key) == value for key, value in plan_settings.items()):
+        return False
+    try:
+        request(manager_url + '/upgrade/plan/HOST/settings', data=json.dumps(plan_settings),
+                headers=headers, method='PUT', url_username=mgr_username,
+                url_password=mgr_password, validate_certs=validate_certs)
+    except Exception as err:
+        module.fail_json(msg='Failed to update host upgrade plan settings. Error[%s].' % to_native(err))
+    return True
+
+
+def main():
+    argument_spec = vmware_argument_spec()
+    argument_spec.update(max_hosts_down=dict(type='int', required=True),
+                         max_hosts_down_per_cluster=dict(type='int', required=False, default=1),
+                         clusters=dict(type='list', required=False),
+                         host_upgrade_times=dict(type='dict', required=False),
+                         default_host_upgrade_time=dict(type='int', required=False, default=1800),
+                         group_name_prefix=dict(type='str', required=False, default='planned-wave'),
+                         pause_after_each_group=dict(type='bool', required=False, default=False),
+                         pause_on_error=dict(type='bool', required=False, default=True))
+
+    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
+    mgr_hostname = module.params['hostname']
+    mgr_username = module.params['username']
+    mgr_password = module.params['password']
+    validate_certs = module.params['validate_certs']
+    group_name_prefix = module.params['group_name_prefix']
+    host_upgrade_times = module.params['host_upgrade_times'] or {}
+    default_time = module.params['default_host_upgrade_time']
+
+    headers = dict(Accept="application/json")
+    headers['Content-Type'] = 'application/json'
+
+    mgr_hostname = get_upgrade_orchestrator_node(module, mgr_hostname, mgr_username,
+                                                 mgr_password, headers, validate_certs)
+    manager_url = 'https://{}/api/v1'.format(mgr_hostname)
+
+    try:
+        upgrade_units = get_paginated_results(manager_url, '/upgrade/upgrade-units?component_type=HOST',
+                                              mgr_username, mgr_password, validate_certs)
+        upgrade_unit_groups = get_paginated_results(manager_url, UPGRADE_UNIT_GROUPS + '?component_type=HOST',
+                                                    mgr_username, mgr_password, validate_certs)
+    except Exception as err:
+        module.fail_json(msg='Error accessing host upgrade units. Error [%s]' % to_native(err))
+    upgrade_unit_ids = dict((upgrade_unit['display_name'], upgrade_unit['id'])
+                            for upgrade_unit in upgrade_units)
+
+    host_clusters = get_host_clusters(module, upgrade_unit_ids, upgrade_unit_groups,
+                                      module.params['clusters'], group_name_prefix)
+    try:
+        waves = plan_upgrade_waves(host_clusters, module.params['max_hosts_down'],
+                                   module.params['max_hosts_down_per_cluster'],
+                                   host_upgrade_times, default_time)
+    except ValueError as err:
+        module.fail_json(msg=to_native(err))
+
+    simulation = simulate_upgrade_duration(waves, host_upgrade_times, default_time)
+    serial_simulation = simulate_upgrade_duration([[host] for host in host_clusters],
+                                                  host_upgrade_times, default_time)
+    plan = [dict(group='%s-%d' % (group_name_prefix, index + 1), hosts=wave,
+                 expected_duration=simulation['waves'][index])
+            for index, wave in enumerate(waves)]
+    result = dict(plan=plan, expected_duration=simulation['total'],
+                  serial_expected_duration=serial_simulation['total'])
+
+    if module.check_mode:
+        module.exit_json(changed=False, **result)
+
+    changed = apply_upgrade_waves(module, manager_url, mgr_username, mgr_password,
+                                  validate_certs, headers, waves, upgrade_unit_ids,
+                                  upgrade_unit_groups, group_name_prefix)
+
+    # Groups one after the other, the hosts of a group in parallel
+    plan_settings = dict(parallel=False,
+                         pause_after_each_group=module.params['pause_after_each_group'],
+                         pause_on_error=module.params['pause_on_error'])
+    if apply_plan_settings(module, manager_url, mgr_username, mgr_password, validate_certs,
+                           headers, plan_settings):
+        changed = True
+
+    if changed:
+        message = 'Host upgrade plan with %s groups applied.' % len(waves)
+    else:
+        message = 'Host upgrade plan with %s groups already applied.' % len(waves)
+    module.exit_json(changed=changed, message=message, **result)
+
+
+if __name__ == '__main__':
+    main()
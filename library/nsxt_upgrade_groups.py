@@ -89,22 +89,67 @@ RETURN = '''# '''
 import json, time
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.vmware_nsxt import vmware_argument_spec, request
-from ansible.module_utils.common_utils import clean_and_get_params, get_id_from_display_name_results, get_upgrade_orchestrator_node
+from ansible.module_utils.common_utils import clean_and_get_params, get_upgrade_orchestrator_node, \
+     get_paginated_results
 from ansible.module_utils._text import to_native
 
+def get_upgrade_unit_ids(module, manager_url, mgr_username, mgr_password,
+                         validate_certs, component_type):
+  '''
+  params:
+  - component_type: Type of the upgrade units to retrieve, like HOST
+  result:
+  Map of the display name (the host name) of every upgrade unit to its id.
+  The upgrade units are retrieved only once.
+  '''
+  endpoint = '/upgrade/upgrade-units'
+  if component_type:
+    endpoint += '?component_type=%s' % component_type
+  try:
+    upgrade_units = get_paginated_results(manager_url, endpoint, mgr_username,
+                                          mgr_password, validate_certs)
+  except Exception as err:
+    module.fail_json(msg='Error accessing upgrade units. Error [%s]' % to_native(err))
+  upgrade_unit_ids = {}
+  for upgrade_unit in upgrade_units:
+    upgrade_unit_ids.setdefault(upgrade_unit.get('display_name'), upgrade_unit['id'])
+  return upgrade_unit_ids
+
+def get_upgrade_unit_group_id(module, manager_url, mgr_username, mgr_password,
+                              validate_certs, display_name):
+  '''
+  Returns the id of the upgrade unit group with this display name, None if
+  there is none. All the pages of groups are searched.
+  '''
+  try:
+    upgrade_unit_groups = get_paginated_results(manager_url, '/upgrade/upgrade-unit-groups',
+                                                mgr_username, mgr_password, validate_certs)
+  except Exception as err:
+    module.fail_json(msg='Error accessing upgrade unit groups. Error [%s]' % to_native(err))
+  for upgrade_unit_group in upgrade_unit_groups:
+    if upgrade_unit_group.get('display_name') == display_name:
+      return upgrade_unit_group['id']
+  return None
+
 def update_group_parameters(module, manager_url, 
                             mgr_username, mgr_password, 
                             validate_certs,
                             upgrade_group_parameters):
   if upgrade_group_parameters.__contains__('upgrade_units'):
+    upgrade_unit_ids = get_upgrade_unit_ids(module, manager_url, mgr_username,
+                                            mgr_password, validate_certs,
+                                            upgrade_group_parameters.get('type'))
+    unresolved_host_names = []
     for upgrade_unit in upgrade_group_parameters['upgrade_units']:
       host_name = upgrade_unit.pop('host_name', None)
-      upgrade_unit_id = get_id_from_display_name_results(module, manager_url, 
-                                     '/upgrade/upgrade-units', mgr_username,
-                                     mgr_password, validate_certs, 
-                                     ['display_name'], ['id'],
-                                     host_name)
-      upgrade_unit['id']= upgrade_unit_id
+      if host_name is None:
+        continue
+      if host_name not in upgrade_unit_ids:
+        unresolved_host_names.append(host_name)
+        continue
+      upgrade_unit['id'] = upgrade_unit_ids[host_name]
+    if unresolved_host_names:
+      module.fail_json(msg='No upgrade unit found for hosts: %s' % ', '.join(unresolved_host_names))
   return upgrade_group_parameters
 
 def main():
@@ -142,11 +187,9 @@ def main():
                                                  mgr_password, validate_certs, 
                                                  upgrade_group_params)
 
-  upgrade_unit_group_id = get_id_from_display_name_results(module, manager_url, 
-                                        '/upgrade/upgrade-unit-groups', mgr_username, 
-                                        mgr_password, validate_certs, ['display_name'], 
-                                        ['id'], upgrade_group_params['display_name'], 
-                                        False)
+  upgrade_unit_group_id = get_upgrade_unit_group_id(module, manager_url, mgr_username,
+                                                    mgr_password, validate_certs,
+                                                    upgrade_group_params['display_name'])
   if state == 'present':
     # create a new upgrade group or modify the existing one 
     if module.check_mode:
@@ -64,54 +64,19 @@ EXAMPLES = '''
 
 RETURN = '''# '''
 
-import json, time
-from csv import reader
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.vmware_nsxt import vmware_argument_spec, request
-from ansible.module_utils.common_utils import get_attribute_from_endpoint, clean_and_get_params, get_upgrade_orchestrator_node
+from ansible.module_utils.common_utils import get_upgrade_orchestrator_node
+from ansible.module_utils.upgrade_checks import wait_for_checks_to_execute, get_post_upgrade_check_statuses, \
+     CHECKS_FAILED
 from ansible.module_utils._text import to_native
 
-def wait_for_post_upgrade_checks_to_execute(manager_url, endpoint, mgr_username,
-                                  mgr_password, validate_certs, component_type, 
-                                  time_out=10800):
-  '''
-    params:
-    - endpoint: API endpoint.
-    - attribute_list: The attribute whose value should become the desired attribute value
-    - desired_attribute_value: The desired attribute value
-    
-    Function will wait till the attribute value derived from going deep to attribute list
-    becomes equal to desired_attribute_value.
-   '''
-  operation_time = 0
-  while True:
-    try:
-      (rc, resp) = request(manager_url + endpoint, headers=dict(Accept='application/json'),
-                           url_username=mgr_username, url_password=mgr_password, 
-                           validate_certs=validate_certs, ignore_errors=True)
-    except Exception as err:
-       pass
-    if resp.__contains__('results'):
-      flag = True
-      results = resp['results']
-      for result in results:
-        if result['post_upgrade_status']['status'] != 'COMPLETED'
-                             '' and result['type']= component_type.upper():
-          flag = False
-      if flag:
-        return None
-    time.sleep(15)
-    operation_time = operation_time + 15
-    if operation_time > time_out:
-      raise Exception('Operation timed out.')
-
 def main():
   argument_spec = vmware_argument_spec()
   argument_spec.update(timeout=dict(type='int', required=False),
                       component_type=dict(required=True, choices=['mp', 'host', 'edge']))
 
   module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
-  state = module.params['state']
   mgr_hostname = module.params['hostname']
   mgr_username = module.params['username']
   mgr_password = module.params['password']
@@ -142,28 +107,20 @@ def main():
     module.fail_json(msg="Failed to execute post upgrade checks. Error[%s]." % to_native(err))
 
   try:
-    if timeout is None:
-      wait_for_post_upgrade_checks_to_execute(manager_url, '/upgrade/upgrade-unit-groups'
-                                             '/aggregate-info', mgr_username, mgr_password, 
-                                             validate_certs, component_type)
-    else:
-      wait_for_post_upgrade_checks_to_execute(manager_url, '/upgrade/upgrade-unit-groups'
-                                             '/aggregate-info', mgr_username, mgr_password,
-                                             validate_certs, component_type, timeout)
+    checks_execution = wait_for_checks_to_execute(manager_url, '/upgrade/upgrade-unit-groups'
+                                                  '/aggregate-info', mgr_username, mgr_password,
+                                                  validate_certs, get_post_upgrade_check_statuses,
+                                                  [component_type], time_out=timeout or 10800)
   except Exception as err:
       module.fail_json(msg='Error while polling for execution of post upgrade'
                              ' checks. Error [%s]' % to_native(err))
-  time.sleep(5)
   changed = True
-  try:
-    (rc, resp) = request(manager_url+ '/upgrade/upgrade-unit-groups/aggregate-info', 
-                         url_username=mgr_username, url_password=mgr_password, 
-                         validate_certs=validate_certs)
-  except Exception as err:
-    module.fail_json(msg='Post upgrade checks were executed successfully but error'
-                  ' occured while retrieving the results. Error [%s]' % (to_native(err)))
-  module.exit_json(changed=changed, message='Post upgrade checks are performed successfully:\n'
-                     '----------------------------\n' + str(resp))
+  if checks_execution['status'] == CHECKS_FAILED:
+    message = 'Post upgrade checks failed.'
+  else:
+    message = 'Post upgrade checks are performed successfully.'
+  module.exit_json(changed=changed, message=message, checks_status=checks_execution['status'],
+                   groups=checks_execution['items'], progress=checks_execution['progress'])
 
 if __name__ == '__main__':
     main()
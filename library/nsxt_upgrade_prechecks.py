@@ -42,6 +42,21 @@ options:
         description: 'The password to authenticate with the NSX manager.'
         required: true
         type: str
+    severity:
+        description: "Least severe pre upgrade check results returned. Less
+                      severe results are only counted in the summary."
+        choices:
+            - info
+            - warning
+            - failure
+        default: warning
+        required: false
+        type: str
+    results_file:
+        description: 'If set, the returned results are also written to this
+                      file, one JSON object per line.'
+        required: false
+        type: str
     state:
         choices:
             - present
@@ -59,57 +74,30 @@ EXAMPLES = '''
       username: "admin"
       password: "Admin!23Admin"
       validate_certs: False
+      severity: 'failure'
+      results_file: '/tmp/pre-upgrade-checks.ndjson'
       state: 'present'
 '''
 
 RETURN = '''# '''
 
 import json, time
-from csv import reader
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.vmware_nsxt import vmware_argument_spec, request
-from ansible.module_utils.common_utils import get_attribute_from_endpoint, clean_and_get_params, get_upgrade_orchestrator_node
+from ansible.module_utils.common_utils import clean_and_get_params, get_upgrade_orchestrator_node
+from ansible.module_utils.upgrade_checks import SEVERITIES, stream_check_results, filter_check_results, \
+     wait_for_checks_to_execute, get_pre_upgrade_check_statuses, CHECKS_FAILED
 from ansible.module_utils._text import to_native
 
-def wait_for_pre_upgrade_checks_to_execute(manager_url, endpoint, mgr_username,
-                                  mgr_password, validate_certs, time_out=10800):
-  '''
-    params:
-    - endpoint: API endpoint.
-    - attribute_list: The attribute whose value should become the desired attribute value
-    - desired_attribute_value: The desired attribute value
-    
-    Function will wait till the attribute value derived from going deep to attribute list
-    becomes equal to desired_attribute_value.
-   '''
-  operation_time = 0
-  while True:
-    try:
-      (rc, resp) = request(manager_url + endpoint, headers=dict(Accept='application/json'),
-                           url_username=mgr_username, url_password=mgr_password, 
-                           validate_certs=validate_certs, ignore_errors=True)
-    except Exception as err:
-       pass
-    if resp.__contains__('component_status'):
-      flag = True
-      component_statuses = resp['component_status']
-      for component_status in component_statuses:
-        if component_status['pre_upgrade_status']['status'] != 'COMPLETED':
-          flag = False
-      if flag:
-        return None
-    time.sleep(15)
-    operation_time = operation_time + 15
-    if operation_time > time_out:
-      raise Exception('Operation timed out.')
-
 def main():
   argument_spec = vmware_argument_spec()
   argument_spec.update(timeout=dict(type='int', required=False),
+                      severity=dict(type='str', required=False, default='warning', choices=SEVERITIES),
+                      results_file=dict(type='str', required=False),
                       state=dict(required=True, choices=['present', 'absent']))
 
   module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
-  upgrade_prechecks_params = clean_and_get_params(module.params.copy(), ['timeout'])
+  upgrade_prechecks_params = clean_and_get_params(module.params.copy(), ['timeout', 'severity', 'results_file'])
   state = module.params['state']
   mgr_hostname = module.params['hostname']
   mgr_username = module.params['username']
@@ -140,26 +128,27 @@ def main():
       module.fail_json(msg="Failed to execute pre upgrade checks. Error[%s]." % to_native(err))
 
     try:
-      if timeout is None:
-        wait_for_pre_upgrade_checks_to_execute(manager_url, '/upgrade/status-summary', 
-                          mgr_username, mgr_password, validate_certs)
-      else:
-        wait_for_pre_upgrade_checks_to_execute(manager_url, '/upgrade/status-summary', 
-                          mgr_username, mgr_password, validate_certs, timeout)
+      checks_execution = wait_for_checks_to_execute(manager_url, '/upgrade/status-summary',
+                            mgr_username, mgr_password, validate_certs,
+                            get_pre_upgrade_check_statuses, time_out=timeout or 10800)
     except Exception as err:
         module.fail_json(msg='Error while polling for execution of pre upgrade'
                              ' checks. Error [%s]' % to_native(err))
-    time.sleep(5)
     changed = False
     try:
-      (rc, resp) = request(manager_url+ '/upgrade/pre-upgrade-checks?format=csv', 
-                           url_username=mgr_username, url_password=mgr_password, 
-                           validate_certs=validate_certs)
+      results, summary = filter_check_results(
+          stream_check_results(manager_url, '/upgrade/pre-upgrade-checks?format=csv',
+                               mgr_username, mgr_password, validate_certs),
+          module.params['severity'], module.params['results_file'])
     except Exception as err:
       module.fail_json(msg='Pre upgrade checks were executed successfully but error'
                   ' occured while retrieving the results. Error [%s]' % (to_native(err)))
-    module.exit_json(changed=changed, message='Pre upgrade checks are performed successfully:\n'
-                     '----------------------------\n' + str(resp))
+    if checks_execution['status'] == CHECKS_FAILED:
+      message = 'Pre upgrade checks failed.'
+    else:
+      message = 'Pre upgrade checks are performed successfully.'
+    module.exit_json(changed=changed, message=message, checks_status=checks_execution['status'],
+                     progress=checks_execution['progress'], summary=summary, results=results)
   elif state == 'absent':
     # Aborts pre upgrade checks
     try:
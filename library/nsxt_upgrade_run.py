@@ -42,6 +42,19 @@ options:
         description: 'Mode of upgrade'
         required: true
         type: bool
+    min_poll_interval:
+        description: 'Seconds between two polls of the upgrade status while
+                      it changes or right after the upgrade is started or
+                      continued.'
+        required: false
+        default: 5
+        type: int
+    max_poll_interval:
+        description: 'Max seconds between two polls of the upgrade status.
+                      The interval grows up to it while nothing changes.'
+        required: false
+        default: 30
+        type: int
 '''
 
 EXAMPLES = '''
@@ -56,130 +69,214 @@ EXAMPLES = '''
 
 RETURN = '''# '''
 
-import json, time
+import time
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.vmware_nsxt import vmware_argument_spec, request
-from ansible.module_utils.common_utils import get_attribute_from_endpoint, clean_and_get_params, get_upgrade_orchestrator_node
+from ansible.module_utils.common_utils import get_upgrade_orchestrator_node
 from ansible.module_utils._text import to_native
 
-def get_upgrade_status(module, manager_url, mgr_username, mgr_password, validate_certs):
+IN_PROGRESS_STATES = ['IN_PROGRESS', 'PAUSING']
+
+# Next step of the upgrade computed from a status summary
+STEP_WAIT = 'wait'
+STEP_START = 'start'
+STEP_CONTINUE = 'continue'
+STEP_DONE = 'done'
+STEP_FAILED = 'failed'
+
+# Seconds after a start or continue within which the upgrade is expected to
+# be seen in progress. The action is issued again after that.
+ACTION_GRACE_PERIOD = 60
+
+
+class UpgradeTimeline(object):
   '''
-  Get the current status of upgrade at the start.
-  Doesn't upgrade if any component is in progress 
-  or system is already upgraded.
+  Status transitions of each component, with the time they were observed
+  at in seconds since the start of the module.
   '''
-  no_of_checks = 0
-  while True:
-    upgrade_status = get_attribute_from_endpoint(module, manager_url, '/upgrade/status-summary',
-                     mgr_username, mgr_password, validate_certs, 'overall_upgrade_status', 
-                     False)
-    no_of_checks = no_of_checks + 1
-    if upgrade_status == 'IN_PROGRESS' or upgrade_status == 'PAUSING':
-      if no_of_checks > 2:
-        module.fail_json(msg='Upgrade is in state: %s, can\'t continue' % upgrade_status)
-    elif upgrade_status == 'SUCCESS':
-      module.exit_json(changed=False, message='Upgrade state is SUCCESS. No need to'
-                    ' continue.')
-    else:
-      return upgrade_status
-    time.sleep(20)
+  def __init__(self):
+    self.start_time = time.time()
+    self.components = {}
+
+  def update(self, component_status_list):
+    '''
+    Records the status changes. Returns True if anything changed.
+    '''
+    changed = False
+    now = round(time.time() - self.start_time)
+    for component_status in component_status_list:
+      component_type = component_status.get('component_type')
+      status = component_status.get('status')
+      percent_complete = component_status.get('percent_complete')
+      component = self.components.setdefault(component_type, dict(
+          component_type=component_type, status=None, percent_complete=None,
+          transitions=[], started_at=None, finished_at=None, duration=None))
+      if component['percent_complete'] != percent_complete:
+        component['percent_complete'] = percent_complete
+        changed = True
+      if component['status'] == status:
+        continue
+      changed = True
+      component['transitions'].append(dict(status=status, at=now))
+      if status in IN_PROGRESS_STATES and component['started_at'] is None:
+        component['started_at'] = now
+      elif status not in IN_PROGRESS_STATES and component['started_at'] is not None:
+        component['finished_at'] = now
+        component['duration'] = now - component['started_at']
+      component['status'] = status
+    return changed
+
+  def get(self):
+    return list(self.components.values())
 
-def decide_next_step(module, manager_url, mgr_username, mgr_password, 
-                     validate_certs, can_continue, is_failed):
+def get_next_step(summary):
   '''
   params:
-  - can_continue: if upgrade can be continued 
-  - is_failed: Is there any component Failure
-  return:
-  - Decides the next operation to be done based on 
-    can_continue and is_failed values 
+  - summary: Response of /upgrade/status-summary
+  result:
+  (next step, component the step is about)
   '''
-  if can_continue and is_failed:
-    return
-  elif can_continue and not is_failed:
-    return
-  elif not can_continue and is_failed:
-    raise Exception('Upgrade failed. Please run upgrade status summary'
-                    ' to see the reason of upgrade failure.')
-  else:
-    time.sleep(15)
-    try:
-      upgrade_status = get_attribute_from_endpoint(module, manager_url, '/upgrade/summary',
-                        mgr_username, mgr_password, validate_certs, 'upgrade_status',
-                        False)
-    except Exception as err:
-      return
-    if upgrade_status == 'SUCCESS':
-      module.exit_json(changed=True, message='System has been upgraded successfully!!!')
-    elif upgrade_status == 'IN_PROGRESS' or upgrade_status == 'PAUSING' or upgrade_status == 'PAUSED':
-      return
-    else:
-      module.fail_json(msg='All components till last one are upgraded. Still upgrade status'
-        ' is %s. Please run upgrade status summary to see the reason.' % upgrade_status)
+  component_status_list = summary.get('component_status', [])
+  for component_status in component_status_list:
+    if component_status.get('status') == 'FAILED':
+      return STEP_FAILED, component_status
+  for component_status in component_status_list:
+    if component_status.get('status') in IN_PROGRESS_STATES:
+      return STEP_WAIT, component_status
+  overall_status = summary.get('overall_upgrade_status')
+  if overall_status in IN_PROGRESS_STATES:
+    return STEP_WAIT, None
+  if overall_status == 'SUCCESS' or (component_status_list and all(
+      component_status.get('status') == 'SUCCESS'
+      for component_status in component_status_list)):
+    return STEP_DONE, None
+  if overall_status == 'NOT_STARTED':
+    return STEP_START, None
+  # A component is paused, or upgraded with the next one not started
+  return STEP_CONTINUE, None
 
+def get_status_summary(manager_url, mgr_username, mgr_password, validate_certs):
+  (rc, resp) = request(manager_url + '/upgrade/status-summary',
+                       headers=dict(Accept='application/json'),
+                       url_username=mgr_username, url_password=mgr_password,
+                       validate_certs=validate_certs)
+  return resp
 
-def check_continuity(module, manager_url, mgr_username, mgr_password, validate_certs):
+def get_upgrade_summary_status(manager_url, mgr_username, mgr_password, validate_certs):
   '''
-  Returns:
-  Based on the output of upgrade status summary API, gets the
-  checks and returns if upgrade can be continued and
-  if there is any component fail in the upgrade
+  Returns the upgrade_status of /upgrade/summary, None if it cannot be read.
+  It is what tells if the whole upgrade is over once every component is.
   '''
   try:
-    component_status_list = get_attribute_from_endpoint(module, manager_url, 
-                          '/upgrade/status-summary', mgr_username, mgr_password,
-                          validate_certs, 'component_status', False)
+    (rc, resp) = request(manager_url + '/upgrade/summary',
+                         headers=dict(Accept='application/json'),
+                         url_username=mgr_username, url_password=mgr_password,
+                         validate_certs=validate_certs)
   except Exception as err:
-    can_continue = True
-    is_failed = True
-    return can_continue, is_failed
-  try:
-    can_continue = True
-    for component_status in component_status_list:
-      if component_status['status'] == 'IN_PROGRESS' or \
-         component_status['status'] == 'PAUSING':
-        can_continue = False
-        break
-    if not can_continue:
-      return can_continue, False
+    return None
+  return resp.get('upgrade_status')
+
+def run_upgrade(module, manager_url, mgr_username, mgr_password, validate_certs,
+                headers, paused_upgrade, min_poll_interval, max_poll_interval):
+  '''
+  Upgrade state machine. Each tick fetches the status summary once, records
+  it in the timeline and starts or continues the upgrade as soon as the
+  previous component allows it. The poll interval is reset to
+  min_poll_interval whenever the status changes and grows up to
+  max_poll_interval while it does not.
+  With paused_upgrade, returns once a component has been upgraded.
+  A component found FAILED at the start is continued, which is how an upgrade
+  is resumed once the failure has been fixed. The module fails if it is still
+  FAILED after ACTION_GRACE_PERIOD.
+  '''
+  timeline = UpgradeTimeline()
+  poll_interval = min_poll_interval
+  first_tick = True
+  in_progress_at_start = 0
+  action_time = None
+  actions = 0
+  upgraded_since_action = False
+  while True:
+    try:
+      summary = get_status_summary(manager_url, mgr_username, mgr_password, validate_certs)
+    except Exception as err:
+      # The API is not reachable while the manager upgrades itself
+      summary = None
+    if summary is not None:
+      changed = timeline.update(summary.get('component_status', []))
+      poll_interval = min_poll_interval if changed else min(
+          max_poll_interval, int(poll_interval * 1.5) + 1)
+      step, component_status = get_next_step(summary)
+
+      if first_tick and summary.get('overall_upgrade_status') == 'SUCCESS':
+        module.exit_json(changed=False, message='Upgrade state is SUCCESS. No need to'
+                         ' continue.', timeline=timeline.get())
+      if step == STEP_WAIT and actions == 0:
+        # An upgrade started by someone else is not taken over
+        in_progress_at_start = in_progress_at_start + 1
+        if in_progress_at_start > 2:
+          module.fail_json(msg='Upgrade is in state: %s, can\'t continue' %
+                           summary.get('overall_upgrade_status'), timeline=timeline.get())
+      first_tick = False
+      if step == STEP_FAILED and actions == 0:
+        step = STEP_CONTINUE
+      in_grace_period = (action_time is not None and
+                         time.time() - action_time < ACTION_GRACE_PERIOD)
+
+      if step == STEP_WAIT:
+        action_time = None
+        upgraded_since_action = actions > 0
+      elif step == STEP_FAILED and in_grace_period:
+        # The continue may not have been picked up yet
+        poll_interval = min_poll_interval
+      elif step == STEP_FAILED:
+        module.fail_json(msg='Upgrade of %s failed. Please run upgrade status summary'
+                         ' to see the reason of upgrade failure. Details: %s' %
+                         (component_status.get('component_type'),
+                          component_status.get('details')),
+                         timeline=timeline.get())
+      elif step == STEP_DONE:
+        upgrade_status = get_upgrade_summary_status(manager_url, mgr_username,
+                                                    mgr_password, validate_certs)
+        if upgrade_status is None:
+          upgrade_status = summary.get('overall_upgrade_status')
+        if upgrade_status == 'SUCCESS':
+          module.exit_json(changed=actions > 0, message='System has been upgraded successfully!!!',
+                           timeline=timeline.get())
+        elif upgrade_status is not None and upgrade_status not in IN_PROGRESS_STATES + ['PAUSED']:
+          module.fail_json(msg='All components till last one are upgraded. Still upgrade status'
+                           ' is %s. Please run upgrade status summary to see the reason.' %
+                           upgrade_status, timeline=timeline.get())
+      elif in_grace_period:
+        # The last start or continue is not reflected in the summary yet
+        poll_interval = min_poll_interval
+      elif paused_upgrade and upgraded_since_action:
+        module.exit_json(changed=True, message='A component has been upgraded successfully.'
+                                               ' Whole system is not. Please run the module'
+                                               ' again till the time whole system is'
+                                               ' not upgraded.', timeline=timeline.get())
+      else:
+        try:
+          (rc, resp) = request(manager_url + '/upgrade/plan?action=%s' % step,
+                               data='', headers=headers, method='POST',
+                               url_username=mgr_username, url_password=mgr_password,
+                               validate_certs=validate_certs, ignore_errors=True)
+        except Exception as err:
+          module.fail_json(msg="Failed while upgrading. Error[%s]." % to_native(err),
+                           timeline=timeline.get())
+        action_time = time.time()
+        actions = actions + 1
+        upgraded_since_action = False
+        poll_interval = min_poll_interval
     else:
-      is_failed = False
-      found_not_started = False
-      for component_status in component_status_list[::-1]:
-        if component_status['status'] == 'NOT_STARTED':
-          found_not_started = True
-        elif component_status['status'] == 'PAUSED':
-          can_continue = True
-          is_failed = False
-          return can_continue, is_failed
-        elif component_status['status'] == 'SUCCESS':
-          if not found_not_started:
-            can_continue = False
-            is_failed = False
-            return can_continue, is_failed
-          else:
-            can_continue = True
-            is_failed = False
-            return can_continue, is_failed
-        elif component_status['status'] == 'FAILED':
-          can_continue = False
-          is_failed = True
-          return can_continue, is_failed
-        elif component_status['status'] == 'IN_PROGRESS' or \
-        component_status['status'] == 'PAUSING':
-          can_continue = False
-          is_failed = False
-          return can_continue, is_failed
-        else:
-          return True, True
-  except Exception as err:
-    can_continue = True
-    is_failed = True
-    return can_continue, is_failed
+      poll_interval = max_poll_interval
+    time.sleep(poll_interval)
 
 def main():
   argument_spec = vmware_argument_spec()
-  argument_spec.update(paused_upgrade=dict(type='bool', required=True))
+  argument_spec.update(paused_upgrade=dict(type='bool', required=True),
+                       min_poll_interval=dict(type='int', required=False, default=5),
+                       max_poll_interval=dict(type='int', required=False, default=30))
 
   module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
   mgr_hostname = module.params['hostname']
@@ -202,76 +299,9 @@ def main():
     else:
       module.exit_json(changed=False, debug_out='NSX-T will upgrade without pauses.')
 
-  # If paused_upgrade is not true i.e auto mode
-  if not paused_upgrade:
-    while True:
-      upgrade_status = get_upgrade_status(module, manager_url, mgr_username,
-                                          mgr_password, validate_certs)
-      if upgrade_status == 'NOT_STARTED':
-        try:
-          (rc, resp) = request(manager_url+ '/upgrade/plan?action=start', 
-                         data='', headers=headers, method='POST', 
-                         url_username=mgr_username, url_password=mgr_password, 
-                         validate_certs=validate_certs, ignore_errors=True)
-        except Exception as err:
-          module.fail_json(msg="Failed while upgrading. Error[%s]." % to_native(err))
-      else:
-        try:
-          (rc, resp) = request(manager_url+ '/upgrade/plan?action=continue', 
-                         data='', headers=headers, method='POST', 
-                         url_username=mgr_username, url_password=mgr_password, 
-                         validate_certs=validate_certs, ignore_errors=True)
-        except Exception as err:
-          module.fail_json(msg="Failed while upgrading. Error[%s]." % to_native(err))
-
-      time.sleep(10)
-      while True:
-        try:
-          can_continue, is_failed = check_continuity(module, manager_url, mgr_username,
-                                                     mgr_password, validate_certs)
-          decide_next_step(module, manager_url, mgr_username, mgr_password, 
-                           validate_certs, can_continue, is_failed)
-          if can_continue and not is_failed:
-            break
-          time.sleep(10)
-        except Exception as err:
-          module.fail_json(msg='Upgrade failed. Error: [%s]' % to_native(err))
-  else:
-    # Paused upgrade i.e manual mode
-    upgrade_status = get_upgrade_status(module, manager_url, mgr_username,
-                                          mgr_password, validate_certs)
-    if upgrade_status == 'NOT_STARTED':
-      try:
-        (rc, resp) = request(manager_url+ '/upgrade/plan?action=start', 
-                     data='', headers=headers, method='POST', 
-                     url_username=mgr_username, url_password=mgr_password, 
-                     validate_certs=validate_certs, ignore_errors=True)
-      except Exception as err:
-        module.fail_json(msg="Failed while upgrading. Error[%s]." % to_native(err))
-    else:
-      try:
-        (rc, resp) = request(manager_url+ '/upgrade/plan?action=continue', 
-                     data='', headers=headers, method='POST', 
-                     url_username=mgr_username, url_password=mgr_password, 
-                     validate_certs=validate_certs, ignore_errors=True)
-      except Exception as err:
-        module.fail_json(msg="Failed while upgrading. Error[%s]." % to_native(err))
-    time.sleep(10)
-    while True:
-      try:
-        can_continue, is_failed = check_continuity(module, manager_url, mgr_username,
-                                                   mgr_password, validate_certs)
-        decide_next_step(module, manager_url, mgr_username, mgr_password, 
-                         validate_certs, can_continue, is_failed)
-        if can_continue and not is_failed:
-          break
-        time.sleep(10)
-      except Exception as err:
-        module.fail_json(msg='Upgrade failed. Error: [%s]' % to_native(err))
-    module.exit_json(changed=True, message='A component has been upgraded successfully.'
-                                           ' Whole system is not. Please run the module'
-                                           ' again till the time whole system is'
-                                           ' not upgraded.')
+  run_upgrade(module, manager_url, mgr_username, mgr_password, validate_certs, headers,
+              paused_upgrade, module.params['min_poll_interval'],
+              module.params['max_poll_interval'])
 
 if __name__ == '__main__':
     main()
@@ -162,9 +162,12 @@ EXAMPLES = '''
 RETURN = '''# '''
 
 
-import json, time
+import json
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.vmware_nsxt import vmware_argument_spec, request
+from ansible.module_utils.nsx_search import find_by_display_name
+from ansible.module_utils.common_utils import wait_for_write_confirmation
+from ansible.module_utils.diff_utils import is_update_required
 from ansible.module_utils._text import to_native
 
 def get_profile_params(args=None):
@@ -176,32 +179,22 @@ def get_profile_params(args=None):
             args.pop(key, None)
     return args
 
-def get_host_switch_profiles(module, manager_url, mgr_username, mgr_password, validate_certs):
+def get_uplink_profile_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, display_name):
     try:
-      (rc, resp) = request(manager_url+ '/host-switch-profiles', headers=dict(Accept='application/json'),
-                      url_username=mgr_username, url_password=mgr_password, validate_certs=validate_certs, ignore_errors=True)
+      return find_by_display_name(manager_url, '/host-switch-profiles', mgr_username, mgr_password,
+                                  validate_certs, display_name,
+                                  resource_types=['UplinkHostSwitchProfile'])
     except Exception as err:
       module.fail_json(msg='Error accessing host profiles. Error [%s]' % (to_native(err)))
-    return resp
-
-def get_uplink_profile_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, display_name):
-    host_switch_profiles = get_host_switch_profiles(module, manager_url, mgr_username, mgr_password, validate_certs)
-    for host_switch_profile in host_switch_profiles['results']:
-        if host_switch_profile.__contains__('display_name') and host_switch_profile['display_name'] == display_name:
-            return host_switch_profile
-    return None
 
 def check_for_update(module, manager_url, mgr_username, mgr_password, validate_certs, profile_params):
     existing_profile = get_uplink_profile_from_display_name(module, manager_url, mgr_username, mgr_password, validate_certs, profile_params['display_name'])
     if existing_profile is None:
         return False
-    if existing_profile.__contains__('mtu') and profile_params.__contains__('mtu') and \
-        existing_profile['mtu'] != profile_params['mtu']:
-        return True
-    if existing_profile.__contains__('transport_vlan') and profile_params.__contains__('transport_vlan') and \
-        existing_profile['transport_vlan'] != profile_params['transport_vlan']:
-        return True
-    return False
+    # The order of the active and standby uplinks is the failover order, so
+    # only the named teamings are matched by name.
+    return is_update_required(existing_profile, profile_params,
+                              list_keys={'named_teamings': 'name'})
 
 def main():
   argument_spec = vmware_argument_spec()
@@ -259,7 +252,8 @@ def main():
       except Exception as err:
           module.fail_json(msg="Failed to add host profile. Request body [%s]. Error[%s]." % (request_data, to_native(err)))
 
-      time.sleep(5)
+      wait_for_write_confirmation(manager_url, '/host-switch-profiles/%s' % resp["id"], mgr_username, mgr_password,
+                                  validate_certs, revision=resp.get("_revision"))
       module.exit_json(changed=True, id=resp["id"], body= str(resp), message="host profile with display name %s created." % module.params['display_name'])
     else:
       if module.check_mode:
@@ -274,7 +268,8 @@ def main():
       except Exception as err:
           module.fail_json(msg="Failed to update host profile with id %s. Request body [%s]. Error[%s]." % (id, request_data, to_native(err)))
 
-      time.sleep(5)
+      wait_for_write_confirmation(manager_url, '/host-switch-profiles/%s' % id, mgr_username, mgr_password,
+                                  validate_certs, revision=resp.get("_revision"))
       module.exit_json(changed=True, id=resp["id"], body= str(resp), message="host profile with id %s updated." % id)
 
   elif state == 'absent':
@@ -290,7 +285,8 @@ def main():
     except Exception as err:
         module.fail_json(msg="Failed to delete host profile with id %s. Error[%s]." % (id, to_native(err)))
 
-    time.sleep(5)
+    wait_for_write_confirmation(manager_url, '/host-switch-profiles/%s' % id, mgr_username, mgr_password,
+                                validate_certs, deleted=True)
     module.exit_json(changed=True, object_name=id, message="host profile with id %s deleted." % id)
 
 
@@ -67,10 +67,10 @@ EXAMPLES = '''
 
 RETURN = '''# '''
 
-import json, time
+import json
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.vmware_nsxt import vmware_argument_spec, request
-from ansible.module_utils.common_utils import check_if_valid_ip, get_attribute_from_endpoint
+from ansible.module_utils.common_utils import check_if_valid_ip, get_attribute_from_endpoint, wait_for_write_confirmation
 from ansible.module_utils._text import to_native
 
 def get_virtual_ip_params(args=None):
@@ -117,7 +117,8 @@ def main():
     except Exception as err:
       module.fail_json(msg="Failed to add virtual IP address. Error[%s]." % to_native(err))
 
-    time.sleep(5)
+    wait_for_write_confirmation(manager_url, '/cluster/api-virtual-ip', mgr_username, mgr_password,
+                                validate_certs, check=lambda resp: resp.get('ip_address') == virtual_ip_address)
     module.exit_json(changed=True, result=resp, message="Virtual IP address is set with ip address: %s " % virtual_ip_address)
 
   elif state == 'absent':
@@ -138,7 +139,8 @@ def main():
     except Exception as err:
       module.fail_json(msg="Failed to clear virtual IP address. Error[%s]." % to_native(err))
 
-    time.sleep(5)
+    wait_for_write_confirmation(manager_url, '/cluster/api-virtual-ip', mgr_username, mgr_password,
+                                validate_certs, check=lambda resp: resp.get('ip_address') in (None, '0.0.0.0'))
     if is_virtual_ip_set:
       module.exit_json(changed=True, object_name=virtual_ip_address, message="Cleared cluster virtual IP address.")
     else:
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+#
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause OR GPL-3.0-only
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING,
+# BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+# OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import hashlib
+import socket
+import ssl
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_PORT = 443
+DEFAULT_TIMEOUT = 10
+MAX_CONCURRENT_HANDSHAKES = 16
+
+# (host, port) -> thumbprint, for the duration of the run
+_thumbprints = {}
+_thumbprints_lock = threading.Lock()
+
+
+def format_thumbprint(der_cert):
+    '''
+    Returns the SHA-256 thumbprint of a DER certificate in the format
+    expected by NSX: uppercase hex bytes separated by colons.
+    '''
+    thumb_sha256 = hashlib.sha256(der_cert).hexdigest().upper()
+    return ':'.join(a + b for a, b in zip(thumb_sha256[::2],
+                                          thumb_sha256[1::2]))
+
+
+def _fetch_thumbprint(host, port, timeout):
+    # The certificate is not verified, its thumbprint is what will be trusted
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        with context.wrap_socket(sock, server_hostname=host) as tls_sock:
+            return format_thumbprint(tls_sock.getpeercert(True))
+
+
+def get_cert_thumbprint(host, port=DEFAULT_PORT, timeout=DEFAULT_TIMEOUT):
+    '''
+    params:
+    - host: Host name or IP address of the server
+    - port: TLS port of the server
+    result:
+    SHA-256 thumbprint of the certificate of the server. Raises an exception
+    if the server cannot be reached.
+    '''
+    key = (host, port)
+    with _thumbprints_lock:
+        if key in _thumbprints:
+            return _thumbprints[key]
+    thumbprint = _fetch_thumbprint(host, port, timeout)
+    with _thumbprints_lock:
+        _thumbprints[key] = thumbprint
+    return thumbprint
+
+
+def get_cert_thumbprints(hosts, port=DEFAULT_PORT, timeout=DEFAULT_TIMEOUT):
+    '''
+    params:
+    - hosts: Host names or IP addresses of the servers
+    - port: TLS port of the servers
+    result:
+    (thumbprints, errors) as dicts keyed by host. The handshakes are done
+    concurrently, so the whole call takes about as long as the slowest
+    server.
+    '''
+    thumbprints, errors = {}, {}
+    hosts = list(dict.fromkeys(hosts))
+    if not hosts:
+        return thumbprints, errors
+    with ThreadPoolExecutor(max_workers=min(
+            len(hosts), MAX_CONCURRENT_HANDSHAKES)) as executor:
+        futures = dict((host, executor.submit(get_cert_thumbprint, host,
+                                              port, timeout))
+                       for host in hosts)
+    for host, future in futures.items():
+        try:
+            thumbprints[host] = future.result()
+        except Exception as err:
+            errors[host] = err
+    return thumbprints, errors
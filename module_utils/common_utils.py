@@ -12,6 +12,7 @@
 import time
 from ansible.module_utils.vmware_nsxt import request
 from ansible.module_utils._text import to_native
+from ansible.module_utils.six.moves.urllib.parse import quote
 
 def check_if_valid_ip(ip_address):
     '''
@@ -98,6 +99,98 @@ def get_id_from_display_name_results(module, manager_url, endpoint, mgr_username
     else:
         return None
 
+def iter_paginated_results(manager_url, endpoint, mgr_username, mgr_password,
+                           validate_certs, page_size=1000):
+    '''
+    params:
+    - endpoint: API endpoint of a collection. It can already carry query params.
+    - page_size: Number of results to be requested per page.
+    result:
+    Generator of the results of the collection. The next page is requested
+    only once the results of the previous one have been consumed.
+    '''
+    separator = '&' if '?' in endpoint else '?'
+    cursor = None
+    while True:
+        url = '%s%s%spage_size=%s' % (manager_url, endpoint, separator, page_size)
+        if cursor:
+            url = url + '&cursor=%s' % quote(cursor)
+        (rc, resp) = request(url, headers=dict(Accept='application/json'),
+                             url_username=mgr_username, url_password=mgr_password,
+                             validate_certs=validate_certs)
+        for result in resp.get('results', []):
+            yield result
+        cursor = resp.get('cursor')
+        if not cursor:
+            return
+
+def get_paginated_results(manager_url, endpoint, mgr_username, mgr_password,
+                          validate_certs, page_size=1000):
+    '''
+    params:
+    - endpoint: API endpoint of a collection. It can already carry query params.
+    - page_size: Number of results to be requested per page.
+    result:
+    All the results of the collection. The cursor returned by the manager is
+    followed till the last page is retrieved.
+    '''
+    return list(iter_paginated_results(manager_url, endpoint, mgr_username,
+                                       mgr_password, validate_certs, page_size))
+
+class ReferenceResolver(object):
+    '''
+    Replaces the display names referenced by a spec with their ids. The
+    references are collected with add(), then resolve() retrieves each
+    distinct endpoint once, whatever the number of names looked up in it,
+    and fails the module with all the unresolved names at once.
+    '''
+    def __init__(self, module, manager_url, mgr_username, mgr_password,
+                 validate_certs):
+        self.module = module
+        self.manager_url = manager_url
+        self.mgr_username = mgr_username
+        self.mgr_password = mgr_password
+        self.validate_certs = validate_certs
+        self.references = []
+
+    def add(self, endpoint, display_name, target, id_key):
+        '''
+        params:
+        - endpoint: API endpoint of the collection the name is looked up in
+        - display_name: The name to be resolved
+        - target: dict the id is set in once resolved
+        - id_key: Key of the id in target
+        '''
+        self.references.append((endpoint, display_name, target, id_key))
+
+    def resolve(self):
+        ids_by_endpoint = {}
+        for endpoint, _, _, _ in self.references:
+            if endpoint in ids_by_endpoint:
+                continue
+            try:
+                results = get_paginated_results(self.manager_url, endpoint,
+                                                self.mgr_username, self.mgr_password,
+                                                self.validate_certs)
+            except Exception as err:
+                self.module.fail_json(msg='Error accessing ids for display names'
+                                          ' from %s. Error [%s]' % (endpoint, to_native(err)))
+            ids = {}
+            for result in results:
+                if 'display_name' in result:
+                    ids.setdefault(result['display_name'], result['id'])
+            ids_by_endpoint[endpoint] = ids
+        unresolved = []
+        for endpoint, display_name, target, id_key in self.references:
+            ids = ids_by_endpoint[endpoint]
+            if display_name in ids:
+                target[id_key] = ids[display_name]
+            else:
+                unresolved.append('%s (%s)' % (display_name, endpoint))
+        self.references = []
+        if unresolved:
+            self.module.fail_json(msg='No id exists with display name %s' % ', '.join(unresolved))
+
 def wait_for_operation_to_execute(manager_url, endpoint, mgr_username, 
                                   mgr_password, validate_certs, attribute_list,
                                   desired_attribute_values, undesired_attribute_values,
@@ -132,6 +225,43 @@ def wait_for_operation_to_execute(manager_url, endpoint, mgr_username,
         if operation_time > time_out:
             raise Exception('Operation timed out.')
 
+def wait_for_write_confirmation(manager_url, endpoint, mgr_username, mgr_password,
+                                validate_certs, revision=None, deleted=False, check=None,
+                                time_out=10):
+    '''
+    params:
+    - endpoint: API endpoint of the object written
+    - revision: _revision returned by the write. The read must return at
+      least this revision.
+    - deleted: Wait till the object is not found instead
+    - check: Function of the object read returning True once the write is
+      seen, for objects without revision
+    - time_out: Seconds after which the write is taken as done
+    result:
+    True as soon as a read sees the write, False if time_out passed first.
+
+    Replaces fixed sleeps after a write. The first read happens right away,
+    then the delay between reads doubles up to 2 seconds.
+    '''
+    delay = 0.25
+    operation_time = 0
+    while True:
+        try:
+            (rc, resp) = request(manager_url + endpoint, headers=dict(Accept='application/json'),
+                                 url_username=mgr_username, url_password=mgr_password,
+                                 validate_certs=validate_certs)
+            if not deleted and (revision is None or resp.get('_revision', revision) >= revision) \
+                    and (check is None or check(resp)):
+                return True
+        except Exception as err:
+            if deleted and err.args and err.args[0] == 404:
+                return True
+        if operation_time >= time_out:
+            return False
+        time.sleep(delay)
+        operation_time = operation_time + delay
+        delay = min(delay * 2, 2)
+
 def clean_and_get_params(args=None, extra_args_to_remove=[]):
     '''
     params:
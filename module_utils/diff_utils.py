@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+#
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause OR GPL-3.0-only
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING,
+# BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+# OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+# Fields filled in by the manager. They are never part of the desired state.
+SERVER_MANAGED_FIELDS = frozenset([
+    '_revision', '_create_time', '_create_user', '_last_modified_time',
+    '_last_modified_user', '_system_owned', '_protection', '_links',
+    '_schema', '_self', 'marked_for_delete', 'overridden', 'realization_id',
+    'unique_id'])
+
+
+def _join(path, key):
+    if path:
+        return path + '.' + key
+    return key
+
+
+def _is_scalar(value):
+    return not isinstance(value, (dict, list))
+
+
+def _scalars_equal(current, desired):
+    if current == desired:
+        return True
+    # Playbook values nested in dicts and lists are not typed by Ansible, so
+    # '24' and 24 or 'true' and True describe the same value.
+    if (isinstance(current, (str, int, float, bool)) and
+            isinstance(desired, (str, int, float, bool))):
+        return str(current).lower() == str(desired).lower()
+    return False
+
+
+def _get_element_key(element, key_fields):
+    if not isinstance(element, dict):
+        return None
+    for key_field in key_fields:
+        if element.get(key_field) is not None:
+            return key_field, element[key_field]
+    return None
+
+
+def _diff(current, desired, path, ignore_paths, list_keys, ignore_fields,
+          changes):
+    if path in ignore_paths:
+        return
+    if current is None and desired in ({}, []):
+        # The manager leaves out the empty lists and objects
+        return
+    if isinstance(desired, dict):
+        if not isinstance(current, dict):
+            changes.append(dict(path=path, current=current, desired=desired))
+            return
+        for key, value in desired.items():
+            if key in ignore_fields or value is None:
+                continue
+            _diff(current.get(key), value, _join(path, key), ignore_paths,
+                  list_keys, ignore_fields, changes)
+    elif isinstance(desired, list):
+        if not isinstance(current, list):
+            changes.append(dict(path=path, current=current, desired=desired))
+            return
+        key_fields = list_keys.get(path)
+        if isinstance(key_fields, str):
+            key_fields = (key_fields,)
+        if key_fields:
+            _diff_keyed_list(current, desired, path, key_fields, ignore_paths,
+                             list_keys, ignore_fields, changes)
+        elif all(_is_scalar(element) for element in desired + current):
+            # Lists of scalars are compared irrespective of their order
+            if (len(current) != len(desired) or
+                    sorted(str(e).lower() for e in current) !=
+                    sorted(str(e).lower() for e in desired)):
+                changes.append(dict(path=path, current=current,
+                                    desired=desired))
+        elif len(current) != len(desired):
+            changes.append(dict(path=path, current=current, desired=desired))
+        else:
+            for index, element in enumerate(desired):
+                _diff(current[index], element, path, ignore_paths, list_keys,
+                      ignore_fields, changes)
+    elif not _scalars_equal(current, desired):
+        changes.append(dict(path=path, current=current, desired=desired))
+
+
+def _diff_keyed_list(current, desired, path, key_fields, ignore_paths,
+                     list_keys, ignore_fields, changes):
+    current_by_key = {}
+    for element in current:
+        for key_field in key_fields:
+            if isinstance(element, dict) and key_field in element:
+                current_by_key[(key_field, element[key_field])] = element
+    matched = set()
+    for element in desired:
+        element_key = _get_element_key(element, key_fields)
+        element_path = '%s[%s]' % (path, element_key[1] if element_key
+                                   else '?')
+        if element_key is None or element_key not in current_by_key:
+            changes.append(dict(path=element_path, current=None,
+                                desired=element))
+            continue
+        matched.add(id(current_by_key[element_key]))
+        element_changes = []
+        _diff(current_by_key[element_key], element, path, ignore_paths,
+              list_keys, ignore_fields, element_changes)
+        for change in element_changes:
+            change['path'] = change['path'].replace(path, element_path, 1)
+        changes.extend(element_changes)
+    for element in current:
+        if id(element) not in matched:
+            element_key = _get_element_key(element, key_fields)
+            changes.append(dict(path='%s[%s]' % (
+                path, element_key[1] if element_key else '?'),
+                current=element, desired=None))
+
+
+def get_diff(current, desired, ignore_paths=(), list_keys=None,
+             ignore_fields=SERVER_MANAGED_FIELDS):
+    '''
+    params:
+    - current: Object as returned by the manager
+    - desired: Object as it should be. Only the attributes set in it are
+      compared, as the manager returns a lot more than what is specified.
+    - ignore_paths: Dot separated paths that are never compared, like
+      write-only passwords. List indexes are not part of a path.
+    - list_keys: Dict of path of a list of dicts to the field (or tuple of
+      fields, first one present wins) identifying its elements. Such lists are
+      compared irrespective of their order.
+    - ignore_fields: Attribute names ignored at every depth
+    result:
+    List of differences as dict(path, current, desired). Empty if the objects
+    match.
+    '''
+    changes = []
+    _diff(current, desired, '', set(ignore_paths), list_keys or {},
+          ignore_fields, changes)
+    return changes
+
+
+def is_update_required(current, desired, **kwargs):
+    '''
+    Returns True if desired differs from current. Takes the same params as
+    get_diff.
+    '''
+    if not current:
+        return False
+    return len(get_diff(current, desired, **kwargs)) > 0
+
+
+def get_patch(current, desired, keep_fields=('resource_type',), **kwargs):
+    '''
+    params:
+    - keep_fields: Top level fields always sent, like the resource_type
+      required to deserialize polymorphic objects.
+    result:
+    The top level attributes of desired that differ from current. This is the
+    minimal body for a PATCH call.
+    '''
+    patch = {}
+    for change in get_diff(current, desired, **kwargs):
+        top_level_key = change['path'].split('.')[0].split('[')[0]
+        if top_level_key:
+            patch[top_level_key] = desired[top_level_key]
+    if patch:
+        for field in keep_fields:
+            if field in desired:
+                patch[field] = desired[field]
+    return patch
+
+
+# Identifying fields of the lists in a host switch spec, shared by transport
+# nodes and transport node profiles.
+HOST_SWITCH_SPEC_LIST_KEYS = {
+    'host_switch_spec.host_switches': ('host_switch_name', 'host_switch_id'),
+    'host_switch_spec.host_switches.host_switch_profile_ids': 'key',
+    'host_switch_spec.host_switches.transport_zone_endpoints':
+        'transport_zone_id',
+    'host_switch_spec.host_switches.pnics': 'device_name',
+    'host_switch_spec.host_switches.uplinks': 'uplink_name',
+    'transport_zone_endpoints': 'transport_zone_id',
+}
@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+#
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause OR GPL-3.0-only
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING,
+# BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+# OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+# Filtering and projection of the results returned by the facts modules.
+#
+# When the collection is indexed by the search API, the filters are sent to
+# /search/query and only the matching objects are transferred. Otherwise the
+# collection is read page by page and filtered as it is read. Either way, only
+# the kept results, reduced to the requested fields, are held in memory.
+
+from ansible.module_utils.common_utils import iter_paginated_results
+from ansible.module_utils.nsx_search import build_search_query, iter_search_results
+
+DEFAULT_PAGE_SIZE = 1000
+
+FILTER_PARAMS = ('display_name', 'resource_type', 'tag_scope', 'tag_value')
+
+
+def get_filter_argument_spec():
+    '''
+    Arguments shared by the facts modules listing a collection.
+    '''
+    return dict(display_name=dict(required=False, type='str'),
+                resource_type=dict(required=False, type='str'),
+                tag_scope=dict(required=False, type='str'),
+                tag_value=dict(required=False, type='str'),
+                fields=dict(required=False, type='list'),
+                max_results=dict(required=False, type='int'))
+
+
+def has_filters(params):
+    '''
+    True if any filter, projection or limit is set. Without any, the facts
+    modules keep returning the response of the collection as is.
+    '''
+    return any(params.get(name) is not None
+               for name in FILTER_PARAMS + ('fields', 'max_results'))
+
+
+def matches_filters(result, display_name=None, resource_type=None,
+                    tag_scope=None, tag_value=None):
+    '''
+    True if the object has exactly the display name and resource type and
+    one tag with both the scope and value filtered on.
+    '''
+    if display_name is not None and result.get('display_name') != display_name:
+        return False
+    if resource_type is not None and result.get('resource_type') != resource_type:
+        return False
+    if tag_scope is None and tag_value is None:
+        return True
+    for tag in result.get('tags') or []:
+        if ((tag_scope is None or tag.get('scope') == tag_scope) and
+                (tag_value is None or tag.get('tag') == tag_value)):
+            return True
+    return False
+
+
+def project_fields(result, fields):
+    '''
+    params:
+    - fields: Fields to be kept. Nested fields are given as dotted paths,
+      like node_deployment_info.ip_addresses
+    result:
+    The object with only these fields, keeping their nesting. Missing fields
+    are left out.
+    '''
+    if not fields:
+        return result
+    projection = {}
+    for field in fields:
+        path = field.split('.')
+        value = result
+        for key in path:
+            if not isinstance(value, dict) or key not in value:
+                break
+            value = value[key]
+        else:
+            target = projection
+            for key in path[:-1]:
+                target = target.setdefault(key, {})
+            target[path[-1]] = value
+    return projection
+
+
+def _chain_first(first_result, results):
+    if first_result is None:
+        return
+    yield first_result
+    for result in results:
+        yield result
+
+
+def get_filtered_results(manager_url, endpoint, mgr_username, mgr_password,
+                         validate_certs, params, search_resource_types=None,
+                         page_size=DEFAULT_PAGE_SIZE):
+    '''
+    params:
+    - endpoint: API endpoint of the collection
+    - params: Module params, with the arguments of get_filter_argument_spec
+    - search_resource_types: Resource types of the collection indexed by the
+      search API. If not set, or if the manager has no search API, the
+      collection itself is read.
+    result:
+    dict(results, result_count, truncated, source) where truncated is True if
+    max_results stopped the listing and source is search or collection.
+    '''
+    filters = dict((name, params.get(name)) for name in FILTER_PARAMS)
+    fields = params.get('fields')
+    max_results = params.get('max_results')
+    if max_results is not None and max_results < 1:
+        raise ValueError('max_results must be at least 1')
+
+    results = None
+    source = 'search'
+    if search_resource_types and any(filters.values()):
+        resource_types = ([filters['resource_type']] if filters['resource_type']
+                          else search_resource_types)
+        query = build_search_query(resource_types, filters['display_name'],
+                                   filters['tag_scope'], filters['tag_value'])
+        results = iter_search_results(manager_url, query, mgr_username,
+                                      mgr_password, validate_certs, fields,
+                                      min(page_size, (max_results or page_size) + 1))
+        try:
+            # Starts the search, so that managers without the search API
+            # fall back on reading the collection
+            first_result = next(results, None)
+        except Exception:
+            results = None
+        else:
+            results = _chain_first(first_result, results)
+    if results is None:
+        source = 'collection'
+        results = iter_paginated_results(manager_url, endpoint, mgr_username,
+                                         mgr_password, validate_certs, page_size)
+
+    kept_results = []
+    truncated = False
+    for result in results:
+        if not matches_filters(result, **filters):
+            continue
+        if max_results is not None and len(kept_results) == max_results:
+            truncated = True
+            break
+        kept_results.append(project_fields(result, fields))
+    results.close()
+    return dict(results=kept_results, result_count=len(kept_results),
+                truncated=truncated, source=source)
@@ -0,0 +1,216 @@
+#!/usr/bin/env python
+#
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause OR GPL-3.0-only
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING,
+# BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+# OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+# Reading of the inventory collections from the manager, either fully or
+# only the objects changed since a previous snapshot.
+
+from concurrent.futures import ThreadPoolExecutor
+
+from ansible.module_utils.vmware_nsxt import request
+from ansible.module_utils.common_utils import get_paginated_results
+from ansible.module_utils.inventory_snapshot import INVENTORY_COLLECTIONS, POLICY_API
+from ansible.module_utils.six.moves.urllib.parse import quote
+from ansible.module_utils._text import to_native
+
+DEFAULT_PAGE_SIZE = 1000
+# Few objects change between two runs, so the changes are read in small pages
+CHANGES_PAGE_SIZE = 100
+
+
+class UnsortedResults(Exception):
+    '''
+    Raised when a collection does not return its objects sorted by
+    _last_modified_time, so its changes cannot be read incrementally.
+    '''
+    pass
+
+
+def _get_base_url(collection, manager_url, policy_url):
+    return policy_url if collection.api == POLICY_API else manager_url
+
+
+def _fetch_concurrently(fetch, collections, max_concurrent_requests):
+    results, errors = {}, {}
+    if not collections:
+        return results, errors
+    with ThreadPoolExecutor(max_workers=min(len(collections),
+                                            max_concurrent_requests)) as executor:
+        futures = dict((collection.name, executor.submit(fetch, collection))
+                       for collection in collections)
+    for name, future in futures.items():
+        try:
+            results[name] = future.result()
+        except Exception as err:
+            errors[name] = to_native(err)
+    return results, errors
+
+
+def fetch_inventory(manager_url, policy_url, mgr_username, mgr_password,
+                    validate_certs, max_concurrent_requests,
+                    collections=INVENTORY_COLLECTIONS):
+    '''
+    result:
+    (results, errors) as dicts keyed by collection name. The collections are
+    read concurrently, so the whole call takes about as long as the largest
+    collection.
+    '''
+    def fetch_collection(collection):
+        return get_paginated_results(
+            _get_base_url(collection, manager_url, policy_url),
+            collection.endpoint, mgr_username, mgr_password, validate_certs,
+            DEFAULT_PAGE_SIZE)
+    return _fetch_concurrently(fetch_collection, collections,
+                               max_concurrent_requests)
+
+
+def _get_page(base_url, endpoint, mgr_username, mgr_password, validate_certs,
+              page_size, cursor=None):
+    url = '%s%s%spage_size=%s' % (base_url, endpoint,
+                                  '&' if '?' in endpoint else '?', page_size)
+    if cursor:
+        url = url + '&cursor=%s' % quote(cursor)
+    (rc, resp) = request(url, headers=dict(Accept='application/json'),
+                         url_username=mgr_username, url_password=mgr_password,
+                         validate_certs=validate_certs)
+    return resp
+
+
+def fetch_modified_since(base_url, endpoint, mgr_username, mgr_password,
+                         validate_certs, since):
+    '''
+    params:
+    - since: _last_modified_time (epoch ms) the objects are wanted from
+    result:
+    (modified, result_count) where modified are the objects modified at or
+    after since and result_count the size of the whole collection, None if
+    the manager does not return it.
+
+    The collection is read most recently modified first, and the reading
+    stops at the first object older than since. The stop is only trusted if
+    the manager reports the sort it applied. Raises UnsortedResults if the
+    collection ignores the sort or does not report it.
+    '''
+    sorted_endpoint = '%s%ssort_by=_last_modified_time&sort_ascending=false' % (
+        endpoint, '&' if '?' in endpoint else '?')
+    modified = []
+    result_count = None
+    previous_time = None
+    cursor = None
+    while True:
+        resp = _get_page(base_url, sorted_endpoint, mgr_username, mgr_password,
+                         validate_certs, CHANGES_PAGE_SIZE, cursor)
+        if resp.get('sort_by') != '_last_modified_time' or \
+                resp.get('sort_ascending') is not False:
+            raise UnsortedResults(endpoint)
+        if result_count is None:
+            result_count = resp.get('result_count')
+        for result in resp.get('results', []):
+            modified_time = result.get('_last_modified_time')
+            if modified_time is None or (previous_time is not None and
+                                         modified_time > previous_time):
+                raise UnsortedResults(endpoint)
+            if modified_time < since:
+                return modified, result_count
+            modified.append(result)
+            previous_time = modified_time
+        cursor = resp.get('cursor')
+        if not cursor:
+            return modified, result_count
+
+
+def fetch_ids(base_url, endpoint, mgr_username, mgr_password, validate_certs):
+    '''
+    result:
+    The set of the ids of the objects of the collection, read with only the
+    id field.
+    '''
+    ids_endpoint = '%s%sincluded_fields=id' % (endpoint,
+                                               '&' if '?' in endpoint else '?')
+    return set(result['id'] for result in get_paginated_results(
+        base_url, ids_endpoint, mgr_username, mgr_password, validate_certs,
+        DEFAULT_PAGE_SIZE))
+
+
+def fetch_collection_changes(base_url, endpoint, mgr_username, mgr_password,
+                             validate_certs, previous_results):
+    '''
+    params:
+    - previous_results: Results of the collection in the previous snapshot
+    result:
+    (results, incremental) where results is the current content of the
+    collection and incremental is False if it had to be read fully.
+
+    Only the objects modified since the most recent object of the previous
+    results are read. The deleted objects are looked for, with an id only
+    listing, only if the size of the collection does not add up.
+    '''
+    modified_times = [result.get('_last_modified_time')
+                      for result in previous_results]
+    if not modified_times or None in modified_times:
+        return get_paginated_results(base_url, endpoint, mgr_username,
+                                     mgr_password, validate_certs,
+                                     DEFAULT_PAGE_SIZE), False
+    previous = dict((result['id'], result) for result in previous_results)
+    try:
+        modified, result_count = fetch_modified_since(
+            base_url, endpoint, mgr_username, mgr_password, validate_certs,
+            max(modified_times))
+    except UnsortedResults:
+        return get_paginated_results(base_url, endpoint, mgr_username,
+                                     mgr_password, validate_certs,
+                                     DEFAULT_PAGE_SIZE), False
+
+    current = dict(previous)
+    for result in modified:
+        current[result['id']] = result
+    if result_count is None or result_count != len(current):
+        ids = fetch_ids(base_url, endpoint, mgr_username, mgr_password,
+                        validate_certs)
+        for deleted_id in set(current) - ids:
+            del current[deleted_id]
+    return list(current.values()), True
+
+
+def fetch_inventory_changes(manager_url, policy_url, mgr_username, mgr_password,
+                            validate_certs, max_concurrent_requests, snapshot,
+                            collections=INVENTORY_COLLECTIONS):
+    '''
+    params:
+    - snapshot: Previous snapshot, from read_snapshot. The collections it
+      does not have are read fully.
+    result:
+    (results, incremental, errors) as dicts keyed by collection name.
+    '''
+    def fetch_collection(collection):
+        base_url = _get_base_url(collection, manager_url, policy_url)
+        previous_collection = snapshot['collections'].get(collection.name)
+        if previous_collection is None:
+            return get_paginated_results(base_url, collection.endpoint,
+                                         mgr_username, mgr_password,
+                                         validate_certs, DEFAULT_PAGE_SIZE), False
+        return fetch_collection_changes(base_url, collection.endpoint,
+                                        mgr_username, mgr_password,
+                                        validate_certs,
+                                        previous_collection['results'])
+
+    fetched, errors = _fetch_concurrently(fetch_collection, collections,
+                                          max_concurrent_requests)
+    results = dict((name, value[0]) for name, value in fetched.items())
+    incremental = dict((name, value[1]) for name, value in fetched.items())
+    return results, incremental, errors
@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+#
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause OR GPL-3.0-only
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING,
+# BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+# OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+# Inventory snapshot file.
+#
+# A snapshot holds the results of every collection of INVENTORY_COLLECTIONS
+# as read from the manager at one point in time. It is written gzip
+# compressed, with a format version, so that the jobs loading it (diff,
+# planning, drift) do not have to call the manager again. This module has no
+# Ansible dependency, nsx-install.py reads the snapshots with it.
+
+import gzip
+import json
+import os
+import time
+from collections import namedtuple
+
+SNAPSHOT_VERSION = 1
+
+MANAGER_API = 'manager'
+POLICY_API = 'policy'
+
+InventoryCollection = namedtuple('InventoryCollection',
+                                 ['name', 'api', 'endpoint'])
+
+INVENTORY_COLLECTIONS = [
+    InventoryCollection('compute_managers', MANAGER_API,
+                        '/fabric/compute-managers'),
+    InventoryCollection('fabric_nodes', MANAGER_API, '/fabric/nodes'),
+    InventoryCollection('transport_nodes', MANAGER_API, '/transport-nodes'),
+    InventoryCollection('transport_node_states', MANAGER_API,
+                        '/transport-nodes/state'),
+    InventoryCollection('transport_zones', MANAGER_API, '/transport-zones'),
+    InventoryCollection('edge_clusters', MANAGER_API, '/edge-clusters'),
+    InventoryCollection('transport_node_profiles', MANAGER_API,
+                        '/transport-node-profiles'),
+    InventoryCollection('transport_node_collections', MANAGER_API,
+                        '/transport-node-collections'),
+    InventoryCollection('ip_pools', POLICY_API, '/infra/ip-pools'),
+    InventoryCollection('tier0s', POLICY_API, '/infra/tier-0s'),
+    InventoryCollection('tier1s', POLICY_API, '/infra/tier-1s'),
+    InventoryCollection('segments', POLICY_API, '/infra/segments'),
+]
+
+# Attribute identifying the objects of the collections not keyed by id
+ID_KEYS = {'transport_node_states': 'transport_node_id'}
+
+# Attributes changed by the manager on every write, not reported as drift
+_SYSTEM_ATTRIBUTES = ('_revision', '_last_modified_time', '_last_modified_user',
+                      '_system_owned', '_protection')
+
+
+def build_snapshot(manager, collection_results,
+                   collections=INVENTORY_COLLECTIONS):
+    '''
+    params:
+    - manager: Host name of the manager the collections were read from
+    - collection_results: dict of collection name to its results
+    result:
+    The snapshot, as written by write_snapshot
+    '''
+    return dict(version=SNAPSHOT_VERSION,
+                manager=manager,
+                created=time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                collections=dict(
+                    (collection.name,
+                     dict(api=collection.api, endpoint=collection.endpoint,
+                          results=collection_results[collection.name]))
+                    for collection in collections
+                    if collection.name in collection_results))
+
+
+def write_snapshot(snapshot_file, snapshot):
+    '''
+    Writes the snapshot gzip compressed. The file is replaced only once
+    completely written, a reader never sees a partial snapshot.
+    '''
+    tmp_file = '%s.%d.tmp' % (snapshot_file, os.getpid())
+    try:
+        with gzip.open(tmp_file, 'wt') as f:
+            json.dump(snapshot, f, separators=(',', ':'))
+        os.rename(tmp_file, snapshot_file)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+
+def read_snapshot(snapshot_file):
+    '''
+    result:
+    The snapshot written by write_snapshot. Raises ValueError if the file was
+    written with another format version.
+    '''
+    with gzip.open(snapshot_file, 'rt') as f:
+        snapshot = json.load(f)
+    if snapshot.get('version') != SNAPSHOT_VERSION:
+        raise ValueError('Unsupported inventory snapshot version %s in %s,'
+                         ' expected %s' % (snapshot.get('version'),
+                                           snapshot_file, SNAPSHOT_VERSION))
+    return snapshot
+
+
+def summarize_snapshot(snapshot):
+    '''
+    result:
+    dict of collection name to its number of objects
+    '''
+    return dict((name, len(collection['results']))
+                for name, collection in snapshot['collections'].items())
+
+
+def _describe(result, id_key):
+    description = dict(id=result.get(id_key))
+    for attribute in ('display_name', '_revision'):
+        if attribute in result:
+            description[attribute] = result[attribute]
+    return description
+
+
+def diff_results(previous_results, current_results, id_key='id'):
+    '''
+    params:
+    - previous_results: Results of a collection in the previous snapshot
+    - current_results: Current results of the collection
+    result:
+    dict(created, updated, deleted) listing the changed objects by id,
+    display_name and _revision. The updated objects also have the revision
+    they had and the attributes that changed. Objects without _revision are
+    compared attribute by attribute.
+    '''
+    previous = dict((result.get(id_key), result) for result in previous_results)
+    created, updated = [], []
+    for result in current_results:
+        previous_result = previous.pop(result.get(id_key), None)
+        if previous_result is None:
+            created.append(_describe(result, id_key))
+            continue
+        if ('_revision' in result and
+                result['_revision'] == previous_result.get('_revision')):
+            continue
+        attributes = sorted(
+            attribute for attribute in set(result) | set(previous_result)
+            if attribute not in _SYSTEM_ATTRIBUTES and
+            result.get(attribute) != previous_result.get(attribute))
+        if not attributes:
+            continue
+        description = _describe(result, id_key)
+        if '_revision' in previous_result:
+            description['previous_revision'] = previous_result['_revision']
+        description['attributes'] = attributes
+        updated.append(description)
+    deleted = [_describe(result, id_key) for result in previous.values()]
+    return dict(created=created, updated=updated, deleted=deleted)
+
+
+def diff_snapshots(previous_snapshot, current_snapshot):
+    '''
+    result:
+    (changes, summary) where changes has the diff_results of each collection
+    that changed and summary the number of created, updated and deleted
+    objects of every collection.
+    '''
+    changes, summary = {}, {}
+    for name, collection in current_snapshot['collections'].items():
+        previous_collection = previous_snapshot['collections'].get(name)
+        previous_results = previous_collection['results'] if previous_collection else []
+        collection_changes = diff_results(previous_results, collection['results'],
+                                          ID_KEYS.get(name, 'id'))
+        summary[name] = dict((change, len(objects))
+                             for change, objects in collection_changes.items())
+        if any(collection_changes.values()):
+            changes[name] = collection_changes
+    return changes, summary
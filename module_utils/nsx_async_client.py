@@ -0,0 +1,296 @@
+#!/usr/bin/env python
+#
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause OR GPL-3.0-only
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING,
+# BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+# OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+# asyncio client of the NSX Manager API.
+#
+# The requests are sent by a bounded pool of threads, each one reusing the
+# keep-alive HTTPS connections of a shared pool, and awaited from the event
+# loop. Only the standard library is used, so nsx-install.py can use the
+# client as well as the modules. The responses are handled like
+# vmware_nsxt.request does.
+
+import asyncio
+import base64
+import json
+import os
+import ssl
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPSConnection, HTTPException
+from urllib.parse import urlsplit, quote
+
+DEFAULT_MAX_CONCURRENCY = 16
+DEFAULT_TIMEOUT = 300
+
+
+class ConnectionPool(object):
+    '''
+    Keep-alive HTTPS connections to one host. A connection is used by one
+    request at a time and put back once its response is read.
+    '''
+    def __init__(self, host, port, ssl_context, max_idle):
+        self.host = host
+        self.port = port
+        self.ssl_context = ssl_context
+        self.max_idle = max_idle
+        self.idle = []
+        self.lock = threading.Lock()
+
+    def acquire(self, timeout):
+        with self.lock:
+            connection = self.idle.pop() if self.idle else None
+        if connection is None:
+            return HTTPSConnection(self.host, self.port, timeout=timeout,
+                                   context=self.ssl_context), False
+        connection.timeout = timeout
+        if connection.sock is not None:
+            connection.sock.settimeout(timeout)
+        return connection, True
+
+    def release(self, connection):
+        with self.lock:
+            if len(self.idle) < self.max_idle:
+                self.idle.append(connection)
+                return
+        connection.close()
+
+    def close(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for connection in idle:
+            connection.close()
+
+
+def get_response_data(resp_code, raw_data, ignore_errors=False):
+    '''
+    Same handling of the response as vmware_nsxt.request: a JSON body is
+    decoded, another body is returned as is. An HTTP error code raises
+    Exception(code, data) unless ignore_errors is set, an error_code in the
+    body always raises Exception(error_code, data).
+    '''
+    data = None
+    if raw_data:
+        try:
+            data = json.loads(raw_data)
+        except ValueError:
+            data = raw_data
+    if resp_code >= 400 and not ignore_errors:
+        raise Exception(resp_code, data)
+    if isinstance(data, dict) and 'error_code' in data:
+        raise Exception(data['error_code'], data)
+    return resp_code, data
+
+
+class AsyncNSXClient(object):
+    '''
+    params:
+    - base_url: API base URL, like https://<manager>/api/v1 or
+      https://<manager>/policy/api/v1
+    - max_concurrency: Maximum number of requests in flight, which is also
+      the number of connections kept open
+    - timeout: Default timeout of a request, in seconds
+    Without username and password, the client certificate of the
+    NSX_MANAGER_CERT_PATH environment variable is used, like
+    vmware_nsxt.request.
+    '''
+    def __init__(self, base_url, mgr_username=None, mgr_password=None,
+                 validate_certs=True, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                 timeout=DEFAULT_TIMEOUT):
+        if max_concurrency < 1:
+            raise ValueError('max_concurrency must be at least 1')
+        url = urlsplit(base_url)
+        self.base_path = url.path.rstrip('/')
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.headers = {'Accept': 'application/json',
+                        'Content-Type': 'application/json',
+                        'Connection': 'keep-alive'}
+        if validate_certs:
+            ssl_context = ssl.create_default_context()
+        else:
+            ssl_context = ssl.create_default_context()
+            ssl_context.check_hostname = False
+            ssl_context.verify_mode = ssl.CERT_NONE
+        if mgr_username is None or mgr_password is None:
+            client_cert = os.getenv('NSX_MANAGER_CERT_PATH')
+            if client_cert is None:
+                raise Exception('It seems that either you have not passed your username password correctly or '
+                                'your path for NSX_MANAGER_CERT_PATH is not set correctly.')
+            ssl_context.load_cert_chain(client_cert)
+        else:
+            credentials = '%s:%s' % (mgr_username, mgr_password)
+            self.headers['Authorization'] = 'Basic %s' % base64.b64encode(
+                credentials.encode('utf-8')).decode('ascii')
+        self.pool = ConnectionPool(url.hostname, url.port or 443, ssl_context,
+                                   max_concurrency)
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        # A semaphore is bound to the event loop it is used in, and run()
+        # creates a new loop each time. Event loop -> semaphore.
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._semaphores_lock = threading.Lock()
+
+    def _get_semaphore(self, loop):
+        with self._semaphores_lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = asyncio.Semaphore(self.max_concurrency)
+                self._semaphores[loop] = semaphore
+            return semaphore
+
+    def _send(self, method, path, body, timeout):
+        connection, reused = self.pool.acquire(timeout)
+        try:
+            connection.request(method, path, body=body, headers=self.headers)
+            response = connection.getresponse()
+            raw_data = response.read()
+        except (HTTPException, OSError):
+            connection.close()
+            if not reused:
+                raise
+            # The manager closed the idle connection, retry on a new one
+            connection = HTTPSConnection(self.pool.host, self.pool.port,
+                                         timeout=timeout,
+                                         context=self.pool.ssl_context)
+            try:
+                connection.request(method, path, body=body, headers=self.headers)
+                response = connection.getresponse()
+                raw_data = response.read()
+            except Exception:
+                connection.close()
+                raise
+        if response.will_close:
+            connection.close()
+        else:
+            self.pool.release(connection)
+        return response.status, raw_data.decode('utf-8') if raw_data else None
+
+    async def request(self, endpoint, data=None, method='GET', timeout=None,
+                      ignore_errors=False):
+        '''
+        params:
+        - endpoint: Path under the base URL, with its query string
+        - data: Body of the request, serialized to JSON
+        - timeout: Timeout of this request, the default of the client if not
+          set
+        result:
+        (resp_code, data), with the errors of vmware_nsxt.request.
+        '''
+        timeout = timeout or self.timeout
+        body = json.dumps(data) if data is not None else None
+        loop = asyncio.get_running_loop()
+        async with self._get_semaphore(loop):
+            try:
+                resp_code, raw_data = await asyncio.wait_for(
+                    loop.run_in_executor(self.executor, self._send, method,
+                                         self.base_path + endpoint, body,
+                                         timeout),
+                    timeout)
+            except asyncio.TimeoutError:
+                raise Exception('Request %s %s timed out after %s seconds'
+                                % (method, endpoint, timeout))
+        return get_response_data(resp_code, raw_data, ignore_errors)
+
+    async def get_paginated_results(self, endpoint, page_size=1000):
+        '''
+        result:
+        All the results of the collection, like
+        common_utils.get_paginated_results. The pages are read one after the
+        other, the cursor of a page being needed for the next one.
+        '''
+        separator = '&' if '?' in endpoint else '?'
+        results = []
+        cursor = None
+        while True:
+            page_endpoint = '%s%spage_size=%s' % (endpoint, separator, page_size)
+            if cursor:
+                page_endpoint += '&cursor=%s' % quote(cursor)
+            (rc, resp) = await self.request(page_endpoint)
+            results.extend(resp.get('results', []))
+            cursor = resp.get('cursor')
+            if not cursor:
+                return results
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.pool.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+async def gather_with_limit(coroutines, limit, return_exceptions=False):
+    '''
+    params:
+    - coroutines: Coroutines to be awaited
+    - limit: Maximum number of them awaited at the same time
+    result:
+    Their results, in the order of coroutines. With return_exceptions, the
+    exceptions raised are returned in place of the results instead of being
+    raised.
+    '''
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(coroutine):
+        async with semaphore:
+            return await coroutine
+    return await asyncio.gather(*[run(coroutine) for coroutine in coroutines],
+                                return_exceptions=return_exceptions)
+
+
+async def map_ids(client, endpoint_template, ids, ignore_errors=False,
+                  limit=None):
+    '''
+    params:
+    - endpoint_template: Endpoint with a %s for the id, like
+      /transport-nodes/%s/state
+    - ids: Ids the endpoint is read for
+    - limit: Maximum number of reads in flight, the concurrency of the
+      client if not set
+    result:
+    (results, errors) as dicts keyed by id. A failed read does not stop the
+    others.
+    '''
+    ids = list(dict.fromkeys(ids))
+    responses = await gather_with_limit(
+        [client.request(endpoint_template % quote(str(object_id)),
+                        ignore_errors=ignore_errors) for object_id in ids],
+        limit or client.max_concurrency, return_exceptions=True)
+    results, errors = {}, {}
+    for object_id, response in zip(ids, responses):
+        if isinstance(response, Exception):
+            errors[object_id] = response
+        else:
+            results[object_id] = response[1]
+    return results, errors
+
+
+def run(coroutine):
+    '''
+    Runs the coroutine in a new event loop and returns its result, for the
+    synchronous code of the modules and nsx-install.py.
+    '''
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+#
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause OR GPL-3.0-only
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING,
+# BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+# OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+# Lookups through the search API of the manager.
+#
+# The search index is updated asynchronously, so an object written moments
+# ago may be missing from it or still indexed with its old values. The
+# lookups therefore re-read what the search returns and fall back on
+# reading the collection when the search finds nothing.
+
+from ansible.module_utils.vmware_nsxt import request
+from ansible.module_utils.common_utils import iter_paginated_results
+from ansible.module_utils.six.moves.urllib.parse import quote
+
+SEARCH_PAGE_SIZE = 50
+
+
+def _quote_term(value):
+    return '"%s"' % value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def build_search_query(resource_types, display_name=None, tag_scope=None,
+                       tag_value=None):
+    '''
+    params:
+    - resource_types: Resource types the objects searched can have
+    result:
+    Query string for /search/query. The search matches terms, not whole
+    values, so the results still have to be checked against the values.
+    '''
+    terms = ['resource_type:(%s)' % ' OR '.join(resource_types)]
+    if display_name is not None:
+        terms.append('display_name:%s' % _quote_term(display_name))
+    if tag_scope is not None:
+        terms.append('tags.scope:%s' % _quote_term(tag_scope))
+    if tag_value is not None:
+        terms.append('tags.tag:%s' % _quote_term(tag_value))
+    return ' AND '.join(terms)
+
+
+def _get_included_fields(fields):
+    # The searched fields are always returned to check the results
+    included_fields = ['id', 'display_name', 'resource_type', 'tags']
+    for field in fields:
+        top_field = field.split('.')[0]
+        if top_field not in included_fields:
+            included_fields.append(top_field)
+    return ','.join(included_fields)
+
+
+def iter_search_results(manager_url, query, mgr_username, mgr_password,
+                        validate_certs, fields=None, page_size=SEARCH_PAGE_SIZE):
+    '''
+    params:
+    - query: Query string, like the one of build_search_query
+    - fields: Fields the results are needed with. The manager only returns
+      their top level field.
+    result:
+    Generator of the results of the search, page by page.
+    '''
+    endpoint = '/search/query?query=%s' % quote(query)
+    if fields:
+        endpoint += '&included_fields=%s' % quote(_get_included_fields(fields))
+    return iter_paginated_results(manager_url, endpoint, mgr_username,
+                                  mgr_password, validate_certs, page_size)
+
+
+def find_by_display_name(manager_url, endpoint, mgr_username, mgr_password,
+                         validate_certs, display_name, resource_types=None):
+    '''
+    params:
+    - endpoint: API endpoint of the collection the object belongs to
+    - display_name: The name to be matched
+    - resource_types: Resource types of the collection indexed by the search
+      API. If not set, the collection is read.
+    result:
+    The object with this display name, None if there is none.
+
+    The search only returns the ids of the matching objects, the one with the
+    name is then read from endpoint. If the search fails or finds nothing,
+    the collection is read page by page till the object is found.
+    '''
+    if resource_types:
+        query = build_search_query(resource_types, display_name)
+        collection_endpoint = endpoint.split('?')[0]
+        try:
+            for result in iter_search_results(manager_url, query, mgr_username,
+                                              mgr_password, validate_certs,
+                                              fields=['id']):
+                if result.get('display_name') != display_name:
+                    continue
+                (rc, resp) = request('%s%s/%s' % (manager_url, collection_endpoint,
+                                                  quote(result['id'])),
+                                     headers=dict(Accept='application/json'),
+                                     url_username=mgr_username,
+                                     url_password=mgr_password,
+                                     validate_certs=validate_certs)
+                if resp.get('display_name') == display_name:
+                    return resp
+        except Exception:
+            pass
+    for result in iter_paginated_results(manager_url, endpoint, mgr_username,
+                                         mgr_password, validate_certs):
+        if result.get('display_name') == display_name:
+            return result
+    return None
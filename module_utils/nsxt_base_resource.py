@@ -20,6 +20,8 @@
 
 from ansible.module_utils.policy_communicator import PolicyCommunicator
 from ansible.module_utils.policy_communicator import DuplicateRequestError
+from ansible.module_utils.diff_utils import get_patch, is_update_required
+from ansible.module_utils.policy_realization import RealizationTracker
 
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils._text import to_native
@@ -29,9 +31,11 @@ if sys.version_info[0] < 3:
     raise Exception("Must be using Python 3")
 
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import time
 import json
+import itertools
 
 import inspect
 # Add all the base resources that can be configured in the
@@ -40,6 +44,37 @@ BASE_RESOURCES = {"NSXTSegment", "NSXTTier0", "NSXTTier1",
                   "NSXTSecurityPolicy", "NSXTPolicyGroup",
                   "NSXTIpBlock", "NSXTIpPool"}
 
+# Max number of sub-resources of the same priority realized concurrently
+MAX_CONCURRENT_SUB_RESOURCES = 8
+
+def _get_update_priority(resource_class):
+    return resource_class().get_resource_update_priority()
+
+
+class _SubResourceFailure(BaseException):
+    # Like the SystemExit raised by fail_json, it must not be caught by the
+    # 'except Exception' blocks of the resources.
+    def __init__(self, fail_json_args):
+        super(_SubResourceFailure, self).__init__(fail_json_args.get('msg'))
+        self.fail_json_args = fail_json_args
+
+
+class _ConcurrentModule(object):
+    """
+        AnsibleModule given to the sub-resources realized on a worker thread.
+        fail_json raises instead of exiting so that the failure is reported
+        once, from the thread of the parent resource.
+    """
+
+    def __init__(self, module):
+        self._module = module
+
+    def __getattr__(self, name):
+        return getattr(self._module, name)
+
+    def fail_json(self, **kwargs):
+        raise _SubResourceFailure(kwargs)
+
 
 class NSXTBaseRealizableResource(ABC):
 
@@ -80,6 +115,12 @@ class NSXTBaseRealizableResource(ABC):
         self.resource_params = resource_params
 
         self.validate_certs = self.module.params['validate_certs']
+
+        if not hasattr(self, 'realization_tracker'):
+            # Shared by the base resource and all its subresources
+            self.realization_tracker = RealizationTracker(
+                self.policy_communicator, self.validate_certs)
+
         self._state = self.get_attribute('state', resource_params)
         if not (hasattr(self, 'id') and self.id):
             if self.get_resource_name() in BASE_RESOURCES:
@@ -190,40 +231,36 @@ class NSXTBaseRealizableResource(ABC):
     def set_parent_info(self, parent_info):
         self._parent_info = parent_info
 
+    def set_realization_tracker(self, realization_tracker):
+        self.realization_tracker = realization_tracker
+
     def achieve_subresource_state(
             self, resource_params, successful_resource_exec_logs):
         """
             Achieve the state of each sub-resource.
-        """
-        for sub_resource_class in self._get_sub_resources_class_of(
-                self.resource_class):
-            if sub_resource_class.allows_multiple_resource_spec():
-                children_resource_spec = (resource_params.get(
-                    sub_resource_class.get_spec_identifier()) or [])
-            else:
-                children_resource_spec = ([resource_params.get(
-                    sub_resource_class.get_spec_identifier())] or [])
 
-            # Update the parent pointer
-            my_parent = self._parent_info.get('_parent', '')
-            self._update_parent_info()
-
-            for resource_param_spec in children_resource_spec:
-                if resource_param_spec is not None:
-                    sub_resource = sub_resource_class()
-
-                    sub_resource.set_arg_spec(self._arg_spec)
-                    sub_resource.set_ansible_module(self.module)
-
-                    sub_resource.set_parent_info(self._parent_info)
-
-                    sub_resource.realize(
-                        successful_resource_exec_logs=(
-                            successful_resource_exec_logs),
-                        resource_params=resource_param_spec)
+            The sub-resources with the same update priority do not depend on
+            each other, so they are realized concurrently. The priority levels
+            are realized one after the other.
+        """
+        for _, sub_resource_classes in itertools.groupby(
+                self._get_sub_resources_class_of(self.resource_class),
+                key=_get_update_priority):
+            sub_resources = []
+            for sub_resource_class in sub_resource_classes:
+                if sub_resource_class.allows_multiple_resource_spec():
+                    children_resource_spec = (resource_params.get(
+                        sub_resource_class.get_spec_identifier()) or [])
+                else:
+                    children_resource_spec = ([resource_params.get(
+                        sub_resource_class.get_spec_identifier())] or [])
 
-            # Restore the parent pointer
-            self._parent_info['_parent'] = my_parent
+                for resource_param_spec in children_resource_spec:
+                    if resource_param_spec is not None:
+                        sub_resources.append(
+                            (sub_resource_class, resource_param_spec))
+            self._realize_sub_resources(sub_resources,
+                                        successful_resource_exec_logs)
 
     def update_resource_params(self, nsx_resource_params):
         # Can be used to updates the params of resource before making
@@ -237,39 +274,15 @@ class NSXTBaseRealizableResource(ABC):
             existing_params: dict
 
             Compares the existing_params with resource_params and returns
-            True if they are different. At a base level, it traverses the
-            params and matches one-to-one. If the value to be matched is a
-            - dict, it traverses that also.
-            - list, it merely compares the order.
+            True if they are different. Only the params specified in
+            resource_params are compared and the fields managed by the Manager
+            (_revision, _create_time, ...) are ignored. Lists of scalars are
+            compared irrespective of their order.
             Can be overriden in the subclass for specific custom checking.
 
             Returns true if the params differ
         """
-        if not existing_params:
-            return False
-        for k, v in resource_params.items():
-            if k not in existing_params:
-                return True
-            elif type(v).__name__ == 'dict':
-                if self.check_for_update(existing_params[k], v):
-                    return True
-            elif v != existing_params[k]:
-                def compare_lists(list1, list2):
-                    # Returns True if list1 and list2 differ
-                    try:
-                        # If the lists can be converted into sets, do so and
-                        # compare lists as sets.
-                        set1 = set(list1)
-                        set2 = set(list2)
-                        return set1 != set2
-                    except Exception:
-                        return True
-                if type(v).__name__ == 'list':
-                    if compare_lists(v, existing_params[k]):
-                        return True
-                    continue
-                return True
-        return False
+        return is_update_required(existing_params, resource_params)
 
     def update_parent_info(self, parent_info):
         # Override this and fill in self._parent_info if that is to be passed
@@ -402,10 +415,58 @@ class NSXTBaseRealizableResource(ABC):
             # does not exist on the Manager. So, return the display_name
             return resource_display_name
 
-    def _update_parent_info(self):
+    def _update_parent_info(self, parent_info):
         # This update is always performed and should not be overriden by the
         # subresource's class
-        self._parent_info["_parent"] = self
+        parent_info["_parent"] = self
+
+    def _realize_sub_resources(self, sub_resources,
+                               successful_resource_exec_logs):
+        """
+            sub_resources: list of (sub_resource_class, resource_param_spec)
+
+            Realizes the sub_resources on a thread pool. Each of them gets its
+            own copy of the parent info, as update_parent_info writes to it.
+            A failure is reported once the running sub_resources complete and
+            the ones not started yet are cancelled.
+        """
+        if not sub_resources:
+            return
+        concurrent = len(sub_resources) > 1
+        futures = []
+        with ThreadPoolExecutor(max_workers=min(
+                len(sub_resources), MAX_CONCURRENT_SUB_RESOURCES)) as executor:
+            for sub_resource_class, resource_param_spec in sub_resources:
+                sub_resource = sub_resource_class()
+
+                sub_resource.set_arg_spec(self._arg_spec)
+                if concurrent:
+                    sub_resource.set_ansible_module(
+                        _ConcurrentModule(self.module))
+                else:
+                    sub_resource.set_ansible_module(self.module)
+
+                parent_info = dict(self._parent_info)
+                self._update_parent_info(parent_info)
+                sub_resource.set_parent_info(parent_info)
+                sub_resource.set_realization_tracker(self.realization_tracker)
+
+                futures.append(executor.submit(
+                    sub_resource.realize,
+                    successful_resource_exec_logs=(
+                        successful_resource_exec_logs),
+                    resource_params=resource_param_spec))
+
+            failures = []
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except _SubResourceFailure as failure:
+                    failures.append(failure.fail_json_args)
+                    for pending_future in futures:
+                        pending_future.cancel()
+        if failures:
+            self.module.fail_json(**failures[0])
 
     def _make_ansible_arg_spec(self, supports_check_mode=True):
         """
@@ -565,8 +626,12 @@ class NSXTBaseRealizableResource(ABC):
                 _, resp = self._send_request_to_API(
                     suffix="/" + self.id, method='PATCH',
                     data=self.nsx_resource_params)
-                if self.do_wait_till_create() and not self._wait_till_create():
-                    raise Exception
+                if self.do_wait_till_create():
+                    # Realization is waited upon in bulk, before the
+                    # subresources are realized
+                    self.realization_tracker.track(
+                        self._get_resource_url(), self.get_resource_name(),
+                        self.id)
 
                 successful_resource_exec_logs.append({
                     "changed": True,
@@ -595,12 +660,14 @@ class NSXTBaseRealizableResource(ABC):
                     "resource_type": self.get_resource_name()
                 })
                 return
-            self.nsx_resource_params['_revision'] = \
-                self.existing_resource['_revision']
+            # Only send the params that changed
+            patch_params = get_patch(self.existing_resource,
+                                     self.nsx_resource_params)
+            patch_params['_revision'] = self.existing_resource['_revision']
             try:
                 _, resp = self._send_request_to_API(
                     suffix="/"+self.id, method="PATCH",
-                    data=self.nsx_resource_params)
+                    data=patch_params)
                 successful_resource_exec_logs.append({
                     "changed": True,
                     "id": self.id,
@@ -660,14 +727,7 @@ class NSXTBaseRealizableResource(ABC):
                              resource_base_url=None):
         try:
             if not resource_base_url:
-                if self.get_resource_name() not in BASE_RESOURCES:
-                    resource_base_url = (self.resource_class.
-                                         get_resource_base_url(
-                                             parent_info=self._parent_info))
-                else:
-                    resource_base_url = (self.resource_class.
-                                         get_resource_base_url(
-                                             baseline_args=self.baseline_args))
+                resource_base_url = self._get_resource_base_url()
             (rc, resp) = self.policy_communicator.request(
                 resource_base_url + suffix, validate_certs=self.validate_certs,
                 ignore_errors=ignore_error, method=method, data=data)
@@ -675,6 +735,17 @@ class NSXTBaseRealizableResource(ABC):
         except Exception as e:
             raise e
 
+    def _get_resource_base_url(self):
+        if self.get_resource_name() not in BASE_RESOURCES:
+            return self.resource_class.get_resource_base_url(
+                parent_info=self._parent_info)
+        return self.resource_class.get_resource_base_url(
+            baseline_args=self.baseline_args)
+
+    def _get_resource_url(self):
+        # This is also the intent path of the resource
+        return self._get_resource_base_url() + "/" + self.id
+
     def _achieve_state(self, resource_params,
                        successful_resource_exec_logs=[]):
         """
@@ -700,6 +771,8 @@ class NSXTBaseRealizableResource(ABC):
 
         if self._state == "present" and not (
                 self.create_or_update_subresource_first()):
+            self._wait_till_realized([self._get_resource_url()],
+                                     successful_resource_exec_logs)
             self.achieve_subresource_state(
                 resource_params,
                 successful_resource_exec_logs=successful_resource_exec_logs)
@@ -709,6 +782,7 @@ class NSXTBaseRealizableResource(ABC):
                 resource_params, successful_resource_exec_logs)
 
         if self.get_resource_name() in BASE_RESOURCES:
+            self._wait_till_realized(None, successful_resource_exec_logs)
             changed = False
             for successful_resource_exec_log in successful_resource_exec_logs:
                 if successful_resource_exec_log["changed"]:
@@ -749,39 +823,23 @@ class NSXTBaseRealizableResource(ABC):
             except Exception:
                 return
 
-    def _wait_till_create(self):
-        FAILED_STATES = ["failed"]
-        IN_PROGRESS_STATES = ["pending", "in_progress"]
-        SUCCESS_STATES = ["partial_success", "success"]
-        try:
-            count = 0
-            while True:
-                rc, resp = self._send_request_to_API("/" + self.id)
-                if 'state' in resp:
-                    if any(resp['state'] in progress_status for progress_status
-                            in IN_PROGRESS_STATES):
-                        time.sleep(10)
-                        count = count + 1
-                        if count == 90:
-                            # Wait for max 15 minutes for host to realize
-                            return False
-                    elif any(resp['state'] in progress_status for
-                             progress_status in SUCCESS_STATES):
-                        return True
-                    else:
-                        # Failed State
-                        return False
-                else:
-                    if rc != 200:
-                        time.sleep(1)
-                        count = count + 1
-                        if count == 90:
-                            # Wait for max 15 minutes for host to realize
-                            return False
-                    else:
-                        return True
-        except Exception as err:
-            return False
+    def _wait_till_realized(self, intent_paths,
+                            successful_resource_exec_logs):
+        """
+            Waits for the realization of the resources tracked by the
+            realization_tracker. Waits for all of them if intent_paths is None.
+            Fails the module if any of them could not be realized.
+        """
+        failed_resources = self.realization_tracker.wait_for(intent_paths)
+        if failed_resources:
+            srel = successful_resource_exec_logs
+            self.module.fail_json(
+                msg="Failed to realize %s" % ", ".join(
+                    "%s with id %s. Error[%s]" % (
+                        failed_resource['resource_type'],
+                        failed_resource['id'], failed_resource['error'])
+                    for failed_resource in failed_resources),
+                successfully_updated_resources=srel)
 
     def _fill_missing_resource_params(self, existing_params, resource_params):
         """
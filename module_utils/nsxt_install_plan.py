@@ -0,0 +1,436 @@
+#!/usr/bin/env python
+#
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause OR GPL-3.0-only
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING,
+# BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+# OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import copy
+from collections import namedtuple
+
+from ansible.module_utils.vmware_nsxt import request
+from ansible.module_utils.common_utils import get_paginated_results
+from ansible.module_utils.diff_utils import (get_diff,
+                                             HOST_SWITCH_SPEC_LIST_KEYS)
+
+PLAN_CREATE = 'create'
+PLAN_UPDATE = 'update'
+PLAN_DELETE = 'delete'
+PLAN_NO_OP = 'no-op'
+
+MANAGER_API = 'manager'
+POLICY_API = 'policy'
+
+EULA_ACCEPTANCE_ENDPOINT = '/eula/acceptance'
+
+HOST_SWITCH_PROFILES_ENDPOINT = ('/host-switch-profiles?'
+                                 'include_system_owned=true')
+
+# Manager collections the display names of the vars file are resolved against,
+# besides the ones of the install phases. Same endpoints as the modules.
+REFERENCE_ENDPOINTS = [
+    HOST_SWITCH_PROFILES_ENDPOINT,
+    '/pools/ip-pools',
+    '/cluster-profiles',
+    '/fabric/compute-collections',
+]
+
+POLICY_EDGE_CLUSTER_PATH = ('/infra/sites/default/enforcement-points/default/'
+                            'edge-clusters/%s')
+
+# Sub resources of a policy object, which the object itself does not return.
+# - attribute: key of the sub resources in the vars file
+# - path: path of the sub resources under the object
+# - key: field identifying the sub resources of a collection. None for a
+#   single sub resource, like the BGP config of a locale service.
+InstallChild = namedtuple('InstallChild', ['attribute', 'path', 'key',
+                                           'children'])
+
+# One entry per playbook run by nsx-install.py.
+# - vars_key: key of the objects in nsx_pacific_vars.yml
+# - name_attribute: attribute identifying the object in the vars file
+# - existing_name_attribute: attribute identifying the object on the manager
+# - build_desired: callable(desired, lookup_id) returning the body the module
+#   run by the playbook sends for the object, display names replaced by ids
+# - list_keys: list_keys of diff_utils.get_diff for the body
+# - children: InstallChild of the sub resources compared with the object
+InstallPhase = namedtuple('InstallPhase', [
+    'playbook', 'resource_type', 'vars_key', 'api', 'endpoint',
+    'name_attribute', 'existing_name_attribute', 'build_desired',
+    'list_keys', 'children'])
+
+
+def _pick(desired, attributes):
+    '''
+    Body made of the given attributes of the vars file object, as
+    {body attribute: vars attribute}
+    '''
+    return dict((attribute, copy.deepcopy(desired.get(vars_attribute)))
+                for attribute, vars_attribute in attributes.items()
+                if desired.get(vars_attribute) is not None)
+
+
+def _manager_node_body(desired, lookup_id):
+    # Deployed appliances are never reconfigured by the install playbooks
+    return {}
+
+
+def _license_body(desired, lookup_id):
+    return _pick(desired, {'license_key': 'license_key'})
+
+
+def _compute_manager_body(desired, lookup_id):
+    # The credential is write only, the manager never returns it
+    return _pick(desired, {'display_name': 'display_name',
+                           'server': 'mgmt_ip',
+                           'origin_type': 'origin_type',
+                           'set_as_oidc_provider': 'set_as_oidc_provider'})
+
+
+def _transport_zone_body(desired, lookup_id):
+    return _pick(desired, {'display_name': 'display_name',
+                           'transport_type': 'transport_type'})
+
+
+def _ip_pool_body(desired, lookup_id):
+    body = _pick(desired, {'display_name': 'display_name'})
+    subnets = []
+    for subnet in desired.get('pool_static_subnets') or []:
+        subnet = copy.deepcopy(subnet)
+        subnet.pop('state', None)
+        subnet['resource_type'] = 'IpAddressPoolStaticSubnet'
+        subnets.append(subnet)
+    body['pool_static_subnets'] = subnets
+    return body
+
+
+def _host_switch_spec_body(host_switch_spec, lookup_id):
+    # Same display name resolution as update_params_with_id of
+    # nsxt_transport_nodes and nsxt_transport_node_profiles
+    host_switch_spec = copy.deepcopy(host_switch_spec)
+    for host_switch in host_switch_spec.get('host_switches', []):
+        host_switch['host_switch_profile_ids'] = [
+            dict(key=profile['type'],
+                 value=lookup_id(HOST_SWITCH_PROFILES_ENDPOINT,
+                                 profile['name']))
+            for profile in host_switch.pop('host_switch_profiles', None) or []]
+        ip_assignment_spec = host_switch.get('ip_assignment_spec') or {}
+        if 'ip_pool_name' in ip_assignment_spec:
+            ip_assignment_spec['ip_pool_id'] = lookup_id(
+                '/pools/ip-pools', ip_assignment_spec.pop('ip_pool_name'))
+        for endpoint in host_switch.get('transport_zone_endpoints', []):
+            endpoint['transport_zone_id'] = lookup_id(
+                '/transport-zones', endpoint.pop('transport_zone_name', None))
+    return host_switch_spec
+
+
+def _transport_node_body(desired, lookup_id):
+    body = _pick(desired, {'display_name': 'display_name',
+                           'resource_type': 'resource_type',
+                           'node_deployment_info': 'node_deployment_info'})
+    if desired.get('host_switch_spec'):
+        body['host_switch_spec'] = _host_switch_spec_body(
+            desired['host_switch_spec'], lookup_id)
+    deployment_config = body.get('node_deployment_info', {}).get(
+        'deployment_config', {})
+    # Passwords are write only
+    for password in ('cli_password', 'root_password', 'audit_password'):
+        deployment_config.get('node_user_settings', {}).pop(password, None)
+    vm_deployment_config = deployment_config.get('vm_deployment_config', {})
+    for attribute in ('vc_username', 'vc_password',
+                      # vCenter object names, only resolved to their ids by
+                      # the module through vCenter
+                      'host', 'compute', 'storage', 'management_network',
+                      'data_networks'):
+        vm_deployment_config.pop(attribute, None)
+    if 'vc_name' in vm_deployment_config:
+        vm_deployment_config['vc_id'] = lookup_id(
+            '/fabric/compute-managers', vm_deployment_config.pop('vc_name'))
+    return body
+
+
+def _edge_cluster_body(desired, lookup_id):
+    body = _pick(desired, {'display_name': 'display_name'})
+    body['members'] = [
+        dict(transport_node_id=lookup_id('/transport-nodes',
+                                         member.get('transport_node_name')))
+        for member in desired.get('members', [])]
+    body['cluster_profile_bindings'] = [
+        dict(profile_id=lookup_id('/cluster-profiles',
+                                  binding.get('profile_name')))
+        for binding in desired.get('cluster_profile_bindings', [])]
+    return body
+
+
+def _tier0_body(desired, lookup_id):
+    body = _pick(desired, {'display_name': 'display_name',
+                           'ha_mode': 'ha_mode'})
+    locale_services = []
+    for locale_service in desired.get('locale_services') or []:
+        locale_service = copy.deepcopy(locale_service)
+        locale_service.pop('state', None)
+        edge_cluster_info = locale_service.pop('edge_cluster_info', None)
+        if edge_cluster_info:
+            locale_service['edge_cluster_path'] = (
+                POLICY_EDGE_CLUSTER_PATH % lookup_id(
+                    '/edge-clusters',
+                    edge_cluster_info.get('edge_cluster_display_name')))
+        if locale_service.get('BGP'):
+            locale_service['BGP'].pop('state', None)
+        locale_services.append(locale_service)
+    body['locale_services'] = locale_services
+    return body
+
+
+def _host_switch_profile_body(desired, lookup_id):
+    # Only the attributes passed by 10_create_host_switch_profile.yml
+    return _pick(desired, {'display_name': 'display_name',
+                           'resource_type': 'resource_type',
+                           'teaming': 'teaming',
+                           'transport_vlan': 'transport_vlan'})
+
+
+def _transport_node_profile_body(desired, lookup_id):
+    body = _pick(desired, {'display_name': 'display_name',
+                           'resource_type': 'resource_type',
+                           'description': 'description'})
+    if desired.get('host_switch_spec'):
+        body['host_switch_spec'] = _host_switch_spec_body(
+            desired['host_switch_spec'], lookup_id)
+    return body
+
+
+def _transport_node_collection_body(desired, lookup_id):
+    body = _pick(desired, {'display_name': 'display_name',
+                           'resource_type': 'resource_type',
+                           'description': 'description'})
+    # Same resolution as get_compute_collection_id of
+    # nsxt_transport_node_collections
+    compute_manager_id = lookup_id('/fabric/compute-managers',
+                                   desired.get('compute_manager_name'))
+    body['compute_collection_id'] = lookup_id(
+        '/fabric/compute-collections', desired.get('cluster_name'),
+        attribute='external_id', origin_id=compute_manager_id)
+    body['transport_node_profile_id'] = lookup_id(
+        '/transport-node-profiles', desired.get('transport_node_profile_name'))
+    return body
+
+
+INSTALL_PHASES = [
+    InstallPhase('01_deploy_first_node.yml', 'ManagerNode', 'nsx_node1',
+                 MANAGER_API, '/cluster/nodes', 'mgmt_ip',
+                 'appliance_mgmt_listen_addr', _manager_node_body, {}, ()),
+    InstallPhase('02_add_nsx_license_accept_eula.yml', 'License',
+                 'nsxt_licenses', MANAGER_API, '/licenses', 'license_key',
+                 'license_key', _license_body, {}, ()),
+    InstallPhase('03_configure_compute_manager.yml', 'ComputeManager',
+                 'compute_managers', MANAGER_API, '/fabric/compute-managers',
+                 'display_name', 'display_name', _compute_manager_body, {},
+                 ()),
+    InstallPhase('04_deploy_second_third_node.yml', 'ManagerNode',
+                 'additional_nodes', MANAGER_API, '/cluster/nodes', 'mgmt_ip',
+                 'appliance_mgmt_listen_addr', _manager_node_body, {}, ()),
+    InstallPhase('05_setup_transport_zones.yml', 'TransportZone',
+                 'transport_zones', MANAGER_API, '/transport-zones',
+                 'display_name', 'display_name', _transport_zone_body, {},
+                 ()),
+    InstallPhase('06_create_tunnel_ip_pools.yml', 'IpAddressPool',
+                 'ip_pools', POLICY_API, '/infra/ip-pools', 'display_name',
+                 'display_name', _ip_pool_body,
+                 {'pool_static_subnets': 'id'},
+                 (InstallChild('pool_static_subnets', 'ip-subnets', 'id',
+                               ()),)),
+    InstallPhase('07_create_edge_transport_nodes.yml', 'TransportNode',
+                 'edge_transport_nodes', MANAGER_API, '/transport-nodes',
+                 'display_name', 'display_name', _transport_node_body,
+                 HOST_SWITCH_SPEC_LIST_KEYS, ()),
+    InstallPhase('08_setup_edge_cluster.yml', 'EdgeCluster', 'edge_clusters',
+                 MANAGER_API, '/edge-clusters', 'display_name', 'display_name',
+                 _edge_cluster_body,
+                 {'members': 'transport_node_id',
+                  'cluster_profile_bindings': 'profile_id'}, ()),
+    InstallPhase('09_configure_t0_gateway.yml', 'Tier0', 'tier0_gateways',
+                 POLICY_API, '/infra/tier-0s', 'display_name', 'display_name',
+                 _tier0_body, {'locale_services': 'id'},
+                 (InstallChild('locale_services', 'locale-services', 'id',
+                               (InstallChild('BGP', 'bgp', None, ()),)),)),
+    InstallPhase('10_create_host_switch_profile.yml',
+                 'UplinkHostSwitchProfile', 'host_switch_profiles',
+                 MANAGER_API, '/host-switch-profiles', 'display_name',
+                 'display_name', _host_switch_profile_body, {}, ()),
+    InstallPhase('11_create_transport_node_profiles.yml',
+                 'TransportNodeProfile', 'transport_node_profiles',
+                 MANAGER_API, '/transport-node-profiles', 'display_name',
+                 'display_name', _transport_node_profile_body,
+                 HOST_SWITCH_SPEC_LIST_KEYS, ()),
+    InstallPhase('12_configure_nsx_on_cluster.yml',
+                 'TransportNodeCollection', 'transport_node_collections',
+                 MANAGER_API, '/transport-node-collections', 'display_name',
+                 'display_name', _transport_node_collection_body, {}, ()),
+]
+
+
+def _get_desired_objects(nsx_vars, phase):
+    desired_objects = nsx_vars.get(phase.vars_key) or []
+    if isinstance(desired_objects, dict):
+        desired_objects = [desired_objects]
+    return desired_objects
+
+
+def _fetch_children(base_url, object_path, children, mgr_username,
+                    mgr_password, validate_certs):
+    '''
+    Returns the sub resources of the object at object_path as
+    {attribute: sub resources}, their own sub resources included.
+    '''
+    fetched = {}
+    for child in children:
+        child_path = '%s/%s' % (object_path, child.path)
+        if child.key is None:
+            try:
+                (rc, resp) = request(base_url + child_path,
+                                     headers=dict(Accept='application/json'),
+                                     url_username=mgr_username,
+                                     url_password=mgr_password,
+                                     validate_certs=validate_certs)
+            except Exception:
+                # Not configured
+                continue
+            fetched[child.attribute] = resp
+            continue
+        results = get_paginated_results(base_url, child_path, mgr_username,
+                                        mgr_password, validate_certs)
+        for result in results:
+            result.update(_fetch_children(
+                base_url, '%s/%s' % (child_path, result[child.key]),
+                child.children, mgr_username, mgr_password, validate_certs))
+        fetched[child.attribute] = results
+    return fetched
+
+
+def fetch_install_state(manager_url, policy_url, mgr_username, mgr_password,
+                        validate_certs, phases=INSTALL_PHASES, nsx_vars=None):
+    '''
+    params:
+    - manager_url: Base URL of the manager API
+    - policy_url: Base URL of the policy API
+    - nsx_vars: Content of nsx_pacific_vars.yml. If set, the sub resources are
+      only retrieved for the objects it describes.
+    result:
+    The current state of the manager as {(api, endpoint): results}. Every
+    collection used by the install phases, or referenced by the vars file, is
+    retrieved once. The sub resources of the phases with children are set on
+    their parent object.
+    '''
+    install_state = {}
+    for endpoint in REFERENCE_ENDPOINTS:
+        install_state[(MANAGER_API, endpoint)] = get_paginated_results(
+            manager_url, endpoint, mgr_username, mgr_password, validate_certs)
+    for phase in phases:
+        key = (phase.api, phase.endpoint)
+        base_url = policy_url if phase.api == POLICY_API else manager_url
+        if key not in install_state:
+            install_state[key] = get_paginated_results(
+                base_url, phase.endpoint, mgr_username, mgr_password,
+                validate_certs)
+        if not phase.children:
+            continue
+        names = None
+        if nsx_vars is not None:
+            names = set(desired.get(phase.name_attribute)
+                        for desired in _get_desired_objects(nsx_vars, phase))
+        for existing in install_state[key]:
+            if names is None or \
+                    existing.get(phase.existing_name_attribute) in names:
+                existing.update(_fetch_children(
+                    base_url, '%s/%s' % (phase.endpoint, existing['id']),
+                    phase.children, mgr_username, mgr_password,
+                    validate_certs))
+    (rc, resp) = request(manager_url + EULA_ACCEPTANCE_ENDPOINT,
+                         headers=dict(Accept='application/json'),
+                         url_username=mgr_username, url_password=mgr_password,
+                         validate_certs=validate_certs)
+    install_state[(MANAGER_API, EULA_ACCEPTANCE_ENDPOINT)] = resp
+    return install_state
+
+
+def compute_install_plan(nsx_vars, install_state, phases=INSTALL_PHASES):
+    '''
+    params:
+    - nsx_vars: Content of nsx_pacific_vars.yml
+    - install_state: State returned by fetch_install_state. Pass an empty
+      dict when the manager is not deployed yet.
+    result:
+    List of plan entries, one per object of each phase, with the action
+    (create, update, delete or no-op) needed to reach nsx_vars.
+    '''
+    state = nsx_vars.get('state', 'present')
+
+    def lookup_id(endpoint, display_name, attribute='id', **filters):
+        for result in install_state.get((MANAGER_API, endpoint), []):
+            if result.get('display_name') == display_name and all(
+                    result.get(k) == v for k, v in filters.items()):
+                return result.get(attribute)
+        # Not created yet. The object referencing it has to be updated too.
+        return '<%s>' % display_name
+
+    plan = []
+    for phase in phases:
+        desired_objects = _get_desired_objects(nsx_vars, phase)
+        existing_objects = {}
+        for existing in install_state.get((phase.api, phase.endpoint), []):
+            existing_objects.setdefault(
+                existing.get(phase.existing_name_attribute), existing)
+
+        for desired in desired_objects:
+            name = desired.get(phase.name_attribute)
+            existing = existing_objects.get(name)
+            changes = {}
+            if state == 'absent':
+                action = PLAN_DELETE if existing else PLAN_NO_OP
+            elif existing is None:
+                action = PLAN_CREATE
+            else:
+                for change in get_diff(
+                        existing, phase.build_desired(desired, lookup_id),
+                        list_keys=phase.list_keys):
+                    changes[change['path']] = dict(current=change['current'],
+                                                   desired=change['desired'])
+                action = PLAN_UPDATE if changes else PLAN_NO_OP
+            if phase.resource_type == 'License':
+                # Never print the license key itself
+                name = '%s...' % str(name)[:5]
+            plan.append(dict(phase=phase.playbook,
+                             resource_type=phase.resource_type,
+                             display_name=name, action=action,
+                             changes=changes))
+
+        if phase.vars_key == 'nsxt_licenses':
+            acceptance = install_state.get(
+                (MANAGER_API, EULA_ACCEPTANCE_ENDPOINT)) or {}
+            eula_accepted = acceptance.get('acceptance', False)
+            plan.append(dict(phase=phase.playbook, resource_type='EULA',
+                             display_name='EULA',
+                             action=PLAN_NO_OP if eula_accepted
+                             else PLAN_CREATE,
+                             changes={}))
+    return plan
+
+
+def summarize_install_plan(plan):
+    summary = {PLAN_CREATE: 0, PLAN_UPDATE: 0, PLAN_DELETE: 0, PLAN_NO_OP: 0}
+    for entry in plan:
+        summary[entry['action']] = summary[entry['action']] + 1
+    return summary
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+#
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause OR GPL-3.0-only
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING,
+# BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+# OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+# Local cache of extracted OVAs.
+#
+# An OVA is a tar of an OVF descriptor and its disks. ovftool unpacks it on
+# every deployment, so the cache extracts it once to <cache_dir>/<sha256 of
+# the OVA>/ and the deployments use the extracted OVF. The digest of a file
+# is remembered in <cache_dir>/index.json with its size and mtime, so an
+# unchanged OVA is not hashed again.
+
+import hashlib
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import xml.etree.ElementTree as ElementTree
+
+OVF_NAMESPACE = 'http://schemas.dmtf.org/ovf/envelope/1'
+HASH_CHUNK_SIZE = 4 * 1024 * 1024
+_INDEX_FILE = 'index.json'
+
+
+def is_remote_source(path):
+    return '://' in path
+
+
+def get_file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source_file:
+        for chunk in iter(lambda: source_file.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _load_index(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, _INDEX_FILE)) as index_file:
+            return json.load(index_file)
+    except (IOError, OSError, ValueError):
+        return {}
+
+
+def _save_index(cache_dir, index):
+    # Written aside then renamed, so a concurrent reader never sees a
+    # partial index
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix='.index-')
+    with os.fdopen(fd, 'w') as index_file:
+        json.dump(index, index_file)
+    os.rename(tmp_path, os.path.join(cache_dir, _INDEX_FILE))
+
+
+def get_cached_digest(cache_dir, path):
+    '''
+    Returns the SHA-256 of the file, only hashing it if it is not in the
+    index of the cache or its size or mtime changed.
+    '''
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    index = _load_index(cache_dir)
+    entry = index.get(path)
+    if (entry and entry.get('size') == stat.st_size and
+            entry.get('mtime') == stat.st_mtime):
+        return entry['digest']
+    digest = get_file_digest(path)
+    index[path] = dict(size=stat.st_size, mtime=stat.st_mtime, digest=digest)
+    _save_index(cache_dir, index)
+    return digest
+
+
+def find_ovf_descriptor(directory):
+    for name in sorted(os.listdir(directory)):
+        if name.lower().endswith('.ovf'):
+            return os.path.join(directory, name)
+    return None
+
+
+def _get_ova_members(tar):
+    for member in tar:
+        # The files of an OVA are all at its top level
+        if (not member.isfile() or os.path.basename(member.name) != member.name
+                or member.name in ('', '.', '..')):
+            raise Exception('Unexpected entry %s in the OVA' % member.name)
+        yield member
+
+
+def extract_ova(ova_path, cache_dir):
+    '''
+    params:
+    - ova_path: Path of a local OVA file
+    - cache_dir: Directory of the cache, created if missing
+    result:
+    Path of the OVF descriptor extracted from the OVA. The OVA is only
+    extracted if the cache has no copy of it yet.
+    '''
+    if not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir)
+    extract_dir = os.path.join(cache_dir, get_cached_digest(cache_dir,
+                                                            ova_path))
+    if os.path.isdir(extract_dir):
+        ovf_path = find_ovf_descriptor(extract_dir)
+        if ovf_path:
+            return ovf_path
+        shutil.rmtree(extract_dir)
+    # Extracted aside then renamed, so an interrupted extraction never
+    # looks complete
+    tmp_dir = tempfile.mkdtemp(dir=cache_dir, prefix='.extract-')
+    try:
+        with tarfile.open(ova_path) as tar:
+            tar.extractall(tmp_dir, members=_get_ova_members(tar))
+        if not find_ovf_descriptor(tmp_dir):
+            raise Exception('No OVF descriptor found in %s' % ova_path)
+        try:
+            os.rename(tmp_dir, extract_dir)
+        except OSError:
+            # Extracted meanwhile by another deployment
+            if not os.path.isdir(extract_dir):
+                raise
+    finally:
+        if os.path.isdir(tmp_dir):
+            shutil.rmtree(tmp_dir)
+    return find_ovf_descriptor(extract_dir)
+
+
+def read_ovf_descriptor(source_path):
+    '''
+    Returns the content of the OVF descriptor of a local OVF or OVA file.
+    The descriptor is the first file of an OVA, so only the start of the
+    OVA is read.
+    '''
+    if not source_path.lower().endswith('.ova'):
+        with open(source_path, 'rb') as ovf_file:
+            return ovf_file.read()
+    with tarfile.open(source_path) as tar:
+        for member in tar:
+            if member.name.lower().endswith('.ovf'):
+                return tar.extractfile(member).read()
+    raise Exception('No OVF descriptor found in %s' % source_path)
+
+
+def get_deployment_options(ovf_descriptor):
+    '''
+    Returns the ids of the deployment options (configurations) declared in
+    the OVF descriptor, an empty list if it declares none.
+    '''
+    root = ElementTree.fromstring(ovf_descriptor)
+    return [configuration.get('{%s}id' % OVF_NAMESPACE)
+            for configuration in root.iter(
+                '{%s}Configuration' % OVF_NAMESPACE)]
+
+
+def get_referenced_size(ovf_descriptor):
+    '''
+    Returns the total size in bytes of the files referenced by the OVF
+    descriptor, which is what ovftool uploads. None if a size is missing.
+    '''
+    root = ElementTree.fromstring(ovf_descriptor)
+    total_size = 0
+    for file_element in root.iter('{%s}File' % OVF_NAMESPACE):
+        size = file_element.get('{%s}size' % OVF_NAMESPACE)
+        if size is None or not size.isdigit():
+            return None
+        total_size += int(size)
+    return total_size or None
@@ -0,0 +1,224 @@
+#!/usr/bin/env python
+#
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause OR GPL-3.0-only
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING,
+# BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+# OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+# Progress of an ovftool deployment, parsed from its output as it runs.
+#
+# With --machineOutput, ovftool writes blocks made of a keyword line, like
+# PROGRESS or RESULT, then '+ ' prefixed data lines and an empty line.
+# Other lines are read as the human readable output, where the phase
+# messages and 'Disk progress: NN%' lines are recognized.
+
+import json
+import re
+import threading
+import time
+
+PHASE_OPEN = 'open'
+PHASE_UPLOAD = 'upload'
+PHASE_FINALIZE = 'finalize'
+PHASE_POWER_ON = 'power_on'
+
+# Message prefix -> phase it starts
+_PHASE_MESSAGES = [
+    ('Deploying to VI', PHASE_UPLOAD),
+    ('Transfer Completed', PHASE_FINALIZE),
+    ('Powering on VM', PHASE_POWER_ON),
+]
+
+DEFAULT_EVENT_INTERVAL = 5
+
+_BLOCK_KEYWORD = re.compile(r'^[A-Z][A-Z_]+$')
+_TEXT_PROGRESS = re.compile(r'progress:\s*(\d+)%', re.IGNORECASE)
+
+# Deployments running in parallel share the progress file
+_progress_file_lock = threading.Lock()
+
+
+class DeployProgress(object):
+    '''
+    Tracks one ovftool run: phase timings, transfer percentage and rate,
+    errors and warnings. feed() takes the output lines as they come. If
+    progress_file is set, a JSON event is appended to it on every phase
+    change and at most every event_interval seconds while uploading.
+    '''
+
+    def __init__(self, vmname, progress_file=None, total_bytes=None,
+                 event_interval=DEFAULT_EVENT_INTERVAL):
+        self.vmname = vmname
+        self.progress_file = progress_file
+        self.total_bytes = total_bytes
+        self.event_interval = event_interval
+        self.percent = 0
+        self.rate = None
+        self.result = None
+        self.errors = []
+        self.warnings = []
+        self.phases = []
+        self.phase = None
+        self._start_time = time.time()
+        self._last_event_time = None
+        self._last_sample = (self._start_time, 0)
+        self._block = None
+        self._payload = []
+        self._set_phase(PHASE_OPEN)
+
+    def feed(self, line):
+        '''
+        Parses one line of the output. Returns True if the line is part of
+        a PROGRESS block, which is not worth keeping in the output.
+        '''
+        line = line.rstrip('\r\n')
+        if self._block is not None:
+            if line.startswith('+'):
+                self._payload.append(line[1:].strip())
+                return self._block == 'PROGRESS'
+            self._end_block()
+            if not line.strip():
+                return False
+        if _BLOCK_KEYWORD.match(line):
+            self._block = line
+            self._payload = []
+            return self._block == 'PROGRESS'
+        self._handle_text(line)
+        return False
+
+    def finish(self, rc):
+        '''
+        Ends the tracking once ovftool exited with rc. Returns the telemetry.
+        '''
+        if self._block is not None:
+            self._end_block()
+        if self.result is None:
+            self.result = 'SUCCESS' if rc == 0 else 'ERROR'
+        self._end_phase(time.time())
+        self.phase = None
+        self._emit(force=True)
+        return self.get_telemetry()
+
+    def get_telemetry(self):
+        telemetry = dict(vmname=self.vmname, result=self.result,
+                         elapsed=round(time.time() - self._start_time, 1),
+                         percent=self.percent, phases=self.phases,
+                         errors=self.errors, warnings=self.warnings)
+        upload = [phase for phase in self.phases
+                  if phase['name'] == PHASE_UPLOAD and phase['duration']]
+        if self.total_bytes and upload and self.percent >= 100:
+            telemetry['average_rate'] = int(self.total_bytes /
+                                            upload[0]['duration'])
+        return telemetry
+
+    def _end_block(self):
+        block, payload = self._block, self._payload
+        self._block, self._payload = None, []
+        if block == 'PROGRESS' and payload and payload[0].isdigit():
+            self._update_percent(int(payload[0]))
+            payload = payload[1:]
+        elif block == 'RESULT' and payload:
+            self.result = payload[0]
+            return
+        elif block == 'ERROR':
+            self.errors.append(' '.join(payload))
+            return
+        elif block == 'WARNING':
+            self.warnings.append(' '.join(payload))
+            return
+        for text in payload:
+            self._handle_text(text)
+
+    def _handle_text(self, text):
+        for message, phase in _PHASE_MESSAGES:
+            if text.startswith(message):
+                self._set_phase(phase)
+                return
+        match = _TEXT_PROGRESS.search(text)
+        if match:
+            self._update_percent(int(match.group(1)))
+        elif text.startswith('Error:'):
+            self.errors.append(text[len('Error:'):].strip())
+        elif text.startswith('Warning:'):
+            self.warnings.append(text[len('Warning:'):].strip())
+
+    def _update_percent(self, percent):
+        if self.phase == PHASE_OPEN:
+            self._set_phase(PHASE_UPLOAD)
+        now = time.time()
+        sample_time, sample_percent = self._last_sample
+        if self.total_bytes and percent > sample_percent and now > sample_time:
+            self.rate = int((percent - sample_percent) * self.total_bytes /
+                            100 / (now - sample_time))
+            self._last_sample = (now, percent)
+        self.percent = percent
+        if percent >= 100 and self.phase == PHASE_UPLOAD:
+            self._set_phase(PHASE_FINALIZE)
+        else:
+            self._emit()
+
+    def _end_phase(self, now):
+        if self.phases and self.phases[-1]['duration'] is None:
+            self.phases[-1]['duration'] = round(
+                now - self._start_time - self.phases[-1]['start'], 1)
+
+    def _set_phase(self, phase):
+        if phase == self.phase:
+            return
+        now = time.time()
+        self._end_phase(now)
+        self.phases.append(dict(name=phase, duration=None,
+                                start=round(now - self._start_time, 1)))
+        self.phase = phase
+        if phase == PHASE_UPLOAD:
+            self._last_sample = (now, self.percent)
+        self._emit(force=True)
+
+    def _emit(self, force=False):
+        if not self.progress_file:
+            return
+        now = time.time()
+        if (not force and self._last_event_time is not None and
+                now - self._last_event_time < self.event_interval):
+            return
+        self._last_event_time = now
+        event = dict(vmname=self.vmname, time=now, phase=self.phase,
+                     percent=self.percent, rate=self.rate)
+        if self.phase is None:
+            event['result'] = self.result
+            event['phases'] = self.phases
+        with _progress_file_lock:
+            with open(self.progress_file, 'a') as progress_file:
+                progress_file.write(json.dumps(event) + '\n')
+
+
+def read_progress_events(progress_file, offset=0):
+    '''
+    Returns (events appended to the progress file since offset, new
+    offset). A line still being written is left for the next read.
+    '''
+    events = []
+    try:
+        with open(progress_file) as events_file:
+            events_file.seek(offset)
+            for line in events_file:
+                if not line.endswith('\n'):
+                    break
+                offset += len(line)
+                events.append(json.loads(line))
+    except IOError:
+        pass
+    return events, offset
@@ -18,16 +18,52 @@
 # EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 
-import json
 import hashlib
+import hmac
+import json
+import os
+import threading
 
 from ansible.module_utils.urls import open_url
 from ansible.module_utils.six.moves.urllib.error import HTTPError
 
+# Instances are keyed on a keyed digest of the password, so the plaintext
+# password is not kept around as a dict key. The key is per process.
+_INSTANCE_KEY_SECRET = os.urandom(32)
+
+
+def _get_password_digest(mgr_password):
+    if mgr_password is None:
+        return None
+    return hmac.new(_INSTANCE_KEY_SECRET, mgr_password.encode('utf-8'),
+                    hashlib.sha256).digest()
+
+
+class _InFlightRequest(object):
+    """
+        A request sent to the API server. Identical GET requests made while
+        it is in flight wait for it and share its outcome, unless a write
+        completed in between.
+    """
+
+    def __init__(self):
+        # Only created once an identical request waits for this one
+        self.done = None
+        self.resp_code = None
+        self.resp_raw_data = None
+        self.error = None
+
 
 class PolicyCommunicator:
 
     __instances = dict()
+    # Resources may be realized on several threads
+    __instances_lock = threading.Lock()
+
+    @staticmethod
+    def _get_instance_key(mgr_username, mgr_hostname, mgr_password):
+        return (mgr_username, mgr_hostname,
+                _get_password_digest(mgr_password))
 
     @staticmethod
     def get_instance(mgr_username, mgr_hostname, mgr_password):
@@ -35,14 +71,17 @@ class PolicyCommunicator:
             Returns an instance of PolicyCommunicator associated with
             mgr_username, mgr_hostname, mgr_password
         """
-        key = tuple([mgr_username, mgr_hostname, mgr_password])
-        if key not in PolicyCommunicator.__instances:
-            PolicyCommunicator(mgr_username, mgr_hostname,
-                               mgr_password)
+        key = PolicyCommunicator._get_instance_key(
+            mgr_username, mgr_hostname, mgr_password)
+        with PolicyCommunicator.__instances_lock:
+            if key not in PolicyCommunicator.__instances:
+                PolicyCommunicator(mgr_username, mgr_hostname,
+                                   mgr_password)
         return PolicyCommunicator.__instances.get(key)
 
     def __init__(self, mgr_username, mgr_hostname, mgr_password):
-        key = tuple([mgr_username, mgr_hostname, mgr_password])
+        key = PolicyCommunicator._get_instance_key(
+            mgr_username, mgr_hostname, mgr_password)
         if key in PolicyCommunicator.__instances:
             raise Exception("The associated PolicyCommunicator is"
                             " already present! Please use getInstance to"
@@ -51,7 +90,13 @@ class PolicyCommunicator:
             self.mgr_username = mgr_username
             self.policy_url = 'https://{}/policy/api/v1'.format(mgr_hostname)
             self.mgr_password = mgr_password
-            self.active_requests = set()
+            # request key -> _InFlightRequest
+            self.active_requests = dict()
+            self.active_requests_lock = threading.Lock()
+            # Number of writes (non GET requests) completed. It is part of
+            # the key of the GET requests, so that a read issued after a
+            # write does not share the response of a read sent before it.
+            self.write_generation = 0
 
             PolicyCommunicator.__instances[key] = self
 
@@ -72,14 +117,14 @@ class PolicyCommunicator:
                 force_basic_auth=True, ignore_errors=False):
         # prepend the policy url
         url = self.policy_url + url
-        # create a request ID associated with this request
-        request_id = self._get_request_id(url, data, method)
-        if self.register_request(request_id):
+        if data is not None:
+            data = json.dumps(data)
+        request_key = self._get_request_key(url, data, method)
+        in_flight, is_new = self.register_request(request_key)
+        if is_new:
             # new request
             try:
                 # connect to the API server
-                if data is not None:
-                    data = json.dumps(data)
                 response = open_url(url=url, data=data, headers=headers,
                                     method=method,
                                     use_proxy=use_proxy, force=force,
@@ -90,63 +135,96 @@ class PolicyCommunicator:
                                     url_password=self.mgr_password,
                                     http_agent=http_agent,
                                     force_basic_auth=force_basic_auth)
-                resp_code = response.getcode()
-                resp_raw_data = response.read().decode('utf-8') or None
+                in_flight.resp_code = response.getcode()
+                in_flight.resp_raw_data = (
+                    response.read().decode('utf-8') or None)
             except HTTPError as err:
                 response = err.fp
-                resp_code = response.getcode()
-                resp_raw_data = err.fp.read().decode('utf-8')
-
-            # request completed by the server
-            self.active_requests.remove(request_id)
-
-            try:
-                # infer the response
-                if resp_raw_data:
-                    resp_data = json.loads(resp_raw_data)
-                elif data is not None:
-                    resp_data = json.loads(data)
-                else:
-                    resp_data = None
-            except Exception as e:
-                if ignore_errors:
-                    pass
-                else:
-                    raise Exception(resp_raw_data)
-
-            # return the approprate response code and data
-            if resp_code >= 400 and not ignore_errors:
-                raise Exception(resp_code, None)
-            if resp_data is not None and 'error_code' in resp_data:
-                raise Exception(resp_data['error_code'], resp_data)
-            else:
-                return resp_code, resp_data
+                in_flight.resp_code = response.getcode()
+                in_flight.resp_raw_data = err.fp.read().decode('utf-8')
+            except Exception as err:
+                in_flight.error = err
+                raise
+            finally:
+                # request completed by the server, or failed
+                self.unregister_request(request_key, in_flight)
+        elif method == 'GET':
+            # Identical GET in flight, its response is shared
+            in_flight.done.wait()
+            if in_flight.error is not None:
+                raise in_flight.error
         else:
             raise DuplicateRequestError
+        resp_code = in_flight.resp_code
+        resp_raw_data = in_flight.resp_raw_data
+
+        try:
+            # infer the response. Each caller parses its own copy, so the
+            # callers sharing a response can modify it.
+            if resp_raw_data:
+                resp_data = json.loads(resp_raw_data)
+            elif data is not None:
+                resp_data = json.loads(data)
+            else:
+                resp_data = None
+        except Exception as e:
+            if ignore_errors:
+                pass
+            else:
+                raise Exception(resp_raw_data)
 
-    def _get_request_id(self, url, data=None, method='GET'):
+        # return the approprate response code and data
+        if resp_code >= 400 and not ignore_errors:
+            raise Exception(resp_code, None)
+        if resp_data is not None and 'error_code' in resp_data:
+            raise Exception(resp_data['error_code'], resp_data)
+        else:
+            return resp_code, resp_data
+
+    def _get_request_key(self, url, data=None, method='GET'):
         """
-            Creates a hash from url, data, and method that can be used
-            as a request ID.
+            Returns the key identifying concurrent identical requests. data
+            is the serialized payload, which is sent as is, so it is used
+            without being hashed again. GET requests are keyed on the url and
+            the writes completed so far, the other requests without payload
+            on the method and url only.
         """
-        request = dict()
-        request["data"] = data
-        request['request_url'] = url
-        request['request_method'] = method
-
-        return hashlib.md5(json.dumps(request, sort_keys=True).
-                           encode('utf-8')).hexdigest()
+        if method == 'GET':
+            return method, url, self.write_generation
+        if data is None:
+            return method, url
+        return method, url, data
 
-    def register_request(self, request_id):
+    def register_request(self, request_key):
+        """
+            Registers the request as in flight. Returns (in flight request,
+            True) if no identical request is in flight, so the caller must
+            send it. Otherwise returns (identical in flight request, False).
+        """
+        with self.active_requests_lock:
+            in_flight = self.active_requests.get(request_key)
+            if in_flight is not None:
+                if in_flight.done is None:
+                    in_flight.done = threading.Event()
+                return in_flight, False
+            in_flight = _InFlightRequest()
+            self.active_requests[request_key] = in_flight
+            return in_flight, True
+
+    def unregister_request(self, request_key, in_flight):
         """
-            This creates a hash from URL and data and stores it in a cache.
-            If a same hash is created, the request is identified as a duplicate
-            and it returns False. Otherwise, returns True.
+            Removes the request from the in flight ones and wakes up the
+            identical requests waiting for its outcome.
         """
-        if request_id in self.active_requests:
-            return False
-        self.active_requests.add(request_id)
-        return True
+        with self.active_requests_lock:
+            if self.active_requests.get(request_key) is in_flight:
+                del self.active_requests[request_key]
+            if request_key[0] != 'GET':
+                # The GET requests in flight may predate this write
+                self.write_generation += 1
+            done = in_flight.done
+        if done is not None:
+            done.set()
 
 
 class DuplicateRequestError(Exception):
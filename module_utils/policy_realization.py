@@ -0,0 +1,258 @@
+#!/usr/bin/env python
+#
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause OR GPL-3.0-only
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING,
+# BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+# OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import threading
+import time
+
+from ansible.module_utils.six.moves.urllib.parse import quote
+
+REALIZATION_STATUS_URL = '/infra/realized-state/status?intent_path='
+SEARCH_URL = '/search/query?query='
+
+REALIZED = 'realized'
+IN_PROGRESS = 'in_progress'
+FAILED = 'failed'
+
+# Max number of intent paths looked up by one search query
+SEARCH_BATCH_SIZE = 20
+# An API failing this many times in a row is not used for the rest of the
+# run. A single failure may be transient, like a 503, or a path not indexed
+# yet.
+MAX_API_FAILURES = 3
+
+# consolidated_status of the realized-state status API
+_CONSOLIDATED_STATES = {
+    'SUCCESS': REALIZED,
+    'ERROR': FAILED,
+    'IN_PROGRESS': IN_PROGRESS,
+    'UNKNOWN': IN_PROGRESS,
+}
+
+# state attribute of the resources reporting their own realization
+_RESOURCE_STATES = {
+    'success': REALIZED,
+    'partial_success': REALIZED,
+    'failed': FAILED,
+    'pending': IN_PROGRESS,
+    'in_progress': IN_PROGRESS,
+}
+
+# state of the realized entities returned by the search API
+_REALIZED_ENTITY_STATES = {
+    'REALIZED': REALIZED,
+    'ERROR': FAILED,
+}
+
+
+def _quote_term(value):
+    return '"%s"' % value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+class RealizationTracker(object):
+    """
+        Collects the intent paths of the policy resources created in a run
+        and waits for their realization in bulk.
+
+        Every poll looks up the realized entities of all the pending paths
+        with one search query per SEARCH_BATCH_SIZE paths, so resources
+        created one after the other are realized in parallel on the manager
+        instead of being waited upon one at a time. The paths the search does
+        not return yet, as its index is updated asynchronously, are checked
+        one by one. A resource is released as soon as it is realized.
+    """
+
+    def __init__(self, policy_communicator, validate_certs,
+                 poll_interval=10, timeout=900):
+        self.policy_communicator = policy_communicator
+        self.validate_certs = validate_certs
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        # intent_path -> dict(resource_type, id, deadline)
+        self.pending = {}
+        # intent_path -> (dict(resource_type, id), error message)
+        self.failed = {}
+        # Number of failures in a row of the search and status APIs
+        self._api_failures = dict(search=0, status=0)
+        # Guards pending and failed. Sub-resources track and wait on several
+        # threads.
+        self._lock = threading.Lock()
+        # Held by the single thread polling, without blocking track()
+        self._poll_lock = threading.Lock()
+
+    def track(self, intent_path, resource_type, resource_id):
+        with self._lock:
+            self.failed.pop(intent_path, None)
+            self.pending[intent_path] = dict(
+                resource_type=resource_type, id=resource_id,
+                deadline=time.time() + self.timeout)
+
+    def wait_for(self, intent_paths=None):
+        """
+            intent_paths: list of paths to wait for. All the tracked paths
+                          are waited for if not specified.
+
+            Polls the realization state of every pending path until the
+            requested ones are realized, failed, or timed out. Returns the
+            failed ones as a list of dict(intent_path, resource_type, id,
+            error).
+        """
+        if intent_paths is None:
+            with self._lock:
+                intent_paths = list(self.pending) + list(self.failed)
+        while True:
+            if self._is_done(intent_paths):
+                break
+            # A single thread polls all the pending paths at a time, the
+            # others wait for the next round
+            if self._poll_lock.acquire(False):
+                try:
+                    self._poll()
+                finally:
+                    self._poll_lock.release()
+                if self._is_done(intent_paths):
+                    break
+            time.sleep(self.poll_interval)
+        with self._lock:
+            return [dict(intent_path=path, error=self.failed[path][1],
+                         **self.failed[path][0])
+                    for path in intent_paths if path in self.failed]
+
+    def _is_done(self, intent_paths):
+        with self._lock:
+            return not any(path in self.pending for path in intent_paths)
+
+    def _poll(self):
+        with self._lock:
+            pending = dict(self.pending)
+        states = self._get_realization_states(list(pending))
+        now = time.time()
+        with self._lock:
+            for intent_path, resource in pending.items():
+                if self.pending.get(intent_path) is not resource:
+                    # Tracked again while polling
+                    continue
+                state, error = states[intent_path]
+                if state == IN_PROGRESS and now > resource['deadline']:
+                    state = FAILED
+                    error = ('Not realized after %s seconds' %
+                             self.timeout)
+                if state == REALIZED:
+                    del self.pending[intent_path]
+                elif state == FAILED:
+                    del self.pending[intent_path]
+                    resource_info = dict(
+                        resource_type=resource['resource_type'],
+                        id=resource['id'])
+                    self.failed[intent_path] = (resource_info, error)
+
+    def _get_realization_states(self, intent_paths):
+        """
+            Returns the dict of intent path to (state, error) of the
+            intent_paths.
+        """
+        states = {}
+        if self._api_failures['search'] < MAX_API_FAILURES:
+            for index in range(0, len(intent_paths), SEARCH_BATCH_SIZE):
+                batch_states = self._search_realization_states(
+                    intent_paths[index:index + SEARCH_BATCH_SIZE])
+                if batch_states is None:
+                    self._api_failures['search'] += 1
+                    break
+                self._api_failures['search'] = 0
+                states.update(batch_states)
+        for intent_path in intent_paths:
+            if intent_path not in states:
+                states[intent_path] = self._get_realization_state(
+                    intent_path)
+        return states
+
+    def _search_realization_states(self, intent_paths):
+        """
+            Returns the dict of intent path to (state, error) of the
+            intent_paths having realized entities in the search index, None
+            if the search failed. A path is realized once all its realized
+            entities are and failed as soon as one of them is.
+        """
+        query = ('resource_type:GenericPolicyRealizedResource AND '
+                 'intent_paths:(%s)' % ' OR '.join(
+                     _quote_term(path) for path in intent_paths))
+        entity_states = {}
+        cursor = None
+        while True:
+            url = SEARCH_URL + quote(query)
+            if cursor:
+                url += '&cursor=' + quote(cursor)
+            try:
+                rc, resp = self.policy_communicator.request(
+                    url, validate_certs=self.validate_certs,
+                    ignore_errors=True)
+            except Exception:
+                rc, resp = None, None
+            if rc != 200 or not resp or 'results' not in resp:
+                return None
+            for entity in resp['results']:
+                # The search matches terms, so the paths are checked
+                for intent_path in entity.get('intent_paths') or []:
+                    if intent_path in intent_paths:
+                        entity_states.setdefault(intent_path, []).append(
+                            entity.get('state'))
+            cursor = resp.get('cursor')
+            if not cursor or not resp['results']:
+                break
+        states = {}
+        for intent_path, path_states in entity_states.items():
+            if 'ERROR' in path_states:
+                status = 'ERROR'
+            else:
+                status = next((state for state in path_states
+                               if state != 'REALIZED'), 'REALIZED')
+            states[intent_path] = (
+                _REALIZED_ENTITY_STATES.get(status, IN_PROGRESS),
+                'Realization state %s' % status)
+        return states
+
+    def _get_realization_state(self, intent_path):
+        if self._api_failures['status'] < MAX_API_FAILURES:
+            try:
+                rc, resp = self.policy_communicator.request(
+                    REALIZATION_STATUS_URL + quote(intent_path, safe=''),
+                    validate_certs=self.validate_certs, ignore_errors=True)
+            except Exception:
+                rc, resp = None, None
+            if rc == 200 and resp and 'consolidated_status' in resp:
+                self._api_failures['status'] = 0
+                status = resp['consolidated_status'].get(
+                    'consolidated_status', 'UNKNOWN')
+                return (_CONSOLIDATED_STATES.get(status, IN_PROGRESS),
+                        'Realization state %s' % status)
+            # Older managers do not have the status API. Fall back to the
+            # state reported by the resource itself.
+            self._api_failures['status'] += 1
+        try:
+            rc, resp = self.policy_communicator.request(
+                intent_path, validate_certs=self.validate_certs,
+                ignore_errors=True)
+        except Exception as err:
+            return IN_PROGRESS, str(err)
+        if resp and 'state' in resp:
+            return (_RESOURCE_STATES.get(resp['state'], FAILED),
+                    'Realization state %s' % resp['state'])
+        if rc != 200:
+            return IN_PROGRESS, 'Resource not found'
+        return REALIZED, None
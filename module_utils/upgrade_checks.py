@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+#
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause OR GPL-3.0-only
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING,
+# BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+# OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import codecs
+import csv
+import json
+import re
+import time
+
+from ansible.module_utils.urls import open_url
+from ansible.module_utils.six.moves.urllib.error import HTTPError
+from ansible.module_utils.vmware_nsxt import get_certificate_file_path, request
+
+SEVERITY_INFO = 'info'
+SEVERITY_WARNING = 'warning'
+SEVERITY_FAILURE = 'failure'
+SEVERITIES = [SEVERITY_INFO, SEVERITY_WARNING, SEVERITY_FAILURE]
+
+_FAILURE_STATUSES = ('FAILURE', 'FAILED', 'ERROR', 'CRITICAL')
+_WARNING_STATUSES = ('WARNING', 'WARN')
+
+# Record field -> CSV column names it can be read from, normalized to lower
+# case with '_' separators. The first column present wins. Only the names of
+# the upgrade API are accepted, a result must not be read from a column that
+# happens to have a generic name.
+_RECORD_COLUMNS = [
+    ('component', ('component_type', 'upgrade_unit_type')),
+    ('unit', ('upgrade_unit_display_name', 'upgrade_unit_id')),
+    ('check', ('pre_upgrade_check', 'post_upgrade_check', 'check_name')),
+    ('status', ('status', 'failure_type')),
+    ('message', ('message', 'description')),
+]
+# Without them the severity of a record cannot be told
+_REQUIRED_FIELDS = ('check', 'status')
+
+def _normalize_column(column):
+    return re.sub(r'[^a-z0-9]+', '_', column.strip().lower()).strip('_')
+
+
+def get_severity(status):
+    status = (status or '').strip().upper()
+    if status in _FAILURE_STATUSES:
+        return SEVERITY_FAILURE
+    if status in _WARNING_STATUSES:
+        return SEVERITY_WARNING
+    return SEVERITY_INFO
+
+
+def parse_check_results(lines):
+    '''
+    params:
+    - lines: Iterable of the lines of the CSV check results, header first
+    result:
+    Generator of records dict(component, unit, check, status, message,
+    severity). The lines are consumed one at a time. Raises ValueError if the
+    header has no check or no status column.
+    '''
+    csv_reader = csv.reader(lines)
+    columns = None
+    for row in csv_reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        if columns is None:
+            header = [_normalize_column(column) for column in row]
+            columns = {}
+            for field, names in _RECORD_COLUMNS:
+                for name in names:
+                    if name in header:
+                        columns[field] = header.index(name)
+                        break
+            missing_fields = [field for field in _REQUIRED_FIELDS
+                              if field not in columns]
+            if missing_fields:
+                raise ValueError(
+                    'No %s column in the check results. Columns: %s' % (
+                        ' or '.join(missing_fields), ', '.join(row)))
+            continue
+        record = {}
+        for field, _ in _RECORD_COLUMNS:
+            index = columns.get(field)
+            record[field] = (row[index].strip()
+                             if index is not None and index < len(row)
+                             else None)
+        record['severity'] = get_severity(record['status'])
+        yield record
+
+
+def stream_check_results(manager_url, endpoint, mgr_username, mgr_password,
+                         validate_certs):
+    '''
+    params:
+    - endpoint: Endpoint returning the check results as CSV, like
+      /upgrade/pre-upgrade-checks?format=csv
+    result:
+    Generator of the parsed records. The response is parsed while it is
+    downloaded, it is never held in memory as a whole.
+    '''
+    # Same authentication as vmware_nsxt.request
+    client_cert = None
+    force_basic_auth = True
+    if mgr_username is None or mgr_password is None:
+        force_basic_auth = False
+        client_cert = get_certificate_file_path('NSX_MANAGER_CERT_PATH')
+    try:
+        response = open_url(manager_url + endpoint,
+                            headers=dict(Accept='text/csv'),
+                            url_username=mgr_username,
+                            url_password=mgr_password,
+                            validate_certs=validate_certs,
+                            client_cert=client_cert,
+                            force_basic_auth=force_basic_auth)
+    except HTTPError as err:
+        raise Exception(err.code, err.read())
+    try:
+        for record in parse_check_results(
+                codecs.iterdecode(response, 'utf-8-sig')):
+            yield record
+    finally:
+        response.close()
+
+
+def filter_check_results(records, min_severity=SEVERITY_WARNING,
+                         results_file=None):
+    '''
+    params:
+    - records: Iterable of records from stream_check_results
+    - min_severity: Records less severe than this are only counted
+    - results_file: If set, the kept records are also written to this file,
+      one JSON object per line
+    result:
+    (records with at least min_severity, count of records per status)
+    '''
+    min_level = SEVERITIES.index(min_severity)
+    kept_records = []
+    summary = {}
+    ndjson_file = open(results_file, 'w') if results_file else None
+    try:
+        for record in records:
+            status = record['status'] or 'UNKNOWN'
+            summary[status] = summary.get(status, 0) + 1
+            if SEVERITIES.index(record['severity']) < min_level:
+                continue
+            kept_records.append(record)
+            if ndjson_file:
+                ndjson_file.write(json.dumps(record) + '\n')
+    finally:
+        if ndjson_file:
+            ndjson_file.close()
+    return kept_records, summary
+
+
+CHECKS_COMPLETED = 'COMPLETED'
+CHECKS_FAILED = 'FAILED'
+_CHECKS_FAILURE_STATES = ('FAILED', 'ABORTED')
+
+
+def get_pre_upgrade_check_statuses(resp):
+    '''
+    Extracts from /upgrade/status-summary the pre upgrade check execution
+    status of each component as {component_type: (component_type, status)}
+    '''
+    statuses = {}
+    for component_status in resp.get('component_status') or []:
+        component_type = component_status.get('component_type')
+        statuses[component_type] = (
+            component_type, component_status.get('pre_upgrade_status') or {})
+    return statuses
+
+
+def get_post_upgrade_check_statuses(resp):
+    '''
+    Extracts from /upgrade/upgrade-unit-groups/aggregate-info the post
+    upgrade check execution status of each group as
+    {group name: (component_type, status)}
+    '''
+    statuses = {}
+    for result in resp.get('results') or []:
+        group = result.get('group') or {}
+        statuses[group.get('display_name') or group.get('id')] = (
+            group.get('type'), result.get('post_upgrade_status') or {})
+    return statuses
+
+
+def wait_for_checks_to_execute(manager_url, endpoint, mgr_username,
+                               mgr_password, validate_certs, get_statuses,
+                               component_types=None, stop_on_failure=True,
+                               poll_interval=15, time_out=10800):
+    '''
+    params:
+    - endpoint: API endpoint reporting the check execution status, accepting
+      a component_type filter
+    - get_statuses: Function extracting from the response the status of each
+      item (component or group) as {name: (component_type, status)}, like
+      get_pre_upgrade_check_statuses
+    - component_types: Components whose checks are waited for. All of them
+      if not set.
+    - stop_on_failure: Return as soon as a check fails instead of waiting
+      for all the checks to complete
+    result:
+    dict(status, items, progress) where status is COMPLETED or FAILED, items
+    is the last status of each item and progress lists every status change
+    with the seconds since the start it was seen at.
+
+    Once only one component has checks running, only that component is
+    polled.
+    '''
+    if component_types:
+        component_types = [component_type.upper()
+                           for component_type in component_types]
+    items = {}
+    progress = []
+    running_component_types = component_types
+    operation_time = 0
+    while True:
+        polled_endpoint = endpoint
+        if running_component_types and len(running_component_types) == 1:
+            polled_endpoint += '%scomponent_type=%s' % (
+                '&' if '?' in endpoint else '?', running_component_types[0])
+        try:
+            (rc, resp) = request(manager_url + polled_endpoint,
+                                 headers=dict(Accept='application/json'),
+                                 url_username=mgr_username,
+                                 url_password=mgr_password,
+                                 validate_certs=validate_certs)
+        except Exception:
+            resp = None
+        if isinstance(resp, dict):
+            running = set()
+            failed = False
+            for name, (component_type, status) in get_statuses(resp).items():
+                if component_types and component_type not in component_types:
+                    continue
+                item = dict(component_type=component_type,
+                            status=status.get('status'),
+                            failure_count=status.get('failure_count', 0))
+                if items.get(name) != item:
+                    items[name] = item
+                    progress.append(dict(item, name=name, at=operation_time))
+                if (item['status'] in _CHECKS_FAILURE_STATES or
+                        item['failure_count']):
+                    failed = True
+                if item['status'] != CHECKS_COMPLETED:
+                    running.add(component_type)
+            if failed and (stop_on_failure or not running):
+                return dict(status=CHECKS_FAILED, items=items,
+                            progress=progress)
+            if items and not running:
+                return dict(status=CHECKS_COMPLETED, items=items,
+                            progress=progress)
+            if running:
+                running_component_types = sorted(running)
+        time.sleep(poll_interval)
+        operation_time = operation_time + poll_interval
+        if operation_time > time_out:
+            raise Exception('Operation timed out.')
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+#
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause OR GPL-3.0-only
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING,
+# BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+# OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+# Planning of the host upgrade groups.
+#
+# The plan is a list of waves. The hosts of a wave are upgraded in parallel
+# (one upgrade unit group with parallel set) and the waves one after the
+# other (plan settings with parallel unset). So the hosts down at a time are
+# the hosts of one wave, and a wave lasts as long as its slowest host.
+
+DEFAULT_HOST_UPGRADE_TIME = 1800
+
+
+def get_host_upgrade_time(host, host_upgrade_times,
+                          default_time=DEFAULT_HOST_UPGRADE_TIME):
+    return (host_upgrade_times or {}).get(host, default_time)
+
+
+def plan_upgrade_waves(host_clusters, max_hosts_down,
+                       max_hosts_down_per_cluster=1, host_upgrade_times=None,
+                       default_time=DEFAULT_HOST_UPGRADE_TIME):
+    '''
+    params:
+    - host_clusters: dict of host name to the name of its cluster
+    - max_hosts_down: Max hosts upgraded at the same time
+    - max_hosts_down_per_cluster: Max hosts of a cluster upgraded at the same
+      time, like the hosts a cluster can have in maintenance mode
+    - host_upgrade_times: dict of host name to its recorded upgrade time in
+      seconds. Hosts without one take default_time.
+    result:
+    List of waves, each a list of host names.
+
+    The hosts are placed from the slowest to the fastest in the first wave
+    with room for them. The slow hosts end up together in the first waves,
+    which keeps the sum of the wave durations low.
+    '''
+    if max_hosts_down < 1 or max_hosts_down_per_cluster < 1:
+        raise ValueError('The max number of hosts down must be at least 1')
+    hosts = sorted(host_clusters, key=lambda host: (
+        -get_host_upgrade_time(host, host_upgrade_times, default_time), host))
+    waves = []
+    # Hosts per cluster in each wave
+    wave_clusters = []
+    for host in hosts:
+        cluster = host_clusters[host]
+        for wave, clusters in zip(waves, wave_clusters):
+            if (len(wave) < max_hosts_down and
+                    clusters.get(cluster, 0) < max_hosts_down_per_cluster):
+                break
+        else:
+            wave, clusters = [], {}
+            waves.append(wave)
+            wave_clusters.append(clusters)
+        wave.append(host)
+        clusters[cluster] = clusters.get(cluster, 0) + 1
+    return waves
+
+
+def simulate_upgrade_duration(waves, host_upgrade_times=None,
+                              default_time=DEFAULT_HOST_UPGRADE_TIME):
+    '''
+    params:
+    - waves: Plan from plan_upgrade_waves
+    result:
+    dict(total, waves) with the expected duration in seconds of the whole
+    plan and of each wave.
+    '''
+    wave_durations = [max(get_host_upgrade_time(host, host_upgrade_times,
+                                                default_time)
+                          for host in wave) if wave else 0
+                      for wave in waves]
+    return dict(total=sum(wave_durations), waves=wave_durations)
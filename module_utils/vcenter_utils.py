@@ -54,6 +54,56 @@ def establish_vcenter_connection(module, vCenter_host, username, password):
             module.fail_json(msg="Caught vmodl fault while connecting to vCenter: " + error.msg)
     return service_instance.RetrieveContent()
 
+def get_obj_names(content, vimtype, container=None):
+    '''
+    params:
+    - vimtype: List of vim types, like [vim.VirtualMachine]
+    - container: Folder, datacenter or cluster whose descendants are
+      searched. The root folder if not set.
+    result:
+    dict of object name to object. Only the name property is retrieved, for
+    all the objects at once by the property collector, instead of one call
+    per object.
+    '''
+    view = content.viewManager.CreateContainerView(
+        container or content.rootFolder, vimtype, True)
+    try:
+        traversal_spec = vmodl.query.PropertyCollector.TraversalSpec(
+            name='traverseView', path='view', skip=False,
+            type=vim.view.ContainerView)
+        object_spec = vmodl.query.PropertyCollector.ObjectSpec(
+            obj=view, skip=True, selectSet=[traversal_spec])
+        property_specs = [vmodl.query.PropertyCollector.PropertySpec(
+            type=obj_type, pathSet=['name']) for obj_type in vimtype]
+        filter_spec = vmodl.query.PropertyCollector.FilterSpec(
+            objectSet=[object_spec], propSet=property_specs)
+        property_collector = content.propertyCollector
+        result = property_collector.RetrievePropertiesEx(
+            [filter_spec], vmodl.query.PropertyCollector.RetrieveOptions())
+        objs = {}
+        while result:
+            for obj_content in result.objects:
+                for prop in obj_content.propSet:
+                    objs.setdefault(prop.val, obj_content.obj)
+            if not result.token:
+                break
+            result = property_collector.ContinueRetrievePropertiesEx(
+                result.token)
+        return objs
+    finally:
+        view.Destroy()
+
+def find_obj_by_name(content, vimtype, name, container=None):
+    '''
+    params:
+    - vimtype: List of vim types, like [vim.VirtualMachine]
+    - name: Name of the object
+    - container: Where the object is searched, the root folder if not set
+    result:
+    The object with the given name, None if there is none.
+    '''
+    return get_obj_names(content, vimtype, container).get(name)
+
 def get_resource_id_from_name(module, vCenter_host, username, password, 
                               resource_type, resource_name):
     '''
@@ -66,25 +116,19 @@ def get_resource_id_from_name(module, vCenter_host, username, password,
     try:
         content = establish_vcenter_connection(module, vCenter_host, username, password)
         if resource_type == 'host':
-            objview = content.viewManager.CreateContainerView(content.rootFolder,
-                                  [vim.HostSystem], True)
+            vimtype = [vim.HostSystem]
         elif resource_type == 'cluster':
-            objview = content.viewManager.CreateContainerView(content.rootFolder, 
-                                  [vim.ClusterComputeResource], True)
+            vimtype = [vim.ClusterComputeResource]
         elif resource_type == 'storage':
-            objview = content.viewManager.CreateContainerView(content.rootFolder,
-                                  [vim.Datastore], True)
+            vimtype = [vim.Datastore]
         elif resource_type == 'network':
-            objview = content.viewManager.CreateContainerView(content.rootFolder,
-                                  [vim.Network], True)
+            vimtype = [vim.Network]
         else:
             module.fail_json(msg='Resource type provided by user either doesn\'t' 
                                  ' exist or is not supported')
-        all_resources = objview.view
-        objview.Destroy()
-        for resource in all_resources:
-            if resource.name == resource_name:
-                return resource._moId
+        resource = find_obj_by_name(content, vimtype, resource_name)
+        if resource is not None:
+            return resource._moId
         module.fail_json(msg='%s doesnt exist in %s' % (resource_name, 
                                                         resource_type))
     except vmodl.MethodFault as error:
@@ -101,13 +145,8 @@ def get_data_network_id_from_name(module, vCenter_host, username, password,
     '''
     try:
         content = establish_vcenter_connection(module, vCenter_host, username, password)
-        objview = content.viewManager.CreateContainerView(content.rootFolder,
-                                   [vim.Network], True)
-        all_networks = objview.view
-        objview.Destroy()
-        network_dict = {}
-        for network in all_networks:
-            network_dict[network.name] = network._moId
+        network_dict = dict((name, network._moId) for name, network in
+                            get_obj_names(content, [vim.Network]).items())
         data_network_id_list = []
         for data_network_name in data_network_name_list:
             if data_network_name in network_dict:
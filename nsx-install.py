@@ -30,7 +30,8 @@
 #
 # Usage:
 #   usage: nsx-install.py [-h] [--start] [--reset-defaults] [--reset-config]
-#                         [--manual]
+#                         [--manual] [--plan] [--snapshot] [--drift]
+#                         [--monitor] [--stall-timeout STALL_TIMEOUT]
 #   
 #   Install NSX
 #   
@@ -40,6 +41,16 @@
 #     --reset-defaults  Reset defaults to factory setting
 #     --reset-config    Reset the config file
 #     --manual          Manual install. Only generate the variables file
+#     --plan            Dry run. Show what the install would create, update or
+#                       delete on NSX Manager
+#     --snapshot        Save the inventory of NSX Manager in a snapshot file
+#     --drift           Show what changed on NSX Manager since the last
+#                       snapshot
+#     --monitor         Show the progress of the transport nodes till they are
+#                       all configured or stalled
+#     --stall-timeout STALL_TIMEOUT
+#                       Seconds without progress after which a transport node
+#                       is reported as stalled (default: 600)
 #
 # Logs:
 #   Default log file: nsx-install.log
@@ -49,13 +60,22 @@
 import os
 import sys
 import json
+import time
 import atexit
 import logging
 import argparse
+import subprocess
 
 from pyVmomi import vim, vmodl
 from pyVim.connect import Disconnect, SmartConnectNoSSL, SmartConnect
 
+from module_utils.vcenter_utils import find_obj_by_name
+from module_utils.cert_thumbprint import get_cert_thumbprints
+from module_utils.ovftool_progress import read_progress_events
+from module_utils.inventory_snapshot import read_snapshot, summarize_snapshot
+from transport_node_monitor import (monitor_transport_nodes, format_cluster_progress,
+                                    DEFAULT_STALL_TIMEOUT)
+
 #
 # Global Variables
 #
@@ -76,6 +96,21 @@ g_ans_root = "."
 # Variables for Ansible run. Auto-generated
 g_nsx_install_vars = g_ans_root + "/" + "nsx_pacific_vars.yml"
 
+# Install plan generated by the dry run. Auto-generated
+g_nsx_install_plan = g_ans_root + "/" + "nsx-install-plan.json"
+
+# Progress of the OVA deployments, written by nsxt_deploy_ova. Auto-generated
+g_nsx_ova_progress = g_ans_root + "/" + "nsx-ova-progress.json"
+
+# Seconds without progress after which a transport node is reported as stalled
+g_tn_stall_timeout = DEFAULT_STALL_TIMEOUT
+
+# Inventory snapshot of NSX Manager, written by nsxt_inventory_snapshot
+g_nsx_inventory_snapshot = g_ans_root + "/" + "nsx-inventory.json.gz"
+
+# Changes since the previous snapshot, written by nsxt_inventory_drift
+g_nsx_inventory_changes = g_ans_root + "/" + "nsx-inventory-changes.json"
+
 #
 # Helper functions
 #
@@ -94,31 +129,105 @@ def writeheader(fd, msg):
   fd.write ("#-------------------------------------------------------------------------------\n")
 
 
-def run_playbook(playbook, wait=0):
+def format_deploy_event(event):
+  if (event ["phase"] is None):
+    timings = ", ".join("%s %ss" % (phase ["name"], phase ["duration"])
+                        for phase in event ["phases"])
+    return "%s: %s (%s)" % (event ["vmname"], event ["result"], timings)
+  line = "%s: %s %s%%" % (event ["vmname"], event ["phase"], event ["percent"])
+  if (event ["rate"]):
+    line += " %.1f MB/s" % (event ["rate"] / 1048576.0)
+  return line
+
+
+#
+# Runs the command, printing the OVA deployment progress events that get
+# appended to progress_file while it runs
+#
+def run_with_deploy_progress(cmd, progress_file, interval=5):
+  if (os.path.exists(progress_file)):
+    os.remove(progress_file)
+  process = subprocess.Popen(cmd, shell=True)
+  offset = 0
+  while True:
+    ret = process.poll()
+    events, offset = read_progress_events(progress_file, offset)
+    for event in events:
+      line = format_deploy_event(event)
+      logging.debug ("OVA deployment: %s" % line)
+      print ("  %s" % line)
+    if (ret is not None):
+      return ret
+    time.sleep(interval)
+
+
+#
+# Prints the progress of the transport nodes per cluster, and each node once
+# it gets stalled
+#
+class TransportNodeProgress:
+  def __init__(self):
+    self.lines = []
+    self.stalled = set()
+
+  def report(self, summary):
+    if ("error" in summary):
+      logging.debug ("Transport node states not available: %s" % summary ["error"])
+      return
+    lines = [format_cluster_progress(cluster, counts)
+             for cluster, counts in sorted(summary ["clusters"].items())]
+    if (lines != self.lines):
+      for line in lines:
+        logging.debug ("Transport nodes: %s" % line)
+        print ("  %s" % line)
+      self.lines = lines
+    for node_id, node in sorted(summary ["nodes"].items()):
+      if (node ["stalled"] and node_id not in self.stalled):
+        line = ("Transport node %s of %s stalled: %s for %ss" %
+                (node_id, node ["cluster"], node ["state"], node ["unchanged_for"]))
+        logging.warning (line)
+        print ("  WARNING: %s" % line)
+    self.stalled = set(node_id for node_id, node in summary ["nodes"].items() if node ["stalled"])
+
+
+def get_manager_credentials():
+  config = txt_to_json(g_config)
+  defaults = txt_to_json(g_defaults)
+  return ("https://%s/api/v1" % config ["node1_mgmt_ip"], defaults ["nsx_username"],
+          config ["nsx_password"])
+
+
+#
+# Runs the command, printing the progress of the transport nodes while it runs
+#
+def run_with_transport_node_progress(cmd, interval=15):
+  manager_url, username, password = get_manager_credentials()
+  process = subprocess.Popen(cmd, shell=True)
+  monitor_transport_nodes(manager_url, username, password, False,
+                          TransportNodeProgress().report,
+                          is_running=lambda: process.poll() is None,
+                          stall_timeout=g_tn_stall_timeout, interval=interval)
+  return process.wait()
+
+
+def run_playbook(playbook, wait=0, progress_file=None, transport_node_progress=False):
   if (wait == 0):
     cmd = "ansible-playbook -vvvv %s >> %s 2>&1" % (playbook, g_logfile)
   else:
     cmd = "ansible-playbook -vvvv %s >> %s 2>&1 && sleep %s" % (playbook, g_logfile, wait)
   logging.debug ("Running command: %s" % cmd)
-  ret = os.system (cmd)
+  if (progress_file is not None):
+    ret = run_with_deploy_progress (cmd, progress_file)
+  elif (transport_node_progress):
+    ret = run_with_transport_node_progress (cmd)
+  else:
+    ret = os.system (cmd)
   if (ret != 0):
     logging.error ("Could not run %s" % cmd)
     print ("Deployment exited with Error. Please check %s" % g_logfile)
     sys.exit (1)
 
 
-def get_obj(content, vimtype, name):
-    obj = None
-    container = content.viewManager.CreateContainerView(
-        content.rootFolder, vimtype, True
-    )
-    for c in container.view:
-        if c.name == name:
-            obj = c
-            break
-    return obj
-
-
 def get_vds_uuid(vds_name, host, user, pwd):
 
   try:
@@ -131,7 +240,7 @@ def get_vds_uuid(vds_name, host, user, pwd):
     content = service_instance.RetrieveContent()
 
     # Get VDS object
-    vds = get_obj (content, [vim.DistributedVirtualSwitch], vds_name)
+    vds = find_obj_by_name (content, [vim.DistributedVirtualSwitch], vds_name)
     if vds is None:
       logging.error ("Distributed Switch: %s Not found in vCenter." % vds_name)
       print("ERROR: Distributed Switch: %s Not found in vCenter." % vds_name)
@@ -779,22 +888,40 @@ def generate_vars_file():
     json.dump(nsx_vars, json_file, indent=2)
 
 
+#
+# Adds the certificate thumbprint of every compute manager to the variables
+# file. The TLS handshakes with the compute managers are done concurrently
+# instead of one per task. A compute manager that cannot be reached is left
+# without thumbprint, the playbook then fetches it itself.
+#
+def add_compute_manager_thumbprints():
+  with open(g_nsx_install_vars) as vars_file:
+    nsx_vars = json.load(vars_file)
+
+  compute_managers = nsx_vars ["compute_managers"]
+  thumbprints, errors = get_cert_thumbprints ([cm ["mgmt_ip"] for cm in compute_managers])
+  for cm in compute_managers:
+    if cm ["mgmt_ip"] in thumbprints:
+      cm ["thumbprint"] = thumbprints [cm ["mgmt_ip"]]
+    else:
+      logging.warning ("Could not get the thumbprint of compute manager %s: %s" % (cm ["mgmt_ip"], errors [cm ["mgmt_ip"]]))
+
+  with open(g_nsx_install_vars, 'w') as json_file:
+    json.dump(nsx_vars, json_file, indent=2)
+
 def call_ansible_to_install():
   print ("Deploying NSX Manager Cluster")
   logging.debug ("Deploying First NSX node")
-  run_playbook ("01_deploy_first_node.yml", wait=300)
+  run_playbook ("01_deploy_first_node.yml", wait=300, progress_file=g_nsx_ova_progress)
 
   logging.debug ("Accepting EULA and adding NSX License")
   run_playbook ("02_add_nsx_license_accept_eula.yml")
 
   logging.debug ("Configuring Compute Manager")
+  add_compute_manager_thumbprints()
   run_playbook ("03_configure_compute_manager.yml")
 
-  config = dict()
-  config = txt_to_json(g_config)
-
-  if (config ['nsx_manager_cluster'].lower() == "yes" or
-      config ['nsx_manager_cluster'].lower() == "y"):
+  if (is_manager_cluster()):
     logging.debug ("Deploying second and third NSX node")
     run_playbook ("04_deploy_second_third_node.yml", wait=300)
   else:
@@ -827,12 +954,125 @@ def call_ansible_to_install():
   run_playbook("11_create_transport_node_profiles.yml")
 
   logging.debug ("Prepping hosts")
-  run_playbook("12_configure_nsx_on_cluster.yml")
+  run_playbook("12_configure_nsx_on_cluster.yml", transport_node_progress=True)
 
   logging.debug ("install_nsx: Done")
   print ("All deployments done!")
 
 
+def is_manager_cluster():
+  config = txt_to_json(g_config)
+  return (config ['nsx_manager_cluster'].lower() == "yes" or
+          config ['nsx_manager_cluster'].lower() == "y")
+
+
+#
+# Dry run of the install
+#   - Generate the variables file
+#   - Compare it with the current state of NSX Manager and print the action
+#     each playbook would take
+#
+def plan_nsx():
+  logging.debug ("plan_nsx: Started")
+
+  generate_vars_file()
+  run_playbook ("plan_install.yml")
+
+  with open(g_nsx_install_plan) as plan_file:
+    install_plan = json.load(plan_file)
+
+  print (install_plan ["message"])
+  cluster = is_manager_cluster()
+  for entry in install_plan ["plan"]:
+    if (entry ["phase"] == "04_deploy_second_third_node.yml" and not cluster):
+      continue
+    print ("  %-7s %-26s %s" % (entry ["action"], entry ["resource_type"], entry ["display_name"]))
+    for attribute, change in entry ["changes"].items():
+      print ("            %s: %s -> %s" % (attribute, change ["current"], change ["desired"]))
+
+  summary = install_plan ["summary"]
+  print ("Plan: %s to create, %s to update, %s to delete, %s unchanged" %
+         (summary ["create"], summary ["update"], summary ["delete"], summary ["no-op"]))
+  logging.debug ("plan_nsx: Done")
+
+
+#
+# Saves the inventory of NSX Manager
+#   - Generate the variables file
+#   - Read all the inventory collections of NSX Manager in one run and save
+#     them in the snapshot file
+#
+def snapshot_nsx():
+  logging.debug ("snapshot_nsx: Started")
+
+  generate_vars_file()
+  run_playbook ("inventory_snapshot.yml")
+
+  snapshot = read_snapshot(g_nsx_inventory_snapshot)
+  print ("Inventory of NSX Manager %s saved in %s at %s" %
+         (snapshot ["manager"], g_nsx_inventory_snapshot, snapshot ["created"]))
+  for name, count in sorted(summarize_snapshot(snapshot).items()):
+    print ("  %-28s %s" % (name, count))
+  logging.debug ("snapshot_nsx: Done")
+
+
+#
+# Reports the changes of the inventory of NSX Manager
+#   - Generate the variables file
+#   - Read the objects changed since the last snapshot and print them. The
+#     first run only saves the snapshot
+#
+def drift_nsx():
+  logging.debug ("drift_nsx: Started")
+
+  generate_vars_file()
+  first_run = not os.path.exists(g_nsx_inventory_snapshot)
+  run_playbook ("inventory_drift.yml")
+  if first_run:
+    print ("No previous snapshot. Inventory of NSX Manager saved in %s" % g_nsx_inventory_snapshot)
+    logging.debug ("drift_nsx: Done")
+    return
+
+  with open(g_nsx_inventory_changes) as changes_file:
+    drift = json.load(changes_file)
+
+  print ("Changes of NSX Manager between %s and %s" % (drift ["since"], drift ["created"]))
+  for name, changes in sorted(drift ["changes"].items()):
+    for change in ("created", "updated", "deleted"):
+      for obj in changes [change]:
+        print ("  %-8s %-28s %s" % (change, name, obj.get ("display_name", obj ["id"])))
+  totals = dict((change, sum(summary [change] for summary in drift ["summary"].values()))
+                for change in ("created", "updated", "deleted"))
+  print ("Drift: %s created, %s updated, %s deleted" %
+         (totals ["created"], totals ["updated"], totals ["deleted"]))
+  logging.debug ("drift_nsx: Done")
+
+
+#
+# Monitors the transport nodes
+#   - Print the progress of all the transport nodes per cluster till every
+#     node is in a final state or stalled, and the nodes that are stalled
+#
+def monitor_nsx():
+  logging.debug ("monitor_nsx: Started")
+
+  manager_url, username, password = get_manager_credentials()
+  summary = monitor_transport_nodes(manager_url, username, password, False,
+                                    TransportNodeProgress().report,
+                                    stall_timeout=g_tn_stall_timeout)
+  stalled = sorted(node_id for node_id, node in summary ["nodes"].items()
+                   if node ["stalled"])
+  failed = sorted(node_id for node_id, node in summary ["nodes"].items()
+                  if node ["state"] != "success" and not node ["stalled"])
+  if (stalled):
+    print ("Stopped monitoring, transport nodes stalled: %s" % ", ".join(stalled))
+  if (failed):
+    print ("Transport nodes not successful: %s" % ", ".join(failed))
+  elif (not stalled):
+    print ("All %s transport nodes successful" % len(summary ["nodes"]))
+  logging.debug ("monitor_nsx: Done")
+
+
 #
 # Installs NSX
 #   - Combine the defaults and the config file and generate the JSON required
@@ -875,8 +1115,25 @@ parser.add_argument('--reset-config', dest='reset_config',
 parser.add_argument('--manual', dest='manual',
                     help='Manual install. Only generate the variables file',
                     action='store_true')
+parser.add_argument('--plan', dest='plan',
+                    help='Dry run. Show what the install would change on NSX Manager',
+                    action='store_true')
+parser.add_argument('--snapshot', dest='snapshot',
+                    help='Save the inventory of NSX Manager in a snapshot file',
+                    action='store_true')
+parser.add_argument('--drift', dest='drift',
+                    help='Show what changed on NSX Manager since the last snapshot',
+                    action='store_true')
+parser.add_argument('--monitor', dest='monitor',
+                    help='Show the progress of the transport nodes till they are all configured or stalled',
+                    action='store_true')
+parser.add_argument('--stall-timeout', dest='stall_timeout', type=int,
+                    default=DEFAULT_STALL_TIMEOUT,
+                    help='Seconds without progress after which a transport node is reported as stalled')
 args = parser.parse_args()
 
+g_tn_stall_timeout = args.stall_timeout
+
 # Change the logfile if the default log file needs to be something different
 logging.basicConfig(format='%(asctime)s: %(levelname)s: %(message)s',
                     filename=g_logfile, level=logging.DEBUG)
@@ -889,3 +1146,11 @@ elif (args.reset_config):
   reset_config()
 elif (args.manual):
   generate_vars_file()
+elif (args.plan):
+  plan_nsx()
+elif (args.snapshot):
+  snapshot_nsx()
+elif (args.drift):
+  drift_nsx()
+elif (args.monitor):
+  monitor_nsx()
@@ -90,3 +90,35 @@ options:
               request to create the next resource is sent to the Manager.
             - Can be specified for each subresource.
     """
+
+    # Filter options of the facts modules
+    FACTS_FILTER = """
+options:
+    display_name:
+        description: Only the objects with this display name are returned.
+        required: false
+        type: str
+    resource_type:
+        description: Only the objects of this resource type are returned.
+        required: false
+        type: str
+    tag_scope:
+        description: Only the objects with a tag of this scope are returned.
+        required: false
+        type: str
+    tag_value:
+        description: Only the objects with a tag of this value are returned.
+                     With tag_scope, both have to be on the same tag.
+        required: false
+        type: str
+    fields:
+        description: Fields each object is reduced to. Nested fields are given
+                     as dotted paths, like node_deployment_info.ip_addresses.
+        required: false
+        type: list
+    max_results:
+        description: Maximum number of objects returned. truncated is set in the
+                     result if there were more.
+        required: false
+        type: int
+    """
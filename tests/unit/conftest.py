@@ -0,0 +1,12 @@
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause OR GPL-3.0-only
+
+import os
+
+import ansible.module_utils
+
+# The module_utils of this repository are imported as ansible.module_utils.X,
+# like Ansible does when it runs the modules.
+ansible.module_utils.__path__.append(os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__)))), 'module_utils'))
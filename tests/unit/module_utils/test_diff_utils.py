@@ -0,0 +1,208 @@
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause OR GPL-3.0-only
+
+from ansible.module_utils.diff_utils import (
+    get_diff, get_patch, is_update_required, HOST_SWITCH_SPEC_LIST_KEYS)
+
+
+def _host_switch(name, profile_id, tz_ids, pnics):
+    return dict(
+        host_switch_name=name,
+        host_switch_profile_ids=[dict(key='UplinkHostSwitchProfile',
+                                      value=profile_id)],
+        transport_zone_endpoints=[dict(transport_zone_id=tz_id)
+                                  for tz_id in tz_ids],
+        pnics=[dict(device_name=device, uplink_name=uplink)
+               for device, uplink in pnics])
+
+
+def _transport_node(*host_switches):
+    return dict(display_name='edge-1', host_switch_spec=dict(
+        resource_type='StandardHostSwitchSpec',
+        host_switches=list(host_switches)))
+
+
+def _host_switch_spec_diff(current, desired):
+    return get_diff(current, desired, list_keys=HOST_SWITCH_SPEC_LIST_KEYS)
+
+
+def test_host_switch_spec_lists_are_matched_by_key():
+    current = _transport_node(
+        _host_switch('nvds-1', 'p1', ['tz1', 'tz2'],
+                     [('fp-eth0', 'uplink-1'), ('fp-eth1', 'uplink-2')]),
+        _host_switch('nvds-2', 'p2', ['tz3'], [('fp-eth2', 'uplink-1')]))
+    desired = _transport_node(
+        _host_switch('nvds-2', 'p2', ['tz3'], [('fp-eth2', 'uplink-1')]),
+        _host_switch('nvds-1', 'p1', ['tz2', 'tz1'],
+                     [('fp-eth1', 'uplink-2'), ('fp-eth0', 'uplink-1')]))
+
+    assert _host_switch_spec_diff(current, desired) == []
+
+
+def test_host_switch_spec_change_is_reported_on_its_element():
+    current = _transport_node(
+        _host_switch('nvds-1', 'p1', ['tz1'], [('fp-eth0', 'uplink-1')]))
+    desired = _transport_node(
+        _host_switch('nvds-1', 'p1', ['tz1'], [('fp-eth0', 'uplink-2')]))
+
+    assert _host_switch_spec_diff(current, desired) == [dict(
+        path='host_switch_spec.host_switches[nvds-1].pnics[fp-eth0].'
+             'uplink_name',
+        current='uplink-1', desired='uplink-2')]
+
+
+def test_host_switch_spec_added_and_removed_elements():
+    current = _transport_node(
+        _host_switch('nvds-1', 'p1', ['tz1', 'tz2'], []))
+    desired = _transport_node(
+        _host_switch('nvds-1', 'p1', ['tz1', 'tz3'], []))
+
+    changes = _host_switch_spec_diff(current, desired)
+
+    assert sorted(change['path'] for change in changes) == [
+        'host_switch_spec.host_switches[nvds-1].transport_zone_endpoints'
+        '[tz2]',
+        'host_switch_spec.host_switches[nvds-1].transport_zone_endpoints'
+        '[tz3]']
+    assert dict((change['path'].split('[')[-1], change['desired'])
+                for change in changes) == {
+        'tz2]': None, 'tz3]': dict(transport_zone_id='tz3')}
+
+
+def test_host_switch_matched_by_id_when_it_has_no_name():
+    current = _transport_node(dict(host_switch_id='vds-uuid',
+                                   host_switch_name='vds-1',
+                                   host_switch_type='VDS'))
+    desired = _transport_node(dict(host_switch_id='vds-uuid',
+                                   host_switch_type='VDS'))
+
+    assert _host_switch_spec_diff(current, desired) == []
+
+
+def test_server_managed_fields_are_ignored():
+    current = dict(id='tz1', display_name='tz', _revision=3,
+                   _create_time=1, _links=[dict(href='/x')],
+                   nested=dict(_revision=1, value='a'))
+    desired = dict(id='tz1', display_name='tz', _revision=0,
+                   _create_time=2, _links=[],
+                   nested=dict(_revision=5, value='a'))
+
+    assert get_diff(current, desired) == []
+    assert not is_update_required(current, desired)
+
+
+def test_only_attributes_set_in_desired_are_compared():
+    current = dict(display_name='tz', transport_type='OVERLAY',
+                   host_switch_mode='STANDARD')
+    desired = dict(display_name='tz', description=None)
+
+    assert get_diff(current, desired) == []
+
+
+def test_ignore_paths():
+    current = dict(credential=dict(thumbprint='aa'), server='vc')
+    desired = dict(credential=dict(password='secret', thumbprint='aa'),
+                   server='vc')
+
+    assert get_diff(current, desired) == [dict(
+        path='credential.password', current=None, desired='secret')]
+    assert get_diff(current, desired,
+                    ignore_paths=('credential.password',)) == []
+
+
+def test_untyped_scalars_are_coerced():
+    current = dict(mtu=1600, transport_vlan=0, enabled=True,
+                   ratio=1.5, name='Edge')
+    desired = dict(mtu='1600', transport_vlan='0', enabled='true',
+                   ratio='1.5', name='edge')
+
+    assert get_diff(current, desired) == []
+
+
+def test_coerced_scalars_still_differ():
+    current = dict(mtu=1600, enabled=True)
+    desired = dict(mtu='1700', enabled='false')
+
+    assert sorted(change['path'] for change in
+                  get_diff(current, desired)) == ['enabled', 'mtu']
+
+
+def test_type_mismatch_is_a_change():
+    assert get_diff(dict(members='tn1'),
+                    dict(members=['tn1'])) == [dict(
+                        path='members', current='tn1', desired=['tn1'])]
+    assert get_diff(dict(teaming=['a']), dict(teaming=dict(policy='a'))) == [
+        dict(path='teaming', current=['a'], desired=dict(policy='a'))]
+
+
+def test_scalar_lists_are_compared_irrespective_of_order():
+    current = dict(route_redistribution_types=['TIER0_NAT', 'TIER0_STATIC'])
+
+    assert get_diff(current, dict(route_redistribution_types=[
+        'TIER0_STATIC', 'TIER0_NAT'])) == []
+    assert len(get_diff(current, dict(route_redistribution_types=[
+        'TIER0_STATIC']))) == 1
+
+
+def test_unkeyed_lists_of_dicts_are_compared_in_order():
+    current = dict(active_list=[dict(uplink_name='u1'),
+                                dict(uplink_name='u2')])
+    desired = dict(active_list=[dict(uplink_name='u2'),
+                                dict(uplink_name='u1')])
+
+    assert len(get_diff(current, desired)) == 2
+
+
+def test_empty_desired_matches_missing_attribute():
+    current = dict(teaming=dict(policy='FAILOVER_ORDER'))
+    desired = dict(teaming=dict(policy='FAILOVER_ORDER', standby_list=[]),
+                   tags=[], node_settings={})
+
+    assert get_diff(current, desired) == []
+    assert len(get_diff(dict(tags=[dict(scope='a', tag='b')]),
+                        dict(tags=[]))) == 1
+
+
+def test_no_update_required_without_current():
+    assert not is_update_required(None, dict(display_name='tz'))
+    assert not is_update_required({}, dict(display_name='tz'))
+    assert is_update_required(dict(display_name='tz'),
+                              dict(display_name='tz2'))
+
+
+def test_patch_replaces_changed_top_level_attributes():
+    current = dict(resource_type='Tier0', display_name='t0',
+                   ha_mode='ACTIVE_STANDBY',
+                   advanced_config=dict(forwarding_up_timer=5,
+                                        connectivity='ON'),
+                   tags=[dict(scope='env', tag='prod')])
+    desired = dict(resource_type='Tier0', display_name='t0',
+                   ha_mode='ACTIVE_STANDBY',
+                   advanced_config=dict(forwarding_up_timer=10,
+                                        connectivity='ON'),
+                   tags=[dict(scope='env', tag='prod')])
+
+    # The whole top level attribute is sent, not only the nested change,
+    # along with the resource_type.
+    assert get_patch(current, desired) == dict(
+        resource_type='Tier0',
+        advanced_config=dict(forwarding_up_timer=10, connectivity='ON'))
+
+
+def test_patch_of_keyed_list_element_sends_whole_list():
+    current = _transport_node(
+        _host_switch('nvds-1', 'p1', ['tz1'], [('fp-eth0', 'uplink-1')]))
+    desired = _transport_node(
+        _host_switch('nvds-1', 'p2', ['tz1'], [('fp-eth0', 'uplink-1')]))
+
+    patch = get_patch(current, desired, list_keys=HOST_SWITCH_SPEC_LIST_KEYS)
+
+    assert patch == dict(host_switch_spec=desired['host_switch_spec'])
+
+
+def test_patch_is_empty_without_changes():
+    current = dict(resource_type='Segment', display_name='s', _revision=2)
+    desired = dict(resource_type='Segment', display_name='s')
+
+    assert get_patch(current, desired) == {}
+    assert get_patch(current, desired, keep_fields=('display_name',)) == {}
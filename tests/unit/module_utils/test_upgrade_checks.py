@@ -0,0 +1,52 @@
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause OR GPL-3.0-only
+
+import pytest
+
+from ansible.module_utils.upgrade_checks import (
+    parse_check_results, filter_check_results, SEVERITY_FAILURE)
+
+HEADER = 'Component Type,Upgrade Unit Display Name,Pre-Upgrade Check,' \
+         'Status,Message'
+
+
+def test_records_are_read_by_column_name():
+    records = list(parse_check_results([
+        HEADER,
+        'HOST,esx-1,Disk space,FAILURE,Not enough space',
+        '',
+        'EDGE,edge-1,Connectivity,SUCCESS,',
+    ]))
+
+    assert records == [
+        dict(component='HOST', unit='esx-1', check='Disk space',
+             status='FAILURE', message='Not enough space',
+             severity=SEVERITY_FAILURE),
+        dict(component='EDGE', unit='edge-1', check='Connectivity',
+             status='SUCCESS', message='', severity='info'),
+    ]
+
+
+@pytest.mark.parametrize('header', [
+    'Type,Name,Message',
+    'Component Type,Pre-Upgrade Check,Result,Message',
+    'Component Type,Check,Status,Message',
+])
+def test_header_without_check_or_status_column_is_rejected(header):
+    with pytest.raises(ValueError):
+        list(parse_check_results([header, 'HOST,a,FAILURE,b']))
+
+
+def test_filter_keeps_failures_and_counts_every_status():
+    records = parse_check_results([
+        HEADER,
+        'HOST,esx-1,Disk space,FAILURE,Not enough space',
+        'HOST,esx-2,Disk space,WARNING,Low space',
+        'HOST,esx-3,Disk space,SUCCESS,',
+    ])
+
+    kept, summary = filter_check_results(records,
+                                         min_severity=SEVERITY_FAILURE)
+
+    assert [record['unit'] for record in kept] == ['esx-1']
+    assert summary == dict(FAILURE=1, WARNING=1, SUCCESS=1)
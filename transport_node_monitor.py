@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+#
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause OR GPL-3.0-only
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING,
+# BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+# OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+# Monitoring of the state of all the transport nodes together.
+#
+# Each poll reads /transport-nodes/state page by page. A node whose state
+# (overall, deployment and sub systems) has not changed for stall_timeout
+# seconds while not being in a final state is reported as stalled. The nodes
+# are summarized per vCenter cluster, edge nodes on their own.
+
+import asyncio
+import time
+
+from module_utils.nsx_async_client import AsyncNSXClient, run
+
+SUCCESS_STATES = ('success',)
+FAILURE_STATES = ('failed', 'partial_success', 'orphaned', 'error')
+DEFAULT_STALL_TIMEOUT = 600
+
+EDGE_NODES = 'Edge nodes'
+UNKNOWN_CLUSTER = 'Other nodes'
+
+
+def get_progress_signature(state):
+    '''
+    Everything of a transport node state that moves while the node is being
+    configured. Two polls with the same signature mean no progress.
+    '''
+    deployment_state = (state.get('node_deployment_state') or {}).get('state')
+    sub_systems = tuple(sorted((detail.get('sub_system_type') or '',
+                                detail.get('state') or '')
+                               for detail in state.get('details') or []))
+    return state.get('state'), deployment_state, sub_systems
+
+
+class TransportNodeMonitor(object):
+    '''
+    params:
+    - stall_timeout: Seconds without progress after which a node not in a
+      final state is reported as stalled
+    '''
+    def __init__(self, stall_timeout=DEFAULT_STALL_TIMEOUT, clock=time.time):
+        self.stall_timeout = stall_timeout
+        self.clock = clock
+        # node id -> (signature, time it was first seen)
+        self.progress = {}
+
+    def update(self, states, node_clusters):
+        '''
+        params:
+        - states: Results of /transport-nodes/state
+        - node_clusters: dict of transport node id to its cluster name
+        result:
+        dict(nodes, clusters, done, settled) where nodes has per node id its
+        state, cluster, seconds without progress and whether it is stalled,
+        clusters has per cluster the number of nodes per state plus the
+        stalled ones, done is True once every node is in a final state and
+        settled once every node is in a final state or stalled.
+        '''
+        now = self.clock()
+        nodes, clusters = {}, {}
+        progress = {}
+        for state in states:
+            node_id = state.get('transport_node_id')
+            signature = get_progress_signature(state)
+            previous = self.progress.get(node_id)
+            since = previous[1] if previous and previous[0] == signature else now
+            progress[node_id] = (signature, since)
+            node_state = state.get('state') or 'unknown'
+            final = node_state in SUCCESS_STATES + FAILURE_STATES
+            stalled = not final and now - since >= self.stall_timeout
+            cluster = node_clusters.get(node_id, UNKNOWN_CLUSTER)
+            nodes[node_id] = dict(state=node_state, cluster=cluster,
+                                  unchanged_for=int(now - since), stalled=stalled)
+            counts = clusters.setdefault(cluster, dict(total=0, stalled=0))
+            counts['total'] += 1
+            counts[node_state] = counts.get(node_state, 0) + 1
+            if stalled:
+                counts['stalled'] += 1
+        self.progress = progress
+        done = all(node['state'] in SUCCESS_STATES + FAILURE_STATES
+                   for node in nodes.values())
+        settled = all(node['state'] in SUCCESS_STATES + FAILURE_STATES or
+                      node['stalled'] for node in nodes.values())
+        return dict(nodes=nodes, clusters=clusters, done=done, settled=settled)
+
+
+async def fetch_node_clusters(client):
+    '''
+    result:
+    dict of transport node id to the name of its vCenter cluster, or
+    EDGE_NODES for the edges. The transport nodes, discovered nodes and
+    compute collections are read concurrently.
+    '''
+    transport_nodes, discovered_nodes, compute_collections = await asyncio.gather(
+        client.get_paginated_results('/transport-nodes'),
+        client.get_paginated_results('/fabric/discovered-nodes'),
+        client.get_paginated_results('/fabric/compute-collections'))
+    cluster_names = dict((collection.get('external_id'), collection.get('display_name'))
+                         for collection in compute_collections)
+    node_clusters = dict((node.get('external_id'),
+                          cluster_names.get(node.get('parent_compute_collection')))
+                         for node in discovered_nodes)
+    clusters = {}
+    for transport_node in transport_nodes:
+        deployment_info = transport_node.get('node_deployment_info') or {}
+        if deployment_info.get('resource_type') == 'EdgeNode':
+            cluster = EDGE_NODES
+        else:
+            cluster = node_clusters.get(deployment_info.get('discovered_node_id'))
+        clusters[transport_node.get('node_id') or transport_node.get('id')] = (
+            cluster or UNKNOWN_CLUSTER)
+    return clusters
+
+
+async def poll_transport_nodes(client, monitor, node_clusters=None):
+    '''
+    params:
+    - node_clusters: Result of a previous poll. The clusters are read again
+      only if a node is missing from it.
+    result:
+    (summary from TransportNodeMonitor.update, node_clusters)
+    '''
+    states = await client.get_paginated_results('/transport-nodes/state')
+    if node_clusters is None or any(state.get('transport_node_id') not in node_clusters
+                                    for state in states):
+        node_clusters = await fetch_node_clusters(client)
+    return monitor.update(states, node_clusters), node_clusters
+
+
+def format_cluster_progress(cluster, counts):
+    line = '%s: %s/%s success' % (cluster, counts.get('success', 0), counts['total'])
+    for node_state, count in sorted(counts.items()):
+        if node_state not in ('total', 'success', 'stalled') and count:
+            line += ', %s %s' % (count, node_state)
+    if counts['stalled']:
+        line += ', %s stalled' % counts['stalled']
+    return line
+
+
+def monitor_transport_nodes(manager_url, mgr_username, mgr_password, validate_certs,
+                            report, is_running=None, stall_timeout=DEFAULT_STALL_TIMEOUT,
+                            interval=15):
+    '''
+    params:
+    - manager_url: Base URL of the manager API
+    - report: Function called with the summary of each poll
+    - is_running: Function returning False once the monitoring should stop.
+      If not set, the monitoring stops once every node is in a final state or
+      stalled, as nothing moves anymore then.
+    result:
+    The summary of the last poll.
+    '''
+    async def monitor_loop():
+        monitor = TransportNodeMonitor(stall_timeout)
+        node_clusters = None
+        summary = None
+        async with AsyncNSXClient(manager_url, mgr_username, mgr_password,
+                                  validate_certs=validate_certs) as client:
+            while True:
+                running = is_running() if is_running else True
+                try:
+                    summary, node_clusters = await poll_transport_nodes(
+                        client, monitor, node_clusters)
+                    report(summary)
+                except Exception as err:
+                    # The manager may be busy, the next poll tries again
+                    report(dict(error=str(err)))
+                if not running or (is_running is None and summary and
+                                   summary['settled']):
+                    return summary
+                await asyncio.sleep(interval)
+
+    return run(monitor_loop())